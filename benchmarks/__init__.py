@@ -0,0 +1,8 @@
+"""
+🏁 benchmarks – Medición de rendimiento del pipeline (fuera de la suite de tests)
+
+- `corpus.py`: textos sintéticos deterministas (1 KB – 50 MB, es/en, con defectos típicos).
+- `bench_etapas.py`: micro-benchmarks por etapa con resultados en JSON.
+- `corpus_pdf.py`: PDFs sintéticos (texto, escaneados, mixtos, dos columnas).
+- `bench_pipeline.py`: `main.py` completo sobre ese corpus, con distintos números de workers.
+"""
@@ -0,0 +1,237 @@
+"""
+⏱️ bench_etapas.py – Micro-benchmarks por etapa del pipeline
+
+Mide cada etapa de texto (limpieza, enriquecimiento, clasificación,
+validación y exportación .jsonl) sobre corpus sintéticos de `corpus.py`,
+y reporta operaciones/s, MB/s y pico de memoria (tracemalloc).
+
+Los resultados se guardan como JSON en `benchmarks/resultados/` y pueden
+compararse con una ejecución anterior para detectar regresiones:
+
+    python -m benchmarks.bench_etapas
+    python -m benchmarks.bench_etapas --tamanos 1KB,1MB,50MB --perfiles cid,guiones
+    python -m benchmarks.bench_etapas --comparar benchmarks/resultados/etapas_2025-01-01_10-00-00.json
+
+🧠 Decisiones de diseño:
+- Sin dependencias externas ni red: solo la biblioteca estándar y el propio pipeline.
+- Se ejecuta dentro de una carpeta temporal, para que los logs y exportaciones
+  de las etapas no ensucien `output/` del repositorio.
+- El pico de memoria se mide en una pasada aparte: tracemalloc ralentiza la
+  ejecución y falsearía las operaciones/s.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RAIZ))
+
+from benchmarks.corpus import IDIOMAS, PERFILES, generar_texto, parsear_tamano, formatear_tamano
+
+RESULTADOS_DIR = RAIZ / "benchmarks" / "resultados"
+
+TAMANOS_POR_DEFECTO = "1KB,100KB,1MB"
+
+ETAPAS = ["limpieza", "enriquecimiento", "clasificacion", "validacion", "exportacion_jsonl"]
+
+# Tiempo mínimo de medición por caso y tope de repeticiones
+TIEMPO_MINIMO = 0.5
+MAX_REPETICIONES = 1000
+
+# Variación (%) de ops/s a partir de la cual `--comparar` marca un caso
+UMBRAL_REGRESION = 10.0
+
+
+def _etapas(carpeta: Path) -> Dict[str, Callable[[str], object]]:
+    """Importa el pipeline (ya dentro de la carpeta temporal) y devuelve {etapa: función(texto)}."""
+    from src.cleaner import limpiar_texto_completo
+    from src.enhancer import enriquecer_texto
+    from src.classifier import clasificar_documento
+    from src.validator import validar_documento
+    from src.exporter import _guardar_jsonl
+
+    destino = carpeta / "bench.jsonl"
+    return {
+        "limpieza": lambda texto: limpiar_texto_completo(texto, modo_md=True),
+        "enriquecimiento": lambda texto: enriquecer_texto(texto),
+        "clasificacion": clasificar_documento,
+        "validacion": lambda texto: validar_documento(texto, "bench.pdf", "0" * 32),
+        "exportacion_jsonl": lambda texto: _guardar_jsonl(destino, texto, "0" * 32, "General Works", "000"),
+    }
+
+
+def medir_etapa(funcion: Callable[[str], object], texto: str,
+                tiempo_minimo: float = TIEMPO_MINIMO, max_repeticiones: int = MAX_REPETICIONES) -> Dict[str, float]:
+    """
+    Ejecuta `funcion(texto)` repetidamente durante al menos `tiempo_minimo` segundos.
+
+    Returns:
+        dict con repeticiones, s_op (mejor tiempo), ops_s, mb_s y pico_mb.
+    """
+    tamano_mb = len(texto.encode("utf-8")) / 1024 ** 2
+
+    # Pasada con tracemalloc: solo para el pico de memoria
+    tracemalloc.start()
+    funcion(texto)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tiempos: List[float] = []
+    inicio = time.perf_counter()
+    while len(tiempos) < max_repeticiones and (not tiempos or time.perf_counter() - inicio < tiempo_minimo):
+        t0 = time.perf_counter()
+        funcion(texto)
+        tiempos.append(time.perf_counter() - t0)
+
+    mejor = min(tiempos)
+    media = sum(tiempos) / len(tiempos)
+    return {
+        "repeticiones": len(tiempos),
+        "s_op": round(mejor, 6),
+        "s_op_media": round(media, 6),
+        "ops_s": round(1 / mejor, 3) if mejor else float("inf"),
+        "mb_s": round(tamano_mb / mejor, 3) if mejor else float("inf"),
+        "pico_mb": round(pico / 1024 ** 2, 3),
+    }
+
+
+def ejecutar(tamanos: List[int], idiomas: List[str], perfiles: List[str], etapas: List[str],
+             tiempo_minimo: float = TIEMPO_MINIMO, semilla: int = 0) -> List[Dict[str, object]]:
+    """Recorre todas las combinaciones y devuelve una fila de resultados por caso."""
+    resultados = []
+    directorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="bench_etapas_") as temporal, open(os.devnull, "w") as nulo:
+        os.chdir(temporal)
+        try:
+            funciones = _etapas(Path(temporal))
+            for tamano in tamanos:
+                for idioma in idiomas:
+                    for perfil in perfiles:
+                        texto = generar_texto(tamano, idioma=idioma, perfil=perfil, semilla=semilla)
+                        for etapa in etapas:
+                            # Las etapas imprimen/registran avisos: se descartan para no medir la consola
+                            with redirect_stdout(nulo):
+                                medida = medir_etapa(funciones[etapa], texto, tiempo_minimo=tiempo_minimo)
+                            fila = {
+                                "etapa": etapa,
+                                "tamano": formatear_tamano(tamano),
+                                "bytes": tamano,
+                                "idioma": idioma,
+                                "perfil": perfil,
+                                **medida,
+                            }
+                            resultados.append(fila)
+                            print(f"  {etapa:<18} {fila['tamano']:>6} {idioma} {perfil:<9}"
+                                  f" {medida['ops_s']:>10.2f} ops/s {medida['mb_s']:>8.2f} MB/s"
+                                  f" {medida['pico_mb']:>8.2f} MB pico")
+        finally:
+            os.chdir(directorio_original)
+    return resultados
+
+
+def _clave(fila: Dict[str, object]) -> tuple:
+    return (fila["etapa"], fila["tamano"], fila["idioma"], fila["perfil"])
+
+
+def comparar(actual: List[Dict[str, object]], anterior: List[Dict[str, object]],
+             umbral: float = UMBRAL_REGRESION) -> List[Dict[str, object]]:
+    """
+    Compara ops/s de los casos comunes a dos ejecuciones.
+
+    Returns:
+        Lista de {etapa, tamano, idioma, perfil, antes, ahora, variacion_pct, regresion}.
+    """
+    previos = {_clave(f): f for f in anterior}
+    diferencias = []
+    for fila in actual:
+        previa = previos.get(_clave(fila))
+        if not previa or not previa["ops_s"]:
+            continue
+        variacion = (fila["ops_s"] - previa["ops_s"]) / previa["ops_s"] * 100
+        diferencias.append({
+            "etapa": fila["etapa"], "tamano": fila["tamano"], "idioma": fila["idioma"], "perfil": fila["perfil"],
+            "antes": previa["ops_s"], "ahora": fila["ops_s"],
+            "variacion_pct": round(variacion, 1),
+            "regresion": variacion <= -umbral,
+        })
+    return diferencias
+
+
+def _entorno() -> Dict[str, str]:
+    from src.manifest import PIPELINE_VERSION
+    return {
+        "version_pipeline": PIPELINE_VERSION,
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "procesador": platform.processor() or platform.machine(),
+        "nucleos": os.cpu_count(),
+    }
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Micro-benchmarks por etapa con corpus sintéticos")
+    parser.add_argument("--tamanos", default=TAMANOS_POR_DEFECTO,
+                        help="Tamaños separados por comas (p. ej. 1KB,1MB,50MB)")
+    parser.add_argument("--idiomas", default=",".join(IDIOMAS), help="Idiomas: es,en")
+    parser.add_argument("--perfiles", default=",".join(PERFILES),
+                        help=f"Perfiles de texto: {','.join(PERFILES)}")
+    parser.add_argument("--etapas", default="",
+                        help="Etapas a medir (por defecto todas)")
+    parser.add_argument("--tiempo-minimo", type=float, default=TIEMPO_MINIMO,
+                        help="Segundos mínimos de medición por caso")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla del corpus")
+    parser.add_argument("--salida", type=Path, default=None,
+                        help="Archivo JSON de resultados (por defecto benchmarks/resultados/etapas_<fecha>.json)")
+    parser.add_argument("--comparar", type=Path, default=None,
+                        help="JSON de una ejecución anterior para calcular variaciones")
+    args = parser.parse_args(argv)
+
+    tamanos = [parsear_tamano(t) for t in args.tamanos.split(",") if t.strip()]
+    idiomas = [i.strip() for i in args.idiomas.split(",") if i.strip()]
+    perfiles = [p.strip() for p in args.perfiles.split(",") if p.strip()]
+    etapas = [e.strip() for e in args.etapas.split(",") if e.strip()] or ETAPAS
+    desconocidas = set(etapas) - set(ETAPAS)
+    if desconocidas:
+        parser.error(f"Etapas desconocidas: {', '.join(sorted(desconocidas))} (opciones: {', '.join(ETAPAS)})")
+
+    print(f"⏱️ Benchmarks por etapa: {len(tamanos)} tamaños × {len(idiomas)} idiomas × "
+          f"{len(perfiles)} perfiles × {len(etapas)} etapas")
+    resultados = ejecutar(tamanos, idiomas, perfiles, etapas,
+                          tiempo_minimo=args.tiempo_minimo, semilla=args.semilla)
+
+    informe = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "entorno": _entorno(),
+        "parametros": {"tiempo_minimo": args.tiempo_minimo, "semilla": args.semilla},
+        "resultados": resultados,
+    }
+
+    if args.comparar:
+        anterior = json.loads(args.comparar.read_text(encoding="utf-8"))["resultados"]
+        diferencias = comparar(resultados, anterior)
+        informe["comparacion"] = {"referencia": str(args.comparar), "casos": diferencias}
+        print(f"\n📈 Comparación con {args.comparar.name} (ops/s):")
+        for d in diferencias:
+            marca = "🔻" if d["regresion"] else "  "
+            print(f"{marca} {d['etapa']:<18} {d['tamano']:>6} {d['idioma']} {d['perfil']:<9}"
+                  f" {d['antes']:>10.2f} → {d['ahora']:>10.2f} ({d['variacion_pct']:+.1f}%)")
+
+    salida = args.salida or RESULTADOS_DIR / f"etapas_{datetime.now():%Y-%m-%d_%H-%M-%S}.json"
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    salida.write_text(json.dumps(informe, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\n💾 Resultados guardados en: {salida}")
+    return informe
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+🏭 bench_pipeline.py – Benchmark de extremo a extremo de `main.py`
+
+Genera (o reutiliza) un corpus de PDFs sintéticos con `corpus_pdf.py` y
+ejecuta el pipeline completo sobre él, una vez por cada número de workers,
+como lo haría un usuario: `python main.py --workers N --metrics` en una
+carpeta de trabajo limpia. Reporta por ejecución:
+
+- docs/s y páginas/s (tiempo de pared del proceso completo, arranque incluido)
+- proporción de documentos que pasaron por OCR y fracción del tiempo de extracción gastada en OCR
+- pico de RSS (el mayor de `main.py` y sus procesos hijos)
+- documentos con error
+
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --documentos 8 --paginas 20 --workers 1,2,4 --tipos textual,columnas
+
+🧠 Decisiones de diseño:
+- Cada ejecución parte de una carpeta vacía con `input/` enlazado al corpus:
+  sin manifest previo, ningún documento se omite.
+- El pico de RSS se obtiene con `os.wait4()` del proceso de `main.py`, que
+  incluye a los workers que este esperó.
+- El reparto de tiempos por etapa sale de los eventos `metrica_etapa`
+  del log de la ejecución (ver `src/metricas.py`).
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+RAIZ = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RAIZ))
+
+from benchmarks.corpus_pdf import TIPOS, generar_corpus
+
+RESULTADOS_DIR = RAIZ / "benchmarks" / "resultados"
+CORPUS_DIR = RAIZ / "benchmarks" / "corpus"
+
+
+def _leer_eventos(carpeta: Path) -> List[dict]:
+    eventos = []
+    for log in sorted((carpeta / "output" / "logs").glob("run_*.jsonl")):
+        for linea in log.read_text(encoding="utf-8").splitlines():
+            try:
+                eventos.append(json.loads(linea))
+            except json.JSONDecodeError:
+                continue
+    return eventos
+
+
+def ejecutar_main(corpus: Dict[str, object], workers: int, extra: List[str] = None) -> Dict[str, object]:
+    """
+    Ejecuta `main.py` sobre el corpus en una carpeta temporal y resume la ejecución.
+
+    Returns:
+        dict con workers, duracion_s, docs_s, paginas_s, ocr_docs_pct, ocr_tiempo_pct,
+        rss_pico_mb, procesados, errores y etapas (segundos totales por etapa).
+    """
+    pdfs = corpus["pdfs"]
+    paginas = sum(d["paginas"] for d in pdfs)
+    entrada = Path(pdfs[0]["archivo"]).parents[1]
+
+    with tempfile.TemporaryDirectory(prefix="bench_pipeline_") as temporal:
+        trabajo = Path(temporal)
+        (trabajo / "input").symlink_to(entrada, target_is_directory=True)
+        entorno = dict(os.environ, PYTHONPATH=str(RAIZ))
+        entorno.pop("EXECUTION_ID", None)
+        entorno.pop("LOG_TIMESTAMP", None)
+        comando = [sys.executable, str(RAIZ / "main.py"), "--workers", str(workers), "--metrics", *(extra or [])]
+
+        with open(trabajo / "consola.txt", "w", encoding="utf-8") as consola:
+            inicio = time.perf_counter()
+            proceso = subprocess.Popen(comando, cwd=trabajo, env=entorno, stdout=consola, stderr=subprocess.STDOUT)
+            _, estado, uso = os.wait4(proceso.pid, 0)
+            duracion = time.perf_counter() - inicio
+            proceso.returncode = os.waitstatus_to_exitcode(estado)
+
+        if proceso.returncode != 0:
+            salida = (trabajo / "consola.txt").read_text(encoding="utf-8")[-2000:]
+            raise RuntimeError(f"main.py terminó con código {proceso.returncode}:\n{salida}")
+
+        eventos = _leer_eventos(trabajo)
+
+    # ru_maxrss viene en KiB en Linux y en bytes en macOS
+    rss_mb = uso.ru_maxrss / (1024 ** 2 if platform.system() == "Darwin" else 1024)
+
+    procesados = sum(1 for e in eventos if e.get("evento") == "export_ok")
+    errores = sum(1 for e in eventos if e.get("evento") == "error_parse")
+    etapas: Dict[str, float] = {}
+    docs_ocr = set()
+    for e in eventos:
+        if e.get("evento") != "metrica_etapa":
+            continue
+        etapas[e["etapa"]] = etapas.get(e["etapa"], 0.0) + e["wall_s"]
+        if e["etapa"] == "ocr":
+            docs_ocr.add(e.get("archivo"))
+
+    extraccion = etapas.get("extraccion", 0.0)
+    return {
+        "workers": workers,
+        "duracion_s": round(duracion, 3),
+        "docs_s": round(len(pdfs) / duracion, 3),
+        "paginas_s": round(paginas / duracion, 3),
+        "ocr_docs_pct": round(100 * len(docs_ocr) / len(pdfs), 1),
+        "ocr_tiempo_pct": round(100 * etapas.get("ocr", 0.0) / extraccion, 1) if extraccion else 0.0,
+        "rss_pico_mb": round(rss_mb, 1),
+        "procesados": procesados,
+        "errores": errores,
+        "etapas": {k: round(v, 3) for k, v in sorted(etapas.items(), key=lambda e: -e[1])},
+    }
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(description="Benchmark de extremo a extremo sobre un corpus de PDFs sintéticos")
+    parser.add_argument("--documentos", type=int, default=4, help="PDFs por tipo")
+    parser.add_argument("--paginas", type=int, default=10, help="Páginas por PDF")
+    parser.add_argument("--tipos", default=",".join(TIPOS), help=f"Tipos de PDF: {','.join(TIPOS)}")
+    parser.add_argument("--workers", default="1,2,4", help="Números de workers a probar, separados por comas")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla del corpus")
+    parser.add_argument("--corpus", type=Path, default=CORPUS_DIR,
+                        help="Carpeta del corpus (se reutiliza si los parámetros coinciden)")
+    parser.add_argument("--salida", type=Path, default=None,
+                        help="Archivo JSON de resultados (por defecto benchmarks/resultados/pipeline_<fecha>.json)")
+    parser.add_argument("--extra", default="",
+                        help="Opciones adicionales para main.py (p. ej. '--stream' o '--async')")
+    args = parser.parse_args(argv)
+
+    tipos = [t.strip() for t in args.tipos.split(",") if t.strip()]
+    lista_workers = [int(w) for w in args.workers.split(",") if w.strip()]
+
+    if not shutil.which("tesseract") and any(t in ("escaneado", "mixto") for t in tipos):
+        print("⚠️ tesseract no está instalado: los PDFs escaneados terminarán en error_parse.")
+
+    print(f"📄 Preparando corpus en {args.corpus} ({args.documentos} × {len(tipos)} PDFs de {args.paginas} páginas)...")
+    corpus = generar_corpus(args.corpus, documentos=args.documentos, paginas=args.paginas,
+                            tipos=tipos, semilla=args.semilla)
+
+    ejecuciones = []
+    print(f"  {'workers':>7} {'duración':>10} {'docs/s':>8} {'pág/s':>8} {'OCR docs':>9} {'OCR t':>7} {'RSS MB':>8} {'errores':>8}")
+    for workers in lista_workers:
+        r = ejecutar_main(corpus, workers, extra=args.extra.split())
+        ejecuciones.append(r)
+        print(f"  {r['workers']:>7} {r['duracion_s']:>9.2f}s {r['docs_s']:>8.2f} {r['paginas_s']:>8.2f}"
+              f" {r['ocr_docs_pct']:>8.1f}% {r['ocr_tiempo_pct']:>6.1f}% {r['rss_pico_mb']:>8.1f} {r['errores']:>8}")
+
+    informe = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "entorno": {
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "nucleos": os.cpu_count(),
+            "tesseract": bool(shutil.which("tesseract")),
+        },
+        "corpus": corpus["parametros"],
+        "extra": args.extra,
+        "ejecuciones": ejecuciones,
+    }
+    salida = args.salida or RESULTADOS_DIR / f"pipeline_{datetime.now():%Y-%m-%d_%H-%M-%S}.json"
+    salida.parent.mkdir(parents=True, exist_ok=True)
+    salida.write_text(json.dumps(informe, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"\n💾 Resultados guardados en: {salida}")
+    return informe
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+🧪 corpus.py – Textos sintéticos deterministas para benchmarks
+
+Genera textos con la forma de lo que sale de `extract_text()` (título, autor,
+resumen, secciones, citas y referencias), en español o inglés y con los
+defectos típicos que el pipeline debe reparar:
+
+- `limpio`:   texto correcto.
+- `mojibake`: UTF-8 leído como Latin-1 (`Ã©`, `â€™`...).
+- `cid`:      glifos sin mapear de pdfminer (`(cid:72)`).
+- `guiones`:  palabras partidas a final de línea (`pro-\\nceso`).
+
+La misma combinación (tamaño, idioma, perfil, semilla) produce siempre el
+mismo texto, en cualquier máquina y sin conexión: los resultados de dos
+versiones del pipeline son comparables.
+"""
+
+import random
+import re
+from typing import Dict, List
+
+IDIOMAS = ("es", "en")
+PERFILES = ("limpio", "mojibake", "cid", "guiones")
+
+_VOCABULARIO = {
+    "es": (
+        "el la los las de del en un una que por para con sobre entre como desde "
+        "sistema proceso análisis información conocimiento biblioteca documento "
+        "lenguaje aprendizaje automático filosofía historia ciencia método teoría "
+        "educación investigación resultado estructura relación función página "
+        "clasificación música matemática física química biología sociedad cultura "
+        "también según través además después número último término señal diseño"
+    ).split(),
+    "en": (
+        "the of and to in a is that for on with as by from this which are be "
+        "system process analysis information knowledge library document language "
+        "learning machine philosophy history science method theory education "
+        "research result structure relation function page classification music "
+        "mathematics physics chemistry biology society culture also between through"
+    ).split(),
+}
+
+_SECCIONES = {
+    "es": ["Resumen", "Introducción", "Metodología", "Resultados", "Discusión", "Conclusiones", "Referencias"],
+    "en": ["Abstract", "Introduction", "Methodology", "Results", "Discussion", "Conclusions", "References"],
+}
+
+_MOJIBAKE = {
+    "á": "Ã¡", "é": "Ã©", "í": "Ã­", "ó": "Ã³", "ú": "Ãº", "ñ": "Ã±",
+    "'": "â€™", "“": "â€œ", "”": "â€\x9d",
+}
+
+_UNIDADES = {"B": 1, "KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+
+def parsear_tamano(texto: str) -> int:
+    """Convierte '1KB', '50MB' o '2048' en bytes."""
+    coincidencia = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMG]?B)?\s*", texto.upper())
+    if not coincidencia:
+        raise ValueError(f"Tamaño no válido: {texto!r}")
+    numero, unidad = coincidencia.groups()
+    return int(float(numero) * _UNIDADES[unidad or "B"])
+
+
+def formatear_tamano(n: int) -> str:
+    """Inverso aproximado de `parsear_tamano` (para etiquetas de resultados)."""
+    for unidad in ("GB", "MB", "KB"):
+        if n >= _UNIDADES[unidad] and n % _UNIDADES[unidad] == 0:
+            return f"{n // _UNIDADES[unidad]}{unidad}"
+    return f"{n}B"
+
+
+# ─────────────────────────────────────────────────────────────
+# 🧱 Piezas del texto
+# ─────────────────────────────────────────────────────────────
+def _oracion(rng: random.Random, idioma: str) -> str:
+    palabras = rng.choices(_VOCABULARIO[idioma], k=rng.randint(8, 22))
+    oracion = " ".join(palabras).capitalize()
+    if rng.random() < 0.15:
+        oracion += f" [{rng.randint(1, 40)}]"
+    return oracion + "."
+
+
+def _parrafo(rng: random.Random, idioma: str) -> str:
+    return " ".join(_oracion(rng, idioma) for _ in range(rng.randint(3, 7)))
+
+
+def _envolver(parrafo: str, ancho: int = 78) -> List[str]:
+    """Corta el párrafo en líneas como lo haría la extracción de un PDF."""
+    lineas, actual = [], ""
+    for palabra in parrafo.split(" "):
+        if actual and len(actual) + 1 + len(palabra) > ancho:
+            lineas.append(actual)
+            actual = palabra
+        else:
+            actual = f"{actual} {palabra}" if actual else palabra
+    if actual:
+        lineas.append(actual)
+    return lineas
+
+
+def _aplicar_perfil(lineas: List[str], perfil: str, rng: random.Random) -> List[str]:
+    if perfil == "limpio":
+        return lineas
+    if perfil == "mojibake":
+        tabla = str.maketrans(_MOJIBAKE)
+        return [linea.translate(tabla) if rng.random() < 0.6 else linea for linea in lineas]
+    if perfil == "cid":
+        def _cid(coincidencia):
+            return f"(cid:{rng.randint(3, 140)})" if rng.random() < 0.25 else coincidencia.group(0)
+        return [re.sub(r"[a-záéíóúñ]", _cid, linea) if rng.random() < 0.5 else linea for linea in lineas]
+    if perfil == "guiones":
+        resultado, arrastre = [], ""
+        for i, linea in enumerate(lineas):
+            palabras = (arrastre + linea).split(" ")
+            arrastre = ""
+            ultima = palabras[-1]
+            if i < len(lineas) - 1 and len(ultima) > 5 and ultima.isalpha() and rng.random() < 0.7:
+                # Se parte la última palabra y el resto abre la línea siguiente
+                corte = rng.randint(2, len(ultima) - 3)
+                palabras[-1] = ultima[:corte] + "-"
+                arrastre = ultima[corte:] + " "
+            resultado.append(" ".join(palabras))
+        return resultado
+    raise ValueError(f"Perfil desconocido: {perfil!r} (opciones: {', '.join(PERFILES)})")
+
+
+# ─────────────────────────────────────────────────────────────
+# 📚 Generador
+# ─────────────────────────────────────────────────────────────
+def generar_texto(tamano: int, idioma: str = "es", perfil: str = "limpio", semilla: int = 0) -> str:
+    """
+    Genera un texto sintético de aproximadamente `tamano` bytes UTF-8.
+
+    Para tamaños grandes (decenas de MB) no se generan todas las oraciones:
+    se crea un banco fijo de párrafos y se eligen de él, lo que mantiene la
+    generación en segundos y la distribución de defectos uniforme.
+
+    Args:
+        tamano: Tamaño objetivo en bytes (el texto se recorta a ese tamaño).
+        idioma: 'es' o 'en'.
+        perfil: Uno de PERFILES.
+        semilla: Semilla del generador pseudoaleatorio.
+    """
+    if idioma not in IDIOMAS:
+        raise ValueError(f"Idioma desconocido: {idioma!r} (opciones: {', '.join(IDIOMAS)})")
+    rng = random.Random(f"{idioma}:{perfil}:{semilla}")
+    secciones = _SECCIONES[idioma]
+
+    banco = ["\n".join(_aplicar_perfil(_envolver(_parrafo(rng, idioma)), perfil, rng)) for _ in range(64)]
+
+    bloques = [
+        "Synthetic Benchmark Document" if idioma == "en" else "Documento Sintético de Referencia",
+        ("Author: " if idioma == "en" else "Autor: ") + "Ada Lovelace",
+    ]
+    total = sum(len(b.encode("utf-8")) + 2 for b in bloques)
+    seccion = 0
+    while total < tamano:
+        if rng.random() < 0.08:
+            bloque = secciones[seccion % (len(secciones) - 1)]
+            seccion += 1
+        else:
+            bloque = rng.choice(banco)
+        bloques.append(bloque)
+        total += len(bloque.encode("utf-8")) + 2
+
+    referencias = [secciones[-1]] + [f"[{i}] {_oracion(rng, idioma)}" for i in range(1, 6)]
+    bloques.extend(referencias)
+    texto = "\n\n".join(bloques)
+
+    # Recorte al tamaño pedido sin partir caracteres multibyte; se conservan las referencias finales
+    cola = "\n\n" + "\n\n".join(referencias)
+    datos = texto.encode("utf-8")
+    if len(datos) > tamano and tamano > len(cola.encode("utf-8")) * 2:
+        cuerpo = datos[: tamano - len(cola.encode("utf-8"))].decode("utf-8", errors="ignore")
+        texto = cuerpo + cola
+    return texto
+
+
+def describir(texto: str) -> Dict[str, int]:
+    """Contadores rápidos del texto generado (útiles para verificar perfiles)."""
+    return {
+        "bytes": len(texto.encode("utf-8")),
+        "lineas": texto.count("\n") + 1,
+        "cid": texto.count("(cid:"),
+        "mojibake": texto.count("Ã") + texto.count("â€"),
+        "guiones": len(re.findall(r"-\n", texto)),
+    }
@@ -0,0 +1,123 @@
+"""
+📄 corpus_pdf.py – Corpus de PDFs sintéticos para el benchmark de extremo a extremo
+
+Genera con PyMuPDF PDFs deterministas de cuatro tipos, cada uno en su
+subcarpeta (el pipeline usa la carpeta como `tipo` al exportar):
+
+- `textual/`:   capa de texto normal, una columna.
+- `escaneado/`: páginas rasterizadas sin capa de texto (requieren OCR).
+- `mixto/`:     páginas de texto alternadas con páginas rasterizadas.
+- `columnas/`:  capa de texto en dos columnas.
+
+El texto sale de `corpus.generar_texto()`, así que el mismo conjunto de
+parámetros produce siempre el mismo corpus.
+"""
+
+import json
+import shutil
+from pathlib import Path
+from typing import Dict, List
+
+import fitz  # PyMuPDF
+
+from benchmarks.corpus import generar_texto
+
+TIPOS = ("textual", "escaneado", "mixto", "columnas")
+
+# Página A4 en puntos y márgenes
+ANCHO, ALTO = 595, 842
+MARGEN = 56
+SEPARACION_COLUMNAS = 20
+
+# Resolución de las páginas "escaneadas"
+DPI_ESCANEO = 150
+
+# Bytes de texto por página (aprox. una página llena a 10 pt)
+TEXTO_POR_PAGINA = 2600
+
+
+def _pagina_texto(doc: fitz.Document, texto: str, columnas: int = 1):
+    pagina = doc.new_page(width=ANCHO, height=ALTO)
+    ancho_util = ANCHO - 2 * MARGEN
+    ancho_columna = (ancho_util - SEPARACION_COLUMNAS * (columnas - 1)) / columnas
+    trozo = len(texto) // columnas + 1
+    for c in range(columnas):
+        x0 = MARGEN + c * (ancho_columna + SEPARACION_COLUMNAS)
+        rect = fitz.Rect(x0, MARGEN, x0 + ancho_columna, ALTO - MARGEN)
+        pagina.insert_textbox(rect, texto[c * trozo:(c + 1) * trozo], fontsize=10 if columnas == 1 else 8)
+
+
+def _pagina_escaneada(doc: fitz.Document, texto: str):
+    """Dibuja el texto en una página auxiliar, la rasteriza y la inserta como imagen."""
+    with fitz.open() as auxiliar:
+        _pagina_texto(auxiliar, texto)
+        pixmap = auxiliar[0].get_pixmap(dpi=DPI_ESCANEO, colorspace=fitz.csGRAY)
+    pagina = doc.new_page(width=ANCHO, height=ALTO)
+    pagina.insert_image(pagina.rect, stream=pixmap.tobytes("png"))
+
+
+def generar_pdf(ruta: Path, tipo: str, paginas: int, idioma: str = "es", semilla: int = 0) -> Dict[str, object]:
+    """
+    Genera un PDF de `paginas` páginas del `tipo` indicado.
+
+    Returns:
+        dict con archivo, tipo, paginas, paginas_raster y bytes.
+    """
+    if tipo not in TIPOS:
+        raise ValueError(f"Tipo desconocido: {tipo!r} (opciones: {', '.join(TIPOS)})")
+    texto = generar_texto(TEXTO_POR_PAGINA * paginas, idioma=idioma, semilla=semilla)
+    raster = 0
+    with fitz.open() as doc:
+        for n in range(paginas):
+            trozo = texto[n * TEXTO_POR_PAGINA:(n + 1) * TEXTO_POR_PAGINA]
+            if tipo == "escaneado" or (tipo == "mixto" and n % 2 == 1):
+                _pagina_escaneada(doc, trozo)
+                raster += 1
+            else:
+                _pagina_texto(doc, trozo, columnas=2 if tipo == "columnas" else 1)
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        doc.save(ruta, garbage=3, deflate=True)
+    return {
+        "archivo": str(ruta),
+        "tipo": tipo,
+        "paginas": paginas,
+        "paginas_raster": raster,
+        "bytes": ruta.stat().st_size,
+    }
+
+
+def generar_corpus(carpeta: Path, documentos: int = 4, paginas: int = 10,
+                   tipos: List[str] = TIPOS, semilla: int = 0) -> Dict[str, object]:
+    """
+    Genera (o reutiliza) un corpus en `carpeta/input/<tipo>/`.
+
+    Si `carpeta/corpus.json` ya describe los mismos parámetros, no se regenera.
+
+    Args:
+        documentos: PDFs por tipo.
+        paginas: Páginas por PDF.
+        tipos: Tipos de PDF a incluir.
+        semilla: Semilla base (cada PDF usa una derivada).
+
+    Returns:
+        Descripción del corpus: parámetros y lista de PDFs.
+    """
+    carpeta = Path(carpeta)
+    parametros = {"documentos": documentos, "paginas": paginas, "tipos": list(tipos), "semilla": semilla}
+    descriptor = carpeta / "corpus.json"
+    if descriptor.exists():
+        previo = json.loads(descriptor.read_text(encoding="utf-8"))
+        if previo.get("parametros") == parametros and all(Path(d["archivo"]).exists() for d in previo["pdfs"]):
+            return previo
+
+    shutil.rmtree(carpeta / "input", ignore_errors=True)  # sin restos de un corpus anterior
+    pdfs = []
+    for tipo in tipos:
+        for i in range(documentos):
+            idioma = "es" if i % 2 == 0 else "en"
+            ruta = carpeta / "input" / tipo / f"{tipo}_{i:03d}.pdf"
+            pdfs.append(generar_pdf(ruta, tipo, paginas, idioma=idioma, semilla=semilla * 1000 + i))
+
+    corpus = {"parametros": parametros, "pdfs": pdfs}
+    descriptor.write_text(json.dumps(corpus, ensure_ascii=False, indent=2), encoding="utf-8")
+    return corpus
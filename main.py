@@ -1,23 +1,32 @@
 import os
+import signal
+import time
 import argparse
+import threading
 from pathlib import Path
 
-from src.parser import extract_text  # ✅ Ahora incluye heurística + OCR
-from src.cleaner import limpiar_texto_completo
-from src.enhancer import enriquecer_texto
-from src.classifier import clasificar_documento
-from src.exporter import exportar_archivos
-from src.logger import log_evento
-from src.validator import validar_documento
-from src.utils import calcular_hash_md5  # Para trazabilidad única del documento
+# ⚡ Solo lo imprescindible para la CLI: el pipeline (PyMuPDF, pdfplumber, OCR...)
+# y el observador se importan dentro de main()/vigilar(), así --help y --version
+# responden al instante.
+from src import metricas
 
 # Forzar idioma visual en consola a español
 os.environ["LANG"] = "es"
 
 INPUT_DIR = "input"
 
-def main(debug: bool = False):
+def main(debug: bool = False, workers: int = 1, forzar: bool = False, stream: bool = False,
+         asincrono: bool = False, medir: bool = False, cola: bool = False, nodo: str = None,
+         politica: str = None, carril_ocr: int = None, limite_s: float = None,
+         limite_mb: float = None, degradar: bool = False, checkpoint: bool = True):
     print("🚀 Iniciando Dewey Pipeline...")
+    from src.pipeline import procesar_lote, resumir  # ✅ Extracción → exportación por documento
+    from src.manifest import cargar_manifest, filtrar_pendientes, huella_pipeline, registrar_exportacion
+    from src.logger import log_evento
+
+    if medir:
+        metricas.activar()
+    inicio = time.perf_counter()
 
     archivos_pdf = list(Path(INPUT_DIR).rglob("*.pdf"))
     if not archivos_pdf:
@@ -25,78 +34,275 @@ def main(debug: bool = False):
         return
 
     total = len(archivos_pdf)
-    errores = 0
-    procesados = 0
 
     if debug:
         print(f"🔍 Se encontraron {total} archivos para procesar.")
+        if workers > 1:
+            print(f"🧵 Repartiendo documentos entre {workers} procesos.")
+
+    # Ejecución incremental: se omiten PDFs ya exportados con esta versión del pipeline
+    # Con --cola, otros nodos pueden estar agregando líneas: no se reescribe
+    manifest = cargar_manifest(compactar=not cola)
+    huella = huella_pipeline()
+    pendientes, omitidos = filtrar_pendientes(archivos_pdf, manifest, huella, forzar=forzar)
+    for omitido in omitidos:
+        log_evento("omitido", archivo=omitido["archivo"], razon=omitido["razon"])
+
+    # Planificación por coste: sonda barata de cada PDF y orden según la política
+    sondas = {}
+    if politica and pendientes:
+        from src.planificador import planificar, registrar_plan, registrar_costo_real
+
+        plan = planificar([ruta for ruta, _ in pendientes], politica)
+        registrar_plan(plan, politica)
+        sondas = {sonda["archivo"]: sonda for sonda in plan}
+        hashes_por_ruta = dict(pendientes)
+        pendientes = [(sonda["archivo"], hashes_por_ruta[sonda["archivo"]]) for sonda in plan]
+        if debug:
+            en_ocr = sum(1 for sonda in plan if sonda["carril"] == "ocr")
+            print(f"🗓️ Orden '{politica}': {len(plan)} documentos, {en_ocr} en el carril OCR, "
+                  f"{sum(s['costo_s'] for s in plan):.1f} s estimados.")
+
+    def _anotar(resultado):
+        if resultado.get("ok"):
+            registrar_exportacion(manifest, resultado, huella)
+        if resultado.get("archivo") in sondas:
+            registrar_costo_real(sondas[resultado["archivo"]], resultado)
+
+    rutas = [ruta for ruta, _ in pendientes]
+    carriles = {ruta: sonda["carril"] for ruta, sonda in sondas.items()}
+    limite_ocr = carril_ocr if carril_ocr else (max(1, workers // 2) if sondas else None)
+    profundidades = None
+    # Presupuesto por documento: con límites, cada PDF corre en un proceso vigilado
+    opciones = {"stream": stream, "limite_s": limite_s, "limite_mb": limite_mb, "degradar": degradar}
+
+    # Checkpoints: cada etapa de cada documento queda en el diario; una ejecución
+    # interrumpida continúa desde ahí. Al arrancar se olvida lo ya terminado.
+    # Con --cola --force no se usa: el diario compartido no se puede vaciar con otros nodos
+    # escribiendo en él, y un `exportado` previo se saltaría la reexportación.
+    if checkpoint and not (cola and forzar):
+        from src.checkpoint import Diario
+
+        opciones["checkpoint"] = True
+        if not cola:  # con varios nodos, otros pueden estar escribiendo en el diario
+            # --force empieza de cero: un `exportado` previo no debe saltarse la reexportación
+            Diario().compactar([] if forzar else (hash_doc for _, hash_doc in pendientes if hash_doc))
+    if cola:
+        # Varios nodos sobre la misma carpeta: cada PDF lo procesa quien gane su lease
+        from src.cola import ColaTrabajos, procesar_lote_cola
 
-    for archivo in archivos_pdf:
-        ruta = str(archivo)
-        try:
-            # Extracción y logging inicial
-            if debug:
-                print(f"\n📘 Procesando: {ruta}")
-            texto_crudo = extract_text(ruta)
-            log_evento("procesar", archivo=ruta)
-
-            # Limpieza y enriquecimiento
-            texto_limpio = limpiar_texto_completo(texto_crudo, modo_md=True)
-            texto_enriquecido = enriquecer_texto(texto_limpio, archivo=ruta, debug=debug)
-
-            # Clasificación
-            resultado = clasificar_documento(texto_enriquecido)
-            categoria = resultado.get("categoria")
-            dewey = resultado.get("dewey")
-            titulo = resultado.get("titulo")
-            autor = resultado.get("autor")
-            print(f"📖 Clasificado como: {categoria} ({dewey})")
-            print(f"📝 Título: {titulo or '[Sin título]'} | Autor: {autor or '[Sin autor]'}")
-
-            # Hash para trazabilidad
-            hash_doc = calcular_hash_md5(ruta)
-
-            # Validación semántica (solo logging, no omitir)
-            es_valido, info = validar_documento(texto_enriquecido, ruta, hash_doc)
-            if debug and info.get('razones'):
-                for razon in info['razones']:
-                    print(f"⚠️ {razon}")
-
-            # Exportar siempre
-            exportar_archivos(
-                tipo=Path(archivo).parent.name,
-                titulo=titulo,
-                texto=texto_enriquecido,
-                categoria=categoria,
-                dewey=dewey,
-                autor=autor,
-                hash_doc=hash_doc
-            )
-
-            # Logging final
-            log_evento("clasificado", archivo=ruta, categoria=categoria, dewey=dewey)
-            log_evento("export_ok", archivo=ruta, categoria=categoria, dewey=dewey)
-            procesados += 1
-
-        except Exception as e:
-            errores += 1
-            log_evento("error_parse", archivo=ruta, nivel="ERROR", mensaje=str(e))
-            if debug:
-                print(f"❌ Error procesando {ruta}: {e}")
+        # --force: lo exportado o fallido en ejecuciones anteriores se vuelve a procesar
+        cola_trabajos = ColaTrabajos(nodo=nodo, desde=time.time() if forzar else None)
+        print(f"📬 Nodo {cola_trabajos.nodo} unido a la cola en {cola_trabajos.carpeta}")
+        resultados, ajenos = procesar_lote_cola(
+            pendientes, cola_trabajos, workers=workers, debug=debug,
+            al_terminar=_anotar, opciones=opciones, huella=huella
+        )
+        for omitido in ajenos:
+            log_evento("omitido", archivo=omitido["archivo"], razon=omitido["razon"])
+        omitidos.extend(ajenos)
+    elif asincrono:
+        from src.pipeline_async import procesar_lote_async
+
+        resultados, profundidades = procesar_lote_async(
+            rutas, workers=workers, debug=debug, al_terminar=_anotar, hashes=dict(pendientes),
+            opciones=opciones, carriles=carriles, limite_ocr=limite_ocr
+        )
+    else:
+        resultados = procesar_lote(
+            rutas,
+            workers=workers,
+            debug=debug,
+            al_terminar=_anotar,
+            hashes=dict(pendientes),
+            opciones=opciones,
+            carriles=carriles,
+            limite_ocr=limite_ocr
+        )
+    resumen = resumir(resultados)
+    procesados = resumen["procesados"]
+    errores = resumen["errores"]
 
     # Resumen final en estilo multilinea
     print(f"""
 📊 Resumen del Pipeline:
   ✔️ Procesados: {procesados}
+  ⏭️ Omitidos: {len(omitidos)}
   ❌ Errores: {errores}
 """)
+    if profundidades:
+        print("📦 Profundidad de colas por etapa (máx / media):")
+        for etapa, valores in profundidades.items():
+            print(f"  {etapa:<16} {valores['max']:>3} / {valores['media']}")
+    from src import cache_extraccion
+
+    if cache_extraccion.activa():
+        cache_extraccion.podar()  # lo extraído en esta ejecución también cuenta para el límite
+    if medir:
+        registros = [r for resultado in resultados for r in resultado.get("metricas", [])]
+        resumen_etapas = metricas.resumir(registros, time.perf_counter() - inicio, len(resultados))
+        print(metricas.formatear_tabla(resumen_etapas))
+        log_evento("metricas_ejecucion", **resumen_etapas)
+
+def vigilar(debug: bool = False, workers: int = 1, debounce: float = None, stream: bool = False,
+            limite_s: float = None, limite_mb: float = None, degradar: bool = False, checkpoint: bool = True):
+    """
+    Modo daemon: procesa cada PDF que llegue a INPUT_DIR hasta recibir SIGINT/SIGTERM.
+    Sin `debounce`, usa `DEBOUNCE_SEGUNDOS` de src/observador.py. Las opciones
+    por documento son las mismas que en `main()`.
+    """
+    print("🚀 Iniciando Dewey Pipeline en modo daemon...")
+    from src.observador import DEBOUNCE_SEGUNDOS, ejecutar_daemon
+
+    if debounce is None:
+        debounce = DEBOUNCE_SEGUNDOS
+
+    opciones = {"stream": stream, "limite_s": limite_s, "limite_mb": limite_mb, "degradar": degradar}
+    if checkpoint:
+        from src.checkpoint import Diario
+
+        opciones["checkpoint"] = True
+        # Se olvida lo ya exportado; lo que el daemon anterior dejó a medias se reanuda
+        diario = Diario()
+        diario.compactar(h for h, entrada in diario.cargar().items() if entrada.get("etapa") != "exportado")
+
+    detener = threading.Event()
+    for senal in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(senal, lambda *_: detener.set())
+    ejecutar_daemon(INPUT_DIR, workers=workers, debug=debug, debounce=debounce, detener=detener, opciones=opciones)
+    print("👋 Daemon detenido.")
 
 if __name__ == "__main__":
+    from src.manifest import PIPELINE_VERSION
+
     parser = argparse.ArgumentParser(description="Dewey Pipeline – Procesador de PDFs enriquecidos")
+    parser.add_argument(
+        "--version", action="version", version=f"Dewey Pipeline {PIPELINE_VERSION}"
+    )
     parser.add_argument(
         "--debug", action="store_true",
         help="Muestra detalles de cada paso del pipeline"
     )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Número de procesos para procesar documentos en paralelo (0 = todos los núcleos)"
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="Reprocesa todos los PDFs aunque ya estén exportados en el manifest"
+    )
+    parser.add_argument(
+        "--stream", action="store_true",
+        help="Procesa cada PDF página a página con memoria acotada (libros muy grandes)"
+    )
+    parser.add_argument(
+        "--async", dest="asincrono", action="store_true",
+        help="Pipeline por etapas con asyncio: E/S y CPU solapadas, colas acotadas entre etapas"
+    )
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="Modo daemon: vigila la carpeta de entrada y procesa los PDFs a medida que llegan"
+    )
+    parser.add_argument(
+        "--debounce", type=float, default=None,
+        help="Segundos que un PDF debe permanecer sin cambios antes de procesarse (modo --watch; por defecto 2)"
+    )
+    parser.add_argument(
+        "--no-checkpoint", dest="checkpoint", action="store_false",
+        help="No anota las etapas de cada documento (una ejecución interrumpida no se podrá reanudar)"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=None,
+        help="Segundos máximos por documento; al excederlos se mata su proceso y cuenta como error"
+    )
+    parser.add_argument(
+        "--max-rss", type=float, default=None,
+        help="Memoria residente máxima por documento en MB (Linux); al excederla se mata su proceso"
+    )
+    parser.add_argument(
+        "--degradar", action="store_true",
+        help="Reintenta una vez en modo degradado (solo PyMuPDF, OCR a menor resolución) los que excedan los límites"
+    )
+    parser.add_argument(
+        "--planificar", choices=["largos", "cortos"], default=None,
+        help="Sondea cada PDF (páginas, capa de texto) y procesa primero los más largos o los más cortos"
+    )
+    parser.add_argument(
+        "--carril-ocr", type=int, default=None,
+        help="Máximo de PDFs que necesitan OCR en curso a la vez (con --planificar; por defecto workers/2)"
+    )
+    parser.add_argument(
+        "--cola", action="store_true",
+        help="Reparte los PDFs con otros main.py que comparten input/ y output/ (cola con leases)"
+    )
+    parser.add_argument(
+        "--nodo", default=None,
+        help="Nombre de este nodo en la cola (por defecto: máquina-PID)"
+    )
+    parser.add_argument(
+        "--no-cache", dest="cache", action="store_false",
+        help="No guarda ni reutiliza el texto extraído y el OCR de ejecuciones anteriores (output/cache/)"
+    )
+    parser.add_argument(
+        "--cache-mb", type=float, default=None,
+        help="Tamaño máximo de la caché de extracción en MB (por defecto 2048); se expulsa lo menos usado"
+    )
+    parser.add_argument(
+        "--paginas-paralelas", type=int, nargs="?", const=0, default=None, metavar="N",
+        help="Reparte las páginas de los PDFs grandes y el OCR entre N procesos por documento "
+             "(sin N: núcleos / workers)"
+    )
+    parser.add_argument(
+        "--motor-ocr", choices=["auto", "tesserocr", "pytesseract"], default=None,
+        help="Motor de OCR: tesserocr (modelo cargado una vez por proceso) o pytesseract "
+             "(un proceso por lote de páginas); auto usa tesserocr si está instalado"
+    )
+    parser.add_argument(
+        "--no-filtro-ocr", dest="filtro_ocr", action="store_false",
+        help="Pasa por OCR también las páginas en blanco y las repetidas (por defecto se omiten)"
+    )
+    parser.add_argument(
+        "--metrics", action="store_true",
+        help="Mide tiempo, CPU, bytes, páginas y caracteres por etapa y muestra un resumen (p50/p95/máx)"
+    )
     args = parser.parse_args()
+    if args.asincrono and args.stream:
+        parser.error("--async y --stream no se pueden combinar")
+    if args.cola and (args.asincrono or args.watch):
+        parser.error("--cola no se puede combinar con --async ni con --watch")
+    if args.asincrono and (args.timeout or args.max_rss or args.degradar):
+        parser.error("--timeout, --max-rss y --degradar no se pueden combinar con --async")
+    if args.watch and (args.asincrono or args.planificar):
+        parser.error("--watch no se puede combinar con --async ni con --planificar")
+
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    if args.cache:
+        # Texto extraído y OCR por hash del PDF: un cambio aguas abajo no vuelve a extraer
+        from src import cache_extraccion
+
+        cache_extraccion.activar(args.cache_mb or cache_extraccion.LIMITE_MB_DEFECTO)
+        cache_extraccion.podar()
+    if args.paginas_paralelas is not None:
+        # Núcleos repartidos entre documentos y páginas: workers × procesos ≤ núcleos
+        from src import rangos
+
+        rangos.activar(args.paginas_paralelas or rangos.presupuesto(workers))
+        if args.debug:
+            print(f"✂️ Hasta {rangos.PROCESOS_PAGINAS} procesos por documento para los PDFs grandes.")
+    if args.motor_ocr:
+        from src import motores_ocr
+
+        motores_ocr.activar(args.motor_ocr)
+    if not args.filtro_ocr:
+        from src import filtro_paginas
 
-    main(debug=args.debug)
+        filtro_paginas.activar(False)
+    if args.watch:
+        vigilar(debug=args.debug, workers=workers, debounce=args.debounce, stream=args.stream,
+                limite_s=args.timeout, limite_mb=args.max_rss, degradar=args.degradar,
+                checkpoint=args.checkpoint)
+    else:
+        main(debug=args.debug, workers=workers, forzar=args.force, stream=args.stream,
+             asincrono=args.asincrono, medir=args.metrics, cola=args.cola, nodo=args.nodo,
+             politica=args.planificar, carril_ocr=args.carril_ocr, limite_s=args.timeout,
+             limite_mb=args.max_rss, degradar=args.degradar, checkpoint=args.checkpoint)
@@ -0,0 +1,153 @@
+"""
+🗃️ cache_extraccion.py – Caché persistente del texto extraído y del OCR
+
+Cambiar solo el clasificador o el exportador cambia la huella del pipeline y
+obliga a reprocesar cada PDF: incluida la extracción y el OCR, que no han
+cambiado y son lo más caro. Con la caché activa, `extract_text()` y
+`ocr_completo_inteligente()` guardan su salida en `output/cache/`, comprimida
+con gzip, bajo la clave:
+
+    <hash del PDF>.<tipo>.<huella>.txt.gz      (tipo: extraccion | ocr)
+
+La huella cubre todo lo que determina ese texto: el código de los módulos que
+lo producen (`MODULOS_EXTRACCION`, `MODULOS_OCR`), las versiones de PyMuPDF y
+pdfplumber y los ajustes de la llamada (modo degradado, idioma, dpi, versión de
+Tesseract). Un cambio en el extractor deja de encontrar las entradas antiguas,
+que terminan expulsadas; un cambio aguas abajo las reutiliza.
+
+Tamaño acotado (LRU): cada acierto renueva la fecha de modificación de la
+entrada y `podar()` borra las usadas hace más tiempo hasta quedar por debajo
+del límite. `main.py` poda al arrancar y al terminar.
+
+🧠 Decisiones de diseño:
+- Se activa como las métricas: `activar(limite_mb)` o `PIPELINE_CACHE_MB`, que
+  heredan los procesos hijos. Sin activar, no se calcula ni se lee nada.
+- Escritura atómica (temporal + `os.replace`): varios procesos pueden escribir
+  a la vez y nunca se lee una entrada a medias. Una entrada ilegible se borra.
+- Un texto con páginas cuyo OCR falló no se guarda: la próxima vez se reintenta.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from src.metricas import medir
+from src.utils import archivo_atomico
+
+CACHE_DIR = Path("output") / "cache"
+
+# Límite de tamaño en MB (0 = caché desactivada)
+LIMITE_MB = float(os.getenv("PIPELINE_CACHE_MB", "0") or 0)
+LIMITE_MB_DEFECTO = 2048
+
+# Módulos cuyo código determina el texto de cada tipo de entrada
+MODULOS_EXTRACCION = ["parser", "sonda", "ocr", "motores_ocr", "filtro_paginas", "cleaner"]
+MODULOS_OCR = ["ocr", "motores_ocr", "filtro_paginas"]
+
+# gzip: nivel 6 reduce el texto ~3-4× sin notarse frente a la extracción
+NIVEL_COMPRESION = 6
+
+EXTENSION = ".txt.gz"
+
+
+def activar(limite_mb: float = LIMITE_MB_DEFECTO) -> None:
+    """Activa la caché (0 = desactivar) en este proceso y en los hijos que cree."""
+    global LIMITE_MB
+    LIMITE_MB = max(0.0, float(limite_mb))
+    os.environ["PIPELINE_CACHE_MB"] = f"{LIMITE_MB:g}"
+
+
+def activa() -> bool:
+    return LIMITE_MB > 0
+
+
+@lru_cache(maxsize=None)
+def _version(paquete: str) -> str:
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version(paquete)
+    except PackageNotFoundError:
+        return "?"
+
+
+@lru_cache(maxsize=None)
+def huella(tipo: str, ajustes: str = "") -> str:
+    """Huella de la extracción de `tipo` con unos ajustes (JSON canónico, ver `_clave`)."""
+    base = Path(__file__).resolve().parent
+    h = hashlib.md5(tipo.encode("utf-8"))
+    for nombre in MODULOS_OCR if tipo == "ocr" else MODULOS_EXTRACCION:
+        ruta = base / f"{nombre}.py"
+        if ruta.exists():
+            h.update(ruta.read_bytes())
+    for paquete in ("PyMuPDF", "pdfplumber"):
+        h.update(f"{paquete}={_version(paquete)}".encode("utf-8"))
+    h.update(ajustes.encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+def _clave(hash_doc: str, tipo: str, ajustes: dict) -> Path:
+    canonico = json.dumps(ajustes, sort_keys=True, default=str)
+    return CACHE_DIR / f"{hash_doc}.{tipo}.{huella(tipo, canonico)}{EXTENSION}"
+
+
+def leer(hash_doc: Optional[str], tipo: str, **ajustes) -> Optional[str]:
+    """Texto guardado para el documento, o None (caché inactiva, sin entrada o entrada ilegible)."""
+    if not activa() or not hash_doc:
+        return None
+    ruta = _clave(hash_doc, tipo, ajustes)
+    with medir("cache") as m:
+        try:
+            datos = ruta.read_bytes()
+        except OSError:
+            m.anotar(tipo=tipo, acierto=False)
+            return None
+        try:
+            texto = gzip.decompress(datos).decode("utf-8")
+        except (OSError, EOFError, UnicodeDecodeError):
+            ruta.unlink(missing_ok=True)
+            m.anotar(tipo=tipo, acierto=False)
+            return None
+        try:
+            os.utime(ruta)  # LRU: usada ahora
+        except OSError:
+            pass  # otro proceso la expulsó mientras tanto
+        m.anotar(tipo=tipo, acierto=True, bytes=len(datos), caracteres=len(texto))
+        return texto
+
+
+def guardar(hash_doc: Optional[str], tipo: str, texto: str, **ajustes) -> None:
+    """Guarda el texto del documento (no hace nada con la caché inactiva)."""
+    if not activa() or not hash_doc:
+        return
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    with archivo_atomico(_clave(hash_doc, tipo, ajustes), binario=True) as f:
+        f.write(gzip.compress(texto.encode("utf-8"), compresslevel=NIVEL_COMPRESION))
+
+
+def podar(limite_mb: float = None) -> int:
+    """
+    Expulsa las entradas usadas hace más tiempo hasta que la caché quepa en `limite_mb`
+    (por defecto, el límite activo). Devuelve el número de entradas borradas.
+    """
+    limite = (LIMITE_MB if limite_mb is None else limite_mb) * 1024 ** 2
+    entradas = []
+    for ruta in CACHE_DIR.glob(f"*{EXTENSION}"):
+        try:
+            st = ruta.stat()
+        except OSError:
+            continue
+        entradas.append((st.st_mtime, st.st_size, ruta))
+    total = sum(tamano for _, tamano, _ in entradas)
+    borradas = 0
+    for _, tamano, ruta in sorted(entradas, key=lambda e: e[0]):
+        if total <= limite:
+            break
+        ruta.unlink(missing_ok=True)
+        total -= tamano
+        borradas += 1
+    return borradas
@@ -0,0 +1,177 @@
+"""
+💾 checkpoint.py – Diario de etapas para reanudar ejecuciones interrumpidas
+
+El manifest solo sabe qué documentos terminaron. En una máquina que puede
+desaparecer a mitad de un lote (instancias *spot*, cortes de luz), eso obliga
+a repetir desde cero cada documento a medias: incluido su OCR, que es lo caro.
+
+El diario (`output/checkpoint/diario.jsonl`) anota, antes de seguir adelante,
+cada etapa completada de cada documento:
+
+- `extraido`:    texto extraído (o reconocido por OCR), guardado en `<hash>.extraido.txt`.
+- `enriquecido`: texto limpio y enriquecido, guardado en `<hash>.enriquecido.txt`.
+- `exportado`:   carpeta y metadatos del resultado; los textos intermedios se borran.
+
+Al reanudar, cada documento continúa desde su última etapa registrada con la
+misma huella del pipeline. Un documento `exportado` cuya anotación en el
+manifest se perdió (el proceso murió justo después) se da por terminado sin
+rehacer nada. Las etapas de una extracción degradada llevan `degradado: true`
+y una ejecución normal no las reutiliza.
+
+🧠 Decisiones de diseño:
+- *Write-ahead*: el texto de una etapa se escribe de forma atómica (temporal +
+  `os.replace`) y solo después se agrega la línea al diario, con `fsync`.
+  Una línea en el diario garantiza que su texto está completo en disco.
+- Solo se agregan líneas; varios procesos pueden escribir a la vez (líneas
+  cortas con `O_APPEND`). Si un hash aparece varias veces, gana la última.
+- Las líneas corruptas (escritura cortada) se ignoran al cargar.
+"""
+
+import json
+import os
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from src.utils import archivo_atomico
+
+CHECKPOINT_DIR = Path("output") / "checkpoint"
+
+# Etapas en orden: reanudar desde una implica que las anteriores ya están hechas
+ETAPAS = ("extraido", "enriquecido", "exportado")
+ETAPAS_CON_TEXTO = ("extraido", "enriquecido")
+
+
+@lru_cache(maxsize=1)
+def _huella() -> str:
+    from src.manifest import huella_pipeline
+
+    return huella_pipeline()
+
+
+class Diario:
+    """Diario de etapas compartido por los procesos de una ejecución."""
+
+    def __init__(self, carpeta: Path = None, huella: str = None):
+        self.carpeta = Path(carpeta or CHECKPOINT_DIR)
+        self.ruta = self.carpeta / "diario.jsonl"
+        self.huella = huella
+        self._entradas = None  # se lee una vez por proceso: lo que dejaron ejecuciones anteriores
+
+    # ─────────────────────────────────────────────────────────
+    # 📖 Lectura
+    # ─────────────────────────────────────────────────────────
+    def _huella_actual(self) -> str:
+        return self.huella or _huella()
+
+    def cargar(self) -> Dict[str, dict]:
+        """Última entrada de cada hash: {hash: {"etapa", "huella", ...}}, leída del disco."""
+        entradas = {}
+        if not self.ruta.exists():
+            return entradas
+        with open(self.ruta, encoding="utf-8") as f:
+            for linea in f:
+                try:
+                    entrada = json.loads(linea)
+                    entradas[entrada["hash"]] = entrada
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    continue
+        return entradas
+
+    def _texto(self, hash_doc: str, etapa: str) -> Path:
+        return self.carpeta / f"{hash_doc}.{etapa}.txt"
+
+    def recuperar(self, hash_doc: str, degradado: bool = False) -> Tuple[Optional[str], Optional[object]]:
+        """
+        Última etapa completada de un documento con la huella actual.
+        Las etapas de una extracción degradada solo valen para otra degradada, y las
+        de una extracción con páginas sin OCR no valen: se vuelve a extraer.
+
+        Returns:
+            (etapa, dato): el texto de la etapa para `extraido`/`enriquecido`,
+            la entrada completa para `exportado`, o (None, None) si hay que empezar de cero.
+        """
+        if self._entradas is None:
+            self._entradas = self.cargar()
+        entrada = self._entradas.get(hash_doc)
+        if not entrada or entrada.get("huella") != self._huella_actual():
+            return None, None
+        if (entrada.get("degradado") and not degradado) or entrada.get("ocr_fallidas"):
+            return None, None
+        etapa = entrada.get("etapa")
+        if etapa == "exportado":
+            carpeta = entrada.get("carpeta")
+            return (etapa, entrada) if carpeta and Path(carpeta).exists() else (None, None)
+        if etapa in ETAPAS_CON_TEXTO:
+            try:
+                return etapa, self._texto(hash_doc, etapa).read_text(encoding="utf-8")
+            except OSError:
+                return None, None
+        return None, None
+
+    # ─────────────────────────────────────────────────────────
+    # ✍️ Escritura
+    # ─────────────────────────────────────────────────────────
+    def registrar(self, hash_doc: str, etapa: str, texto: str = None, **datos):
+        """
+        Anota una etapa completada. Si la etapa tiene texto, este se escribe antes
+        que la línea del diario; al llegar a `exportado` se borran los textos intermedios.
+        """
+        if etapa not in ETAPAS:
+            raise ValueError(f"Etapa desconocida: {etapa!r} (opciones: {', '.join(ETAPAS)})")
+        self.carpeta.mkdir(parents=True, exist_ok=True)
+        if texto is not None:
+            with archivo_atomico(self._texto(hash_doc, etapa)) as f:
+                f.write(texto)
+
+        entrada = {
+            "hash": hash_doc,
+            "etapa": etapa,
+            "huella": self._huella_actual(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+        entrada.update(datos)
+        linea = (json.dumps(entrada, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        fd = os.open(self.ruta, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, linea)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        if self._entradas is not None:
+            self._entradas[hash_doc] = entrada
+
+        if etapa == "exportado":
+            self.descartar_textos(hash_doc)
+
+    def descartar_textos(self, hash_doc: str):
+        for etapa in ETAPAS_CON_TEXTO:
+            try:
+                self._texto(hash_doc, etapa).unlink()
+            except FileNotFoundError:
+                pass
+
+    def compactar(self, conservar: Iterable[str]):
+        """
+        Reescribe el diario con las entradas de los hashes de `conservar` (los
+        pendientes de esta ejecución) y borra los textos del resto.
+        No debe llamarse con otros procesos escribiendo (se usa al arrancar).
+        """
+        if not self.ruta.exists():
+            return
+        conservar = set(conservar)
+        entradas = self.cargar()
+        lineas = [json.dumps(e, ensure_ascii=False, default=str) for h, e in entradas.items() if h in conservar]
+        with archivo_atomico(self.ruta) as f:
+            f.writelines(linea + "\n" for linea in lineas)
+        self._entradas = None
+        for ruta in self.carpeta.glob("*.txt"):
+            if ruta.name.split(".", 1)[0] not in conservar:
+                ruta.unlink()
+
+
+@lru_cache(maxsize=1)
+def diario_del_proceso() -> Diario:
+    """Diario por defecto de este proceso (se carga una sola vez, no una por documento)."""
+    return Diario()
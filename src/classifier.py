@@ -20,6 +20,13 @@ CATEGORIAS_DEWEY = {
     "History and Geography": (["history", "war", "civilizations", "travel", "biography"], "900")
 }
 
+# Patrones de autoría, en orden de prioridad
+PATRONES_AUTOR = [
+    r"by ([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?: [A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)*)",
+    r"autor: ([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?: [A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)*)",
+    r"escrito por:? ([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?: [A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)*)"
+]
+
 
 def clasificar_documento(texto: str) -> dict:
     """
@@ -64,15 +71,73 @@ def extraer_autor(texto: str) -> str:
     """
     Busca patrones comunes de autoría.
     """
-    patrones = [
-        r"by ([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?: [A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)*)",
-        r"autor: ([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?: [A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)*)",
-        r"escrito por:? ([A-ZÁÉÍÓÚÑ][a-záéíóúñ]+(?: [A-ZÁÉÍÓÚÑ][a-záéíóúñ]+)*)"
-    ]
-
-    for patron in patrones:
+    for patron in PATRONES_AUTOR:
         match = re.search(patron, texto, re.IGNORECASE)
         if match:
             return match.group(1)
 
     return "Autor desconocido"
+
+
+# ===============================
+# 🌊 Clasificación incremental (streaming)
+# ===============================
+def iniciar_clasificacion() -> dict:
+    """
+    Crea el estado para clasificar un documento fragmento a fragmento.
+
+    Solo guarda lo imprescindible: las categorías ya encontradas, las
+    primeras 10 líneas (para el título) y el primer autor por patrón.
+    """
+    return {"categorias": set(), "lineas": [], "autores": {}}
+
+
+def observar_fragmento(estado: dict, fragmento: str) -> None:
+    """
+    Actualiza el estado de clasificación con un nuevo fragmento.
+
+    Se asume que los fragmentos se cortan en saltos de línea (como los de
+    `limpiar_paginas`/`enriquecer_paginas`), así que ninguna palabra ni
+    autor queda partido entre dos fragmentos.
+    """
+    normalizado = normalizar_texto(fragmento)
+    for categoria, (palabras, _) in CATEGORIAS_DEWEY.items():
+        if categoria in estado["categorias"]:
+            continue
+        if any(re.search(rf"\b{palabra}\b", normalizado) for palabra in palabras):
+            estado["categorias"].add(categoria)
+
+    if len(estado["lineas"]) < 10:
+        lineas = fragmento.splitlines()
+        if estado["lineas"] and fragmento.startswith("\n"):
+            lineas = lineas[1:]  # el separador inicial no es una línea del texto
+        estado["lineas"].extend(lineas[:10 - len(estado["lineas"])])
+
+    for i, patron in enumerate(PATRONES_AUTOR):
+        if i in estado["autores"]:
+            continue
+        match = re.search(patron, fragmento, re.IGNORECASE)
+        if match:
+            estado["autores"][i] = match.group(1)
+
+
+def cerrar_clasificacion(estado: dict) -> dict:
+    """Devuelve el mismo dict que `clasificar_documento` a partir del estado acumulado."""
+    categoria, dewey = "General Works", "000"
+    for nombre, (_, codigo) in CATEGORIAS_DEWEY.items():
+        if nombre in estado["categorias"]:
+            categoria, dewey = nombre, codigo
+            break
+
+    autor = "Autor desconocido"
+    for i in range(len(PATRONES_AUTOR)):
+        if i in estado["autores"]:
+            autor = estado["autores"][i]
+            break
+
+    return {
+        "categoria": categoria,
+        "dewey": dewey,
+        "titulo": extraer_titulo("\n".join(estado["lineas"])),
+        "autor": autor
+    }
@@ -91,3 +91,36 @@ def limpiar_texto_completo(texto, modo_md=False, filtrar_ruido=True):
     if modo_md:
         texto = agregar_markdown_headers(texto)
     return texto
+
+# 🔹 7. Variante en streaming: limpia página a página
+def limpiar_paginas(paginas, modo_md=False, filtrar_ruido=True):
+    """
+    Aplica `limpiar_texto_completo` a un flujo de páginas y produce fragmentos
+    que, concatenados, equivalen a limpiar el documento entero.
+
+    Cada fragmento (salvo el primero) empieza con el separador que la limpieza
+    completa habría dejado entre páginas: '\\n\\n' si una frase termina y la
+    siguiente página empieza en mayúscula, '\\n' en otro caso.
+    Solo se guarda el último carácter de la página anterior.
+
+    Args:
+        paginas (Iterable[str]): Texto crudo de cada página.
+        modo_md (bool): Si True, convierte encabezados en ## estilo Markdown.
+        filtrar_ruido (bool): Si True, elimina líneas de bajo valor visual.
+
+    Yields:
+        str: Fragmento limpio, con su separador inicial.
+    """
+    ultimo = None
+    for pagina in paginas:
+        texto = limpiar_texto_completo(pagina, modo_md=modo_md, filtrar_ruido=filtrar_ruido)
+        if not texto:
+            continue
+        if ultimo is None:
+            separador = ''
+        elif re.match(r'[a-z0-9\.\)]', ultimo) and re.match(r'[A-Z]', texto):
+            separador = '\n\n'
+        else:
+            separador = '\n'
+        ultimo = texto[-1]
+        yield separador + texto
@@ -0,0 +1,487 @@
+"""
+📬 cola.py – Cola de trabajos con *leases* para repartir documentos entre nodos
+
+Permite que varios `main.py` (en una o varias máquinas) compartan la misma
+carpeta `input/` y `output/` sin procesar dos veces el mismo PDF:
+
+    python main.py --cola --nodo escaner-1 --workers 4   # máquina A
+    python main.py --cola --nodo escaner-2 --workers 4   # máquina B
+
+Cada documento se identifica por su hash MD5 y su estado vive en archivos
+dentro de `output/cola/`:
+
+- `<hash>.lease`:    un nodo lo está procesando (nodo, token, expiración, intentos).
+- `<hash>.hecho`:    ya se exportó (nodo, carpeta, huella del pipeline). Una exportación
+                     degradada o con páginas sin OCR queda `incompleta` y se rehace.
+- `<hash>.intentos`: fallos acumulados; al llegar a `max_intentos` el documento queda `fallido`.
+
+Con `--force`, los `.hecho` e `.intentos` anteriores al arranque del nodo no cuentan.
+
+🧠 Decisiones de diseño:
+- Archivos y no SQLite: el bloqueo de SQLite no es fiable sobre NFS/SMB, mientras
+  que `O_CREAT | O_EXCL` y `rename` son atómicos en cualquier sistema de archivos
+  compartido razonable. El primer nodo que crea el `.lease` gana el documento.
+- El lease caduca: un nodo que muere (o pierde la red) deja de renovarlo y, pasada
+  `duracion_lease`, otro nodo lo reclama. Mientras procesa, un hilo lo renueva.
+- Cada reclamo lleva un token propio. Renovar, liberar, completar, contar un fallo
+  o robar un lease existente se hace bajo un cerrojo breve (`<hash>.cerrojo`,
+  también con `O_EXCL`) y solo si el token sigue siendo el del dueño: un nodo que
+  volvió tarde no pisa al nuevo ni escribe su `.hecho`.
+- Cada nodo solo reclama tantos documentos como workers libres tiene, para no
+  acaparar trabajo que otro nodo podría estar haciendo.
+- Los tiempos son de pared (`time.time()`): los nodos deben tener los relojes
+  sincronizados (NTP) con un desfase muy inferior a la duración del lease.
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+COLA_DIR = Path("output") / "cola"
+
+# Segundos que dura un lease sin renovar; se renueva cada tercio
+DURACION_LEASE = 120.0
+
+# Fallos tras los que un documento deja de reintentarse
+MAX_INTENTOS = 3
+
+# Un cerrojo más viejo que esto se considera abandonado por un proceso caído
+CADUCIDAD_CERROJO = 10.0
+
+# Espera entre pasadas cuando solo quedan documentos en manos de otros nodos
+INTERVALO_ESPERA = 1.0
+
+
+def nodo_por_defecto() -> str:
+    """Nombre del nodo: máquina y PID, único aunque haya varios procesos por máquina."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _escribir_atomico(ruta: Path, datos: dict):
+    """Escribe un JSON completo o nada: los demás nodos nunca leen un archivo a medias."""
+    temporal = ruta.with_name(f".{ruta.name}.{uuid.uuid4().hex}.tmp")
+    temporal.write_text(json.dumps(datos, ensure_ascii=False), encoding="utf-8")
+    os.replace(temporal, ruta)
+
+
+def _leer(ruta: Path) -> Optional[dict]:
+    try:
+        return json.loads(ruta.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+class ColaTrabajos:
+    """Estado compartido de los documentos de un lote, en una carpeta visible para todos los nodos."""
+
+    def __init__(
+        self,
+        carpeta: Path = None,
+        nodo: str = None,
+        duracion_lease: float = DURACION_LEASE,
+        max_intentos: int = MAX_INTENTOS,
+        desde: float = None
+    ):
+        self.carpeta = Path(carpeta or COLA_DIR)
+        self.carpeta.mkdir(parents=True, exist_ok=True)
+        self.nodo = nodo or nodo_por_defecto()
+        self.duracion_lease = duracion_lease
+        self.max_intentos = max_intentos
+        self.desde = desde  # con --force: los `.hecho` e `.intentos` anteriores a este instante no cuentan
+        self._tokens: Dict[str, str] = {}  # hash → token de los leases que tiene este nodo
+        self._candado = threading.Lock()
+
+    # ─────────────────────────────────────────────────────────
+    # 📁 Archivos de estado
+    # ─────────────────────────────────────────────────────────
+    def _ruta(self, hash_doc: str, sufijo: str) -> Path:
+        return self.carpeta / f"{hash_doc}.{sufijo}"
+
+    def _leer_vigente(self, hash_doc: str, sufijo: str) -> Optional[dict]:
+        """Contenido del archivo de estado, salvo que sea anterior a `desde`."""
+        datos = _leer(self._ruta(hash_doc, sufijo))
+        if datos and self.desde is not None and datos.get("timestamp", 0) < self.desde:
+            return None
+        return datos
+
+    def _intentos(self, hash_doc: str) -> int:
+        return (self._leer_vigente(hash_doc, "intentos") or {}).get("intentos", 0)
+
+    @contextmanager
+    def _cerrojo(self, hash_doc: str, espera: float = 5.0):
+        """
+        Exclusión mutua breve entre nodos para modificar un lease existente.
+        Lanza TimeoutError si no se obtiene en `espera` segundos.
+        """
+        ruta = self._ruta(hash_doc, "cerrojo")
+        limite = time.monotonic() + espera
+        while True:
+            try:
+                os.close(os.open(ruta, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - ruta.stat().st_mtime > CADUCIDAD_CERROJO:
+                        ruta.unlink()  # dueño caído a mitad de una operación de milisegundos
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.monotonic() > limite:
+                    raise TimeoutError(f"Cerrojo ocupado: {ruta}")
+                time.sleep(0.01)
+        try:
+            yield
+        finally:
+            try:
+                ruta.unlink()
+            except FileNotFoundError:
+                pass
+
+    def _nuevo_lease(self, hash_doc: str, ruta_pdf: str) -> dict:
+        token = uuid.uuid4().hex
+        return {
+            "hash": hash_doc,
+            "archivo": str(ruta_pdf),
+            "nodo": self.nodo,
+            "pid": os.getpid(),
+            "token": token,
+            "expira": time.time() + self.duracion_lease,
+            "intentos": self._intentos(hash_doc),
+        }
+
+    # ─────────────────────────────────────────────────────────
+    # 🔎 Consulta
+    # ─────────────────────────────────────────────────────────
+    def estado(self, hash_doc: str, huella: str = None) -> str:
+        """
+        Estado de un documento: `hecho`, `fallido`, `en_curso` (lease vigente) o `pendiente`.
+        Con `huella`, un `.hecho` de otra versión del pipeline no cuenta como hecho;
+        uno `incompleto` (degradado o con páginas sin OCR) o cuya carpeta de salida
+        ya no existe, nunca.
+        """
+        hecho = self._leer_vigente(hash_doc, "hecho")
+        if (hecho and not hecho.get("incompleta") and (huella is None or hecho.get("huella") == huella)
+                and hecho.get("carpeta") and Path(hecho["carpeta"]).exists()):
+            return "hecho"
+        if self._intentos(hash_doc) >= self.max_intentos:
+            return "fallido"
+        lease = _leer(self._ruta(hash_doc, "lease"))
+        if lease and lease.get("expira", 0) > time.time():
+            return "en_curso"
+        return "pendiente"
+
+    # ─────────────────────────────────────────────────────────
+    # 🔐 Reclamo, renovación y liberación
+    # ─────────────────────────────────────────────────────────
+    def reclamar(self, hash_doc: str, ruta_pdf: str, huella: str = None) -> bool:
+        """
+        Intenta tomar el documento para este nodo.
+
+        Returns:
+            True si el lease es de este nodo; False si está hecho, fallido o en manos de otro.
+        """
+        if self.estado(hash_doc, huella) in ("hecho", "fallido"):
+            return False
+        lease = self._nuevo_lease(hash_doc, ruta_pdf)
+        ruta = self._ruta(hash_doc, "lease")
+        try:
+            fd = os.open(ruta, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return self._robar_si_expiro(hash_doc, lease)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(lease, f, ensure_ascii=False)
+        # Otro nodo pudo terminarlo entre la consulta y la creación del lease
+        if self.estado(hash_doc, huella) == "hecho":
+            ruta.unlink()
+            return False
+        with self._candado:
+            self._tokens[hash_doc] = lease["token"]
+        return True
+
+    def _robar_si_expiro(self, hash_doc: str, lease: dict) -> bool:
+        ruta = self._ruta(hash_doc, "lease")
+        try:
+            with self._cerrojo(hash_doc, espera=0.5):
+                actual = _leer(ruta)
+                if actual is None:
+                    # Se liberó entre tanto, o quedó a medio escribir por un nodo caído
+                    if ruta.exists() and time.time() - ruta.stat().st_mtime < self.duracion_lease:
+                        return False
+                elif actual.get("expira", 0) > time.time():
+                    return False
+                _escribir_atomico(ruta, lease)
+        except (TimeoutError, FileNotFoundError):
+            return False
+        with self._candado:
+            self._tokens[hash_doc] = lease["token"]
+        return True
+
+    def _es_mio(self, hash_doc: str) -> Optional[dict]:
+        token = self._tokens.get(hash_doc)
+        actual = _leer(self._ruta(hash_doc, "lease"))
+        if token and actual and actual.get("token") == token:
+            return actual
+        return None
+
+    def renovar(self, hash_doc: str) -> bool:
+        """Extiende el lease. False si ya no es de este nodo (caducó y otro lo reclamó)."""
+        try:
+            with self._cerrojo(hash_doc):
+                actual = self._es_mio(hash_doc)
+                if actual is None:
+                    return False
+                actual["expira"] = time.time() + self.duracion_lease
+                _escribir_atomico(self._ruta(hash_doc, "lease"), actual)
+                return True
+        except TimeoutError:
+            return False
+
+    def _soltar(self, hash_doc: str, al_soltar: Callable[[], None] = None) -> bool:
+        """
+        Borra el lease si sigue siendo de este nodo, bajo el cerrojo del documento.
+        `al_soltar` se ejecuta antes, dentro del mismo cerrojo (p. ej. escribir `.hecho`).
+
+        Returns:
+            False si el lease ya no era de este nodo (caducó y otro lo reclamó).
+        """
+        with self._candado:
+            token = self._tokens.pop(hash_doc, None)
+        if token is None:
+            return False
+        try:
+            with self._cerrojo(hash_doc):
+                actual = _leer(self._ruta(hash_doc, "lease"))
+                if not actual or actual.get("token") != token:
+                    return False
+                if al_soltar:
+                    al_soltar()
+                self._ruta(hash_doc, "lease").unlink()
+                return True
+        except (TimeoutError, FileNotFoundError):
+            return False  # el lease caducará solo
+
+    def completar(self, hash_doc: str, resultado: dict = None, huella: str = None) -> bool:
+        """
+        Marca el documento como exportado y libera el lease.
+
+        Returns:
+            False si el lease ya no era de este nodo: el `.hecho` no se escribe y el
+            documento queda en manos del nodo que lo reclamó.
+        """
+        resultado = resultado or {}
+        return self._soltar(hash_doc, lambda: _escribir_atomico(self._ruta(hash_doc, "hecho"), {
+            "hash": hash_doc,
+            "nodo": self.nodo,
+            "archivo": resultado.get("archivo", ""),
+            "carpeta": str(resultado.get("carpeta", "")),
+            "huella": huella,
+            "incompleta": bool(resultado.get("degradado") or resultado.get("ocr_fallidas")),
+            "timestamp": time.time(),
+        }))
+
+    def fallar(self, hash_doc: str, error: str = "") -> bool:
+        """
+        Registra un fallo y libera el lease para que cualquier nodo lo reintente.
+        El contador se actualiza bajo el cerrojo del documento y solo si el lease
+        sigue siendo de este nodo.
+
+        Returns:
+            True si el documento se reintentará; False si agotó `max_intentos`.
+        """
+        intentos = None
+
+        def _contar():
+            nonlocal intentos
+            intentos = self._intentos(hash_doc) + 1
+            _escribir_atomico(self._ruta(hash_doc, "intentos"), {
+                "hash": hash_doc,
+                "intentos": intentos,
+                "nodo": self.nodo,
+                "error": error,
+                "timestamp": time.time(),
+            })
+
+        self._soltar(hash_doc, _contar)
+        # Sin lease no se cuenta nada: el nodo que lo tiene decide
+        return intentos is None or intentos < self.max_intentos
+
+    def liberar(self, hash_doc: str):
+        """Suelta el lease sin contar un fallo (p. ej. el nodo se detiene)."""
+        self._soltar(hash_doc)
+
+    @property
+    def reclamados(self) -> List[str]:
+        with self._candado:
+            return list(self._tokens)
+
+    @contextmanager
+    def renovando(self, intervalo: float = None):
+        """
+        Renueva en segundo plano todos los leases de este nodo mientras dura el bloque.
+        Al salir libera los que sigan reclamados (sin contarlos como fallo).
+        """
+        intervalo = intervalo or self.duracion_lease / 3
+        detener = threading.Event()
+
+        def _bucle():
+            while not detener.wait(intervalo):
+                for hash_doc in self.reclamados:
+                    if not self.renovar(hash_doc):
+                        print(f"⚠️ Lease perdido: {hash_doc} (otro nodo lo reclamó)")
+                        with self._candado:
+                            self._tokens.pop(hash_doc, None)
+
+        hilo = threading.Thread(target=_bucle, name="renovar-leases", daemon=True)
+        hilo.start()
+        try:
+            yield self
+        finally:
+            detener.set()
+            hilo.join()
+            for hash_doc in self.reclamados:
+                self.liberar(hash_doc)
+
+
+# ─────────────────────────────────────────────────────────────
+# 🏭 Procesamiento de un lote a través de la cola
+# ─────────────────────────────────────────────────────────────
+def procesar_lote_cola(
+    pendientes: List[Tuple[str, str]],
+    cola: ColaTrabajos,
+    workers: int = 1,
+    debug: bool = False,
+    al_terminar: Callable[[Dict[str, object]], None] = None,
+    opciones: Dict[str, object] = None,
+    huella: str = None
+) -> Tuple[List[Dict[str, object]], List[dict]]:
+    """
+    Procesa `pendientes` cooperando con otros nodos sobre la misma cola.
+
+    El nodo reclama un documento cada vez que tiene un worker libre; los que
+    tiene otro nodo se revisan de nuevo en la siguiente pasada (si ese nodo cae,
+    su lease caduca y se reclaman aquí). Un documento que falla se libera y se
+    reintenta, en este u otro nodo, hasta `cola.max_intentos`.
+
+    Args:
+        pendientes: [(ruta, hash)] como los devuelve `filtrar_pendientes()`.
+        cola: Cola compartida.
+        workers: Documentos simultáneos de este nodo.
+        al_terminar: Callback con cada resultado de este nodo (p. ej. anotar el manifest).
+        opciones: Opciones por documento (ver `procesar_con_registro()`).
+        huella: Huella del pipeline; un `.hecho` de otra versión no cuenta.
+
+    Returns:
+        (resultados de este nodo, omitidos como [{"archivo", "hash", "razon"}]: `otro_nodo`
+        si ya lo exportó otro nodo, `fallido` si agotó sus intentos en otro nodo o en una ejecución anterior)
+    """
+    from src.logger import log_evento
+    from src.pipeline import _compartir_contexto_logs, procesar_con_registro
+
+    resultados: List[Dict[str, object]] = []
+    omitidos: List[dict] = []
+    restantes = {}
+    for ruta, hash_doc in pendientes:
+        if hash_doc:
+            restantes[hash_doc] = str(ruta)
+        else:
+            # Sin hash (PDF ilegible) no hay forma de coordinarlo: el error se registra aquí
+            resultados.append(procesar_con_registro(str(ruta), debug, None, opciones))
+
+    def _cerrar(hash_doc, resultado):
+        if resultado.get("ok"):
+            if not cola.completar(hash_doc, resultado, huella):
+                # Lease perdido mientras se procesaba: el documento es del nodo que lo reclamó
+                log_evento("lease_perdido", archivo=resultado["archivo"], nodo=cola.nodo, nivel="WARNING")
+                del restantes[hash_doc]
+                return
+        elif cola.fallar(hash_doc, resultado.get("error", "")):
+            if debug:
+                print(f"🔁 {resultado['archivo']} falló; se reintentará")
+            return
+        del restantes[hash_doc]
+        resultados.append(resultado)
+        if al_terminar:
+            al_terminar(resultado)
+
+    def _fallido(hash_doc, e):
+        ruta = restantes[hash_doc]
+        log_evento("error_parse", archivo=ruta, nivel="ERROR", mensaje=str(e))
+        return {"archivo": ruta, "ok": False, "error": str(e) or type(e).__name__}
+
+    pool = None
+    if workers > 1:
+        _compartir_contexto_logs()
+        pool = ProcessPoolExecutor(max_workers=workers)
+    en_vuelo = {}
+
+    with cola.renovando():
+        try:
+            while restantes or en_vuelo:
+                reclamado, roto = False, None
+                for hash_doc, ruta in list(restantes.items()):
+                    if len(en_vuelo) >= workers:
+                        break
+                    if hash_doc in en_vuelo.values():
+                        continue
+                    estado = cola.estado(hash_doc, huella)
+                    if estado == "hecho":
+                        omitidos.append({"archivo": ruta, "hash": hash_doc, "razon": "otro_nodo"})
+                        del restantes[hash_doc]
+                        continue
+                    if estado == "fallido":
+                        omitidos.append({"archivo": ruta, "hash": hash_doc, "razon": "fallido"})
+                        del restantes[hash_doc]
+                        continue
+                    if estado == "en_curso" or not cola.reclamar(hash_doc, ruta, huella):
+                        continue
+                    reclamado = True
+                    log_evento("reclamado", archivo=ruta, nodo=cola.nodo)
+                    if pool is None:
+                        _cerrar(hash_doc, procesar_con_registro(ruta, debug, hash_doc, opciones))
+                        continue
+                    try:
+                        en_vuelo[pool.submit(procesar_con_registro, ruta, debug, hash_doc, opciones)] = hash_doc
+                    except BrokenProcessPool as e:
+                        cola.liberar(hash_doc)  # no llegó a enviarse: no cuenta como intento
+                        roto = e
+                        break
+
+                if en_vuelo and roto is None:
+                    hechos, _ = wait(list(en_vuelo), timeout=INTERVALO_ESPERA, return_when=FIRST_COMPLETED)
+                    for futuro in hechos:
+                        hash_doc = en_vuelo.pop(futuro)
+                        try:
+                            resultado = futuro.result()
+                        except Exception as e:
+                            if isinstance(e, BrokenProcessPool):
+                                roto = e
+                            resultado = _fallido(hash_doc, e)
+                        _cerrar(hash_doc, resultado)
+                elif restantes and not reclamado and roto is None:
+                    # Todo lo que queda está en manos de otros nodos: se espera a que terminen o caduquen
+                    if debug:
+                        print(f"⏳ {len(restantes)} documentos en otros nodos; esperando...")
+                    time.sleep(INTERVALO_ESPERA)
+
+                if roto is not None:
+                    # Un worker murió (os._exit, OOM killer...) y el pool entero queda inservible:
+                    # cada documento en curso cuenta como un intento fallido (así un PDF que tumba
+                    # al worker acaba `fallido`) y el resto sigue en un pool nuevo.
+                    for hash_doc in list(en_vuelo.values()):
+                        _cerrar(hash_doc, _fallido(hash_doc, roto))
+                    en_vuelo.clear()
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool = ProcessPoolExecutor(max_workers=workers)
+        finally:
+            if pool:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+    return resultados, omitidos
@@ -0,0 +1,164 @@
+"""
+📂 documento.py – Un PDF, una sola lectura
+
+`DocumentoPDF` agrupa todo lo que el pipeline necesita abrir de un PDF:
+los bytes (leídos o mapeados en memoria una vez), su hash, el documento
+PyMuPDF y el documento pdfplumber. Cada pieza se crea la primera vez que
+se pide y se reutiliza en la sonda, la extracción, la rasterización para
+OCR y el hash.
+
+    with DocumentoPDF(ruta) as doc:
+        texto = extract_text(doc)
+        hash_doc = doc.hash_md5()
+
+🧠 Decisiones de diseño:
+- Por defecto los bytes se mapean con `mmap`: el sistema operativo los lee
+  una vez (útil en almacenamiento en red) y no ocupan memoria del proceso,
+  incluso con escaneos de varios GB. Si el mapeo no es posible (archivo
+  vacío, sistema de archivos sin soporte), se leen de una vez.
+- PyMuPDF se abre con `stream=` sobre esos mismos bytes; pdfplumber recibe
+  otro mapeo del mismo descriptor, con su propia posición de lectura.
+- Las funciones de `parser` y `ocr` aceptan una ruta o un `DocumentoPDF`;
+  `abrir_documento()` unifica ambos casos y solo cierra lo que abrió.
+- Poppler (pdf2image) es un binario externo y sigue leyendo desde la ruta.
+- pdfplumber se importa la primera vez que un documento lo pide.
+"""
+
+import hashlib
+import io
+import mmap
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Union
+
+import fitz  # PyMuPDF
+
+from src.utils import buscar_hash_en_cache, guardar_hash_en_cache
+
+
+class DocumentoPDF:
+    """Manejador de un PDF compartido por todas las etapas que lo leen."""
+
+    def __init__(self, ruta: Union[str, Path], usar_mmap: bool = True):
+        self.ruta = str(ruta)
+        self._archivo = open(self.ruta, "rb")
+        self.tamano = os.fstat(self._archivo.fileno()).st_size
+        self._mapas = []
+        self._datos = None
+        self._vista = None
+        self._fitz = None
+        self._plumber = None
+        self._hash = None
+        self.usar_mmap = usar_mmap and self.tamano > 0
+        self.sonda = None  # resultado de `sonda.sondear_pdf()`, reutilizado por las etapas siguientes
+
+    # ─────────────────────────────────────────────────────────
+    # 📥 Bytes
+    # ─────────────────────────────────────────────────────────
+    def _mapear(self) -> mmap.mmap:
+        mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        self._mapas.append(mapa)
+        return mapa
+
+    @property
+    def datos(self) -> memoryview:
+        """Bytes del PDF (sin copiar): un mapeo en memoria o el contenido leído una vez."""
+        if self._vista is None:
+            if self.usar_mmap:
+                try:
+                    self._datos = self._mapear()
+                except (OSError, ValueError):
+                    self.usar_mmap = False
+            if not self.usar_mmap:
+                self._archivo.seek(0)
+                self._datos = self._archivo.read()
+            self._vista = memoryview(self._datos)
+        return self._vista
+
+    def hash_md5(self) -> str:
+        """
+        Hash MD5 del PDF (mismo valor que `calcular_hash_md5`): sale de la caché
+        persistente si el archivo no cambió; si no, se calcula sobre los bytes ya cargados.
+        """
+        if self._hash is None:
+            st = os.fstat(self._archivo.fileno())
+            self._hash = buscar_hash_en_cache(st, "md5")
+            if not self._hash:
+                self._hash = hashlib.md5(self.datos).hexdigest()
+                guardar_hash_en_cache(st, "md5", self._hash)
+        return self._hash
+
+    # ─────────────────────────────────────────────────────────
+    # 📖 Documentos parseados
+    # ─────────────────────────────────────────────────────────
+    def fitz(self) -> fitz.Document:
+        """Documento PyMuPDF abierto sobre los bytes compartidos."""
+        if self._fitz is None:
+            self._fitz = fitz.open(stream=self.datos, filetype="pdf")
+        return self._fitz
+
+    def pdfplumber(self) -> "pdfplumber.PDF":
+        """Documento pdfplumber; conserva las páginas ya analizadas entre sonda y extracción."""
+        if self._plumber is None:
+            import pdfplumber  # se importa solo si algún documento lo necesita
+
+            if self.usar_mmap:
+                flujo = self._mapear()
+            else:
+                flujo = io.BytesIO(self.datos)
+            self._plumber = pdfplumber.open(flujo)
+        return self._plumber
+
+    # ─────────────────────────────────────────────────────────
+    # 🔒 Cierre
+    # ─────────────────────────────────────────────────────────
+    def cerrar(self):
+        if self._plumber is not None:
+            self._plumber.close()
+            self._plumber = None
+        if self._fitz is not None:
+            self._fitz.close()
+            self._fitz = None
+        if self._vista is not None:
+            try:
+                self._vista.release()
+            except BufferError:
+                pass  # PyMuPDF aún referencia los bytes; el recolector liberará el mapeo
+            self._vista = None
+        for mapa in self._mapas:
+            try:
+                mapa.close()
+            except BufferError:
+                pass
+        self._mapas = []
+        self._datos = None
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+        return False
+
+    def __repr__(self):
+        return f"DocumentoPDF({self.ruta!r})"
+
+
+@contextmanager
+def abrir_documento(ruta_o_doc: Union[str, Path, DocumentoPDF]) -> Iterator[DocumentoPDF]:
+    """
+    Devuelve un `DocumentoPDF` para una ruta o uno ya abierto.
+    Solo cierra el documento si lo abrió aquí.
+    """
+    if isinstance(ruta_o_doc, DocumentoPDF):
+        yield ruta_o_doc
+        return
+    with DocumentoPDF(ruta_o_doc) as doc:
+        yield doc
+
+
+def ruta_de(ruta_o_doc: Union[str, Path, DocumentoPDF]) -> str:
+    """Ruta en disco de una ruta o de un `DocumentoPDF` (para herramientas externas)."""
+    return ruta_o_doc.ruta if isinstance(ruta_o_doc, DocumentoPDF) else str(ruta_o_doc)
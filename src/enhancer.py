@@ -1,10 +1,12 @@
 import json
 import re
 import unicodedata
+from functools import lru_cache
 from pathlib import Path
-from typing import Callable, Tuple, Dict, List
+from typing import Callable, Tuple, Dict, List, Iterable, Iterator
 
 from src.enhancer_utils import acumular_stats, aplicar_diccionario
+from src.metricas import medir
 
 __all__ = [
     'reemplazar_cid_ascii',
@@ -16,6 +18,7 @@ __all__ = [
     'marcar_fragmentos_dudosos',
     'pipeline_hooked_enhancer',
     'enriquecer_texto',
+    'enriquecer_paginas',
     'acumular_stats'
 ]
 
@@ -93,6 +96,15 @@ def marcar_fragmentos_dudosos(texto: str) -> Tuple[str, Dict[str, int]]:
 
 # === Pipeline adaptativo ===
 
+@lru_cache(maxsize=8)
+def _cargar_diccionario(ruta: str, mtime_ns: int) -> Dict[str, str]:
+    """
+    Lee el diccionario OCR una sola vez por proceso; `mtime_ns` forma parte de la
+    clave para recargarlo si el archivo cambia (útil en procesos de larga vida).
+    """
+    return json.loads(Path(ruta).read_text(encoding='utf-8'))
+
+
 def pipeline_hooked_enhancer(
     texto: str,
     config: Dict[str, any]
@@ -125,32 +137,46 @@ def pipeline_hooked_enhancer(
     # Cargar diccionario OCR si existe
     dict_path = config.get('ocr_dict_path')
     if dict_path and Path(dict_path).exists():
-        diccionario = json.loads(Path(dict_path).read_text(encoding='utf-8'))
+        diccionario = _cargar_diccionario(str(dict_path), Path(dict_path).stat().st_mtime_ns)
         pasos.insert(0, lambda t: aplicar_diccionario(t, diccionario))
         intentos['<ocr_dict>'] = 0
 
     # Loop adaptativo
     cambios = True
     texto_actual = texto
-    while cambios:
-        cambios = False
-        for func in pasos:
-            nombre = getattr(func, '__name__', '<ocr_dict>')
-            if intentos.get(nombre, 0) >= max_intentos:
-                continue
-
-            texto_nuevo, stats = func(texto_actual)
-            impacto = sum(v for v in stats.values() if isinstance(v, (int, float)))
-            if impacto >= retry_umbral:
-                cambios = True
-                intentos[nombre] += 1
-                texto_actual = texto_nuevo
-                stats_global = acumular_stats(stats_global, stats)
+    vueltas = 0
+    with medir("enhancer", caracteres=len(texto)) as m:
+        while cambios:
+            cambios = False
+            vueltas += 1
+            for func in pasos:
+                nombre = getattr(func, '__name__', '<ocr_dict>')
+                if intentos.get(nombre, 0) >= max_intentos:
+                    continue
+
+                texto_nuevo, stats = func(texto_actual)
+                impacto = sum(v for v in stats.values() if isinstance(v, (int, float)))
+                if impacto >= retry_umbral:
+                    cambios = True
+                    intentos[nombre] += 1
+                    texto_actual = texto_nuevo
+                    stats_global = acumular_stats(stats_global, stats)
+        m.anotar(vueltas=vueltas)
 
     return texto_actual, stats_global
 
 # === Interfaz simple para main.py ===
 
+PASOS_POR_DEFECTO = [
+    reemplazar_cid_ascii,
+    reparar_encoding,
+    normalizar_unicode,
+    reparar_palabras_partidas,
+    reparar_cid,
+    reparar_ocr_simbolos,
+    marcar_fragmentos_dudosos
+]
+
 def enriquecer_texto(
     texto: str,
     archivo: str = None,
@@ -173,17 +199,8 @@ def enriquecer_texto(
         Solo texto enriquecido (por defecto),
         o (texto, estadísticas) si return_stats=True.
     """
-    default_steps = [
-        reemplazar_cid_ascii,
-        reparar_encoding,
-        normalizar_unicode,
-        reparar_palabras_partidas,
-        reparar_cid,
-        reparar_ocr_simbolos,
-        marcar_fragmentos_dudosos
-    ]
     cfg = config or {}
-    cfg.setdefault('pasos', default_steps)
+    cfg.setdefault('pasos', list(PASOS_POR_DEFECTO))
 
     if debug and archivo:
         print(f"🔍 [DEBUG] Pre-enriquecimiento ({archivo}): {texto[:200]}...")
@@ -194,3 +211,66 @@ def enriquecer_texto(
         print(f"🔍 [DEBUG] Post-enriquecimiento ({archivo}): {enriched[:200]}...")
 
     return (enriched, stats) if return_stats else enriched
+
+
+# === Variante en streaming ===
+
+# Máximo de caracteres retenidos entre fragmentos (unas cuatro páginas densas)
+MAX_PENDIENTE = 16_000
+
+def enriquecer_paginas(
+    fragmentos: Iterable[str],
+    config: Dict[str, any] = None,
+    stats: Dict[str, float] = None
+) -> Iterator[str]:
+    """
+    🌊 Enriquece un flujo de fragmentos (p. ej. páginas de `limpiar_paginas`)
+    sin reunir el documento completo.
+
+    El único estado entre fragmentos es la última línea de cada uno, que se
+    retiene y se antepone al siguiente: así una palabra partida entre páginas
+    ('pro-' / 'ducto') o un patrón cortado en el borde se repara igual que en
+    modo documento. Lo retenido nunca pasa de `MAX_PENDIENTE` caracteres: sin
+    un salto de línea seguro antes (una línea enorme, o solo líneas con guion),
+    se corta en el último blanco.
+
+    El umbral adaptativo (`retry_umbral`) está pensado para el documento entero;
+    evaluado por página descartaría casi todas las reparaciones, por eso aquí
+    su valor por defecto es 1 (se aplica toda reparación con al menos un hallazgo).
+
+    Args:
+        fragmentos: Fragmentos de texto en orden.
+        config: Igual que en `enriquecer_texto`.
+        stats: Dict opcional donde se acumulan las estadísticas de todos los fragmentos.
+
+    Yields:
+        Fragmentos enriquecidos que, concatenados, forman el texto final.
+    """
+    cfg = dict(config or {})
+    cfg.setdefault('pasos', list(PASOS_POR_DEFECTO))
+    cfg.setdefault('retry_umbral', 1)
+    pendiente = ''
+    for fragmento in fragmentos:
+        texto = pendiente + fragmento
+        corte = texto.rfind('\n')
+        # Si la línea anterior al corte termina en guion, el corte retrocede una línea más
+        while corte > 0 and texto[:corte].rstrip().endswith('-'):
+            corte = texto.rfind('\n', 0, corte)
+        if corte <= 0 and len(texto) > MAX_PENDIENTE:
+            corte = max(texto.rfind('\n'), texto.rfind(' '))
+            if corte <= 0:
+                corte = len(texto)
+        if corte <= 0:
+            pendiente = texto
+            continue
+        texto, pendiente = texto[:corte], texto[corte:]
+        # Copia de la lista de pasos: pipeline_hooked_enhancer puede insertar el diccionario OCR
+        enriched, paso_stats = pipeline_hooked_enhancer(texto, dict(cfg, pasos=list(cfg['pasos'])))
+        if stats is not None:
+            acumular_stats(stats, paso_stats)
+        yield enriched
+    if pendiente:
+        enriched, paso_stats = pipeline_hooked_enhancer(pendiente, dict(cfg, pasos=list(cfg['pasos'])))
+        if stats is not None:
+            acumular_stats(stats, paso_stats)
+        yield enriched
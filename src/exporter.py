@@ -2,12 +2,15 @@
 📦 exporter.py – Exportación estructurada y AI-ready para OpenPages Pipeline
 """
 from pathlib import Path
+from typing import Callable, Iterable, Iterator
 import json
 import re
+import shutil
 
-# Carpeta de salida base
+from src.utils import archivo_atomico
+
+# Carpeta de salida base (se crea al exportar el primer documento)
 OUTPUT_DIR = Path("output")
-OUTPUT_DIR.mkdir(exist_ok=True)
 
 # ────────────────────────────────────────────────
 # 🔣 Función de slugificación
@@ -33,10 +36,13 @@ def exportar_archivos(
     dewey: str,
     autor: str = "",
     hash_doc: str = ""
-):
+) -> Path:
     """
     Exporta el texto procesado en .txt, .md y .jsonl,
     dentro de output/{slug_tipo}/{slug_titulo}_{hash_doc}/
+
+    Returns:
+        La carpeta del documento exportado.
     """
     if not hash_doc:
         raise ValueError("Se requiere un hash único para la exportación por documento.")
@@ -55,12 +61,14 @@ def exportar_archivos(
     _guardar_txt(ruta_txt, texto)
     _guardar_md(ruta_md, texto, titulo, autor, categoria, dewey)
     _guardar_jsonl(ruta_jsonl, texto, hash_doc, categoria, dewey)
+    return carpeta
 
 # ────────────────────────────────────────────────
 # 📄 Helpers de guardado
+# (escritura atómica: una ejecución interrumpida no deja archivos a medias)
 # ────────────────────────────────────────────────
 def _guardar_txt(ruta: Path, texto: str):
-    with open(ruta, "w", encoding="utf-8") as f:
+    with archivo_atomico(ruta) as f:
         f.write(texto)
 
 def _guardar_md(ruta: Path, texto: str, titulo: str, autor: str, categoria: str, dewey: str):
@@ -72,12 +80,15 @@ def _guardar_md(ruta: Path, texto: str, titulo: str, autor: str, categoria: str,
         f"dewey: {dewey}\n"
         "---\n\n"
     )
-    with open(ruta, "w", encoding="utf-8") as f:
+    with archivo_atomico(ruta) as f:
         f.write(encabezado + texto)
 
 def _guardar_jsonl(ruta: Path, texto: str, hash_doc: str, categoria: str, dewey: str):
     parrafos = [p.strip() for p in texto.split("\n\n") if p.strip()]
-    with open(ruta, "w", encoding="utf-8") as f:
+    _escribir_parrafos_jsonl(ruta, parrafos, hash_doc, categoria, dewey)
+
+def _escribir_parrafos_jsonl(ruta: Path, parrafos: Iterable[str], hash_doc: str, categoria: str, dewey: str):
+    with archivo_atomico(ruta) as f:
         for i, p in enumerate(parrafos):
             linea = {
                 "id": hash_doc,
@@ -87,3 +98,86 @@ def _guardar_jsonl(ruta: Path, texto: str, hash_doc: str, categoria: str, dewey:
                 "dewey": dewey
             }
             f.write(json.dumps(linea, ensure_ascii=False) + "\n")
+
+
+# ────────────────────────────────────────────────
+# 🌊 Exportación en streaming (memoria acotada)
+# ────────────────────────────────────────────────
+def exportar_archivos_stream(
+    tipo: str,
+    fragmentos: Iterable[str],
+    hash_doc: str,
+    metadatos: Callable[[], dict]
+) -> Path:
+    """
+    Exporta .txt, .md y .jsonl sin tener nunca el texto completo en memoria.
+
+    1. Los fragmentos se escriben a medida que llegan en un .txt dentro de una
+       carpeta de trabajo `output/.parcial_{hash_doc}/`.
+    2. Agotado el flujo, `metadatos()` devuelve titulo/autor/categoria/dewey
+       (que dependen del documento entero).
+    3. El .md y el .jsonl se generan releyendo el .txt, y la carpeta se mueve
+       a su destino final `output/{slug_tipo}/{slug_titulo}_{hash_doc}/`.
+
+    Returns:
+        La carpeta del documento exportado.
+    """
+    if not hash_doc:
+        raise ValueError("Se requiere un hash único para la exportación por documento.")
+
+    parcial = OUTPUT_DIR / f".parcial_{hash_doc}"
+    if parcial.exists():
+        shutil.rmtree(parcial)
+    parcial.mkdir(parents=True)
+
+    ruta_txt = parcial / f"{hash_doc}.txt"
+    _guardar_txt_stream(ruta_txt, fragmentos)
+
+    meta = metadatos()
+    titulo = meta.get("titulo")
+    categoria = meta.get("categoria")
+    dewey = meta.get("dewey")
+    _guardar_md_desde_txt(parcial / f"{hash_doc}.md", ruta_txt, titulo, meta.get("autor"), categoria, dewey)
+    _escribir_parrafos_jsonl(parcial / f"{hash_doc}.jsonl", _iter_parrafos(ruta_txt), hash_doc, categoria, dewey)
+
+    carpeta = OUTPUT_DIR / slugify(tipo) / f"{slugify(titulo)}_{hash_doc}"
+    carpeta.parent.mkdir(parents=True, exist_ok=True)
+    if carpeta.exists():
+        shutil.rmtree(carpeta)
+    parcial.rename(carpeta)
+    return carpeta
+
+def _guardar_txt_stream(ruta: Path, fragmentos: Iterable[str]):
+    with open(ruta, "w", encoding="utf-8") as f:
+        for fragmento in fragmentos:
+            f.write(fragmento)
+
+def _guardar_md_desde_txt(ruta: Path, ruta_txt: Path, titulo: str, autor: str, categoria: str, dewey: str):
+    encabezado = (
+        "---\n"
+        f"titulo: {titulo or 'Sin título'}\n"
+        f"autor: {autor or 'Desconocido'}\n"
+        f"categoria: {categoria}\n"
+        f"dewey: {dewey}\n"
+        "---\n\n"
+    )
+    with open(ruta, "w", encoding="utf-8") as f, open(ruta_txt, encoding="utf-8") as origen:
+        f.write(encabezado)
+        shutil.copyfileobj(origen, f)
+
+def _iter_parrafos(ruta_txt: Path) -> Iterator[str]:
+    """Equivale a `texto.split("\n\n")` pero leyendo el archivo línea a línea."""
+    actual = []
+    with open(ruta_txt, encoding="utf-8") as f:
+        for linea in f:
+            linea = linea[:-1] if linea.endswith("\n") else linea
+            if linea == "":
+                parrafo = "\n".join(actual).strip()
+                if parrafo:
+                    yield parrafo
+                actual = []
+            else:
+                actual.append(linea)
+    parrafo = "\n".join(actual).strip()
+    if parrafo:
+        yield parrafo
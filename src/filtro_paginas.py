@@ -0,0 +1,178 @@
+"""
+🫥 filtro_paginas.py – Páginas que no necesitan pasar por Tesseract
+
+Los libros escaneados traen versos en blanco, hojas separadoras y láminas o
+páginas repetidas, y reconocer cada una cuesta segundos. Antes del OCR,
+`ocr.py` mira cada página en miniatura (escala de grises, `ANCHO_MINIATURA`
+píxeles de ancho, con PyMuPDF) y, con operaciones vectorizadas de NumPy:
+
+1. En blanco: sin variación (`DESVIACION_MIN`) o casi sin tinta (menos de
+   `FRACCION_TINTA_MIN` de píxeles mucho más oscuros que el fondo) → texto vacío.
+2. Repetida: su hash perceptual (pHash: DCT de la miniatura reducida a 32×32,
+   64 bits) está cerca del de una página ya reconocida en este proceso, del
+   mismo documento o de uno anterior → se reutiliza su texto. Con OCR en
+   paralelo (`ocr.iter_ocr_paralelo()`) revisa y recuerda el proceso que reparte
+   las páginas, no cada worker: las copias no se reconocen una vez por worker.
+
+El hash solo propone candidatas (distancia de Hamming ≤ `DISTANCIA_MAX_HASH`):
+dos páginas de texto corrido distintas pueden tener hashes cercanos. La
+repetición se confirma comparando las miniaturas reducidas: diferencia media
+≤ `DIFERENCIA_MEDIA_MAX` (ruido de escaneo) y ningún bloque con más de
+`DIFERENCIA_BLOQUE_MAX` (un número de página o una palabra distinta).
+
+🧠 Decisiones de diseño:
+- Activo por defecto; `activar(False)` o `PIPELINE_FILTRO_PAGINAS=0` lo
+  desactivan (también en los procesos hijos). Sin NumPy, no se omite nada.
+- Memoria acotada: se recuerdan las últimas `MAX_PAGINAS_VISTAS` páginas por
+  proceso (unos 22 KB cada una).
+- Páginas desplazadas o reencuadradas no cuentan como repetidas: se prefiere
+  reconocer de más a reutilizar el texto de otra página.
+"""
+
+import os
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Optional
+
+ACTIVO = os.getenv("PIPELINE_FILTRO_PAGINAS", "1") != "0"
+
+# Ancho de la miniatura en píxeles (~48 dpi en una página carta)
+ANCHO_MINIATURA = 400
+
+# En blanco: desviación de los grises por debajo de esto, o menos de esta fracción de
+# píxeles con tinta (más oscuros que el fondo en `CONTRASTE_TINTA` niveles). Un número
+# de página suelto queda por debajo; un pie de lámina ("Lámina 3" a 14 pt, ~0,0004), no.
+DESVIACION_MIN = 2.0
+CONTRASTE_TINTA = 80
+FRACCION_TINTA_MIN = 0.0001
+
+# Repetidas: candidatas por pHash y confirmación con la miniatura reducida a REJILLA × REJILLA.
+# Medido sobre la miniatura: páginas distintas, Hamming ≥ 14 y diferencia media ≥ 7; la misma
+# página con ruido de escaneo (σ = 8), media ~2,5 y bloque máx. ~12; "p. 3" frente a "p. 4", bloque ~38.
+DISTANCIA_MAX_HASH = 8
+REJILLA = 150
+DIFERENCIA_MEDIA_MAX = 3.0
+DIFERENCIA_BLOQUE_MAX = 24.0
+
+MAX_PAGINAS_VISTAS = 256
+
+# Páginas ya reconocidas en este proceso: {huella, reducida, lang, texto}
+_vistas = deque(maxlen=MAX_PAGINAS_VISTAS)
+
+np = None
+
+
+def activar(estado: bool = True) -> None:
+    """Activa/desactiva el filtro en este proceso y en los hijos que cree."""
+    global ACTIVO
+    ACTIVO = estado
+    os.environ["PIPELINE_FILTRO_PAGINAS"] = "1" if estado else "0"
+
+
+def _cargar_numpy() -> bool:
+    global np, ACTIVO
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            print("⚠️ NumPy no disponible: no se omiten páginas en blanco ni repetidas antes del OCR.")
+            ACTIVO = False
+            return False
+        np = numpy
+    return True
+
+
+def miniatura(pagina):
+    """Página de PyMuPDF en escala de grises, `ANCHO_MINIATURA` píxeles de ancho (float32)."""
+    import fitz  # PyMuPDF (ya cargado por `doc.fitz()`)
+
+    zoom = ANCHO_MINIATURA / (pagina.rect.width or ANCHO_MINIATURA)
+    pix = pagina.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False)
+    gris = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.stride)[:, :pix.width]
+    return gris.astype(np.float32)
+
+
+def es_pagina_en_blanco(gris) -> bool:
+    """True si la miniatura no tiene variación o casi no tiene tinta sobre su fondo."""
+    if gris.std() < DESVIACION_MIN:
+        return True
+    fondo = np.median(gris)
+    tinta = np.count_nonzero(gris < fondo - CONTRASTE_TINTA) / gris.size
+    return tinta < FRACCION_TINTA_MIN
+
+
+def _reducir(gris, filas: int, columnas: int):
+    """Media de la imagen por bloques: `filas` × `columnas` celdas."""
+    alto, ancho = gris.shape
+    ys = np.linspace(0, alto, filas + 1).astype(int)
+    xs = np.linspace(0, ancho, columnas + 1).astype(int)
+    sumas = np.add.reduceat(np.add.reduceat(gris, ys[:-1], axis=0), xs[:-1], axis=1)
+    return sumas / np.maximum(np.outer(np.diff(ys), np.diff(xs)), 1)
+
+
+@lru_cache(maxsize=1)
+def _base_dct(n: int = 32):
+    k = np.arange(n)
+    return np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * n))
+
+
+def huella_perceptual(gris) -> int:
+    """pHash de 64 bits: signo de las frecuencias bajas (8×8) de la DCT de la imagen a 32×32."""
+    base = _base_dct()
+    frecuencias = (base @ _reducir(gris, 32, 32) @ base.T)[:8, :8].ravel()
+    bits = frecuencias > np.median(frecuencias[1:])  # sin la componente continua
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def _distancias(huella: int, huellas):
+    """Distancia de Hamming entre `huella` y cada una de `huellas` (vectorizado)."""
+    xor = np.array(huellas, dtype=np.uint64) ^ np.uint64(huella)
+    return np.unpackbits(xor.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+def iguales(a: Dict[str, object], b: Dict[str, object]) -> bool:
+    """True si dos páginas revisadas (`revisar()`) son visualmente la misma."""
+    diferencia = np.abs(a["reducida"].astype(np.int16) - b["reducida"])
+    return diferencia.mean() <= DIFERENCIA_MEDIA_MAX and diferencia.max() <= DIFERENCIA_BLOQUE_MAX
+
+
+def revisar(pagina, lang: str = "eng") -> Optional[Dict[str, object]]:
+    """
+    Revisa una página antes del OCR.
+
+    Returns:
+        None si el filtro está inactivo; si no, dict con `clase` ("en blanco",
+        "repetida" o "nueva"), `texto` (el reutilizado, si es repetida) y lo necesario
+        para compararla con otras y recordarla (`iguales()`, `recordar()`).
+    """
+    if not ACTIVO or not _cargar_numpy():
+        return None
+    gris = miniatura(pagina)
+    if es_pagina_en_blanco(gris):
+        return {"clase": "en blanco", "texto": ""}
+    revision = {
+        "clase": "nueva",
+        "texto": None,
+        "lang": lang,
+        "huella": huella_perceptual(gris),
+        "reducida": np.rint(_reducir(gris, REJILLA, REJILLA)).astype(np.uint8),
+    }
+    candidatas = [vista for vista in _vistas if vista["lang"] == lang]
+    if candidatas:
+        cerca = _distancias(revision["huella"], [vista["huella"] for vista in candidatas]) <= DISTANCIA_MAX_HASH
+        for vista, es_candidata in zip(candidatas, cerca):
+            if es_candidata and iguales(revision, vista):
+                revision.update(clase="repetida", texto=vista["texto"])
+                break
+    return revision
+
+
+def recordar(revision: Optional[Dict[str, object]], texto: str) -> None:
+    """Guarda el texto reconocido de una página nueva para reutilizarlo en sus repeticiones."""
+    if revision and revision["clase"] == "nueva":
+        _vistas.append({**revision, "texto": texto})
+
+
+def olvidar() -> None:
+    """Vacía las páginas recordadas en este proceso."""
+    _vistas.clear()
@@ -20,7 +20,6 @@ import json
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
-from loguru import logger
 
 # ─────────────────────────────────────────────────────────────
 # 🌍 Diccionario multilenguaje con emojis amigables
@@ -50,9 +49,37 @@ MENSAJES = {
         "es": "❌ Error procesando archivo: {archivo}",
         "en": "❌ Error processing file: {archivo}"
     },
+    "omitido": {
+        "es": "⏭️ Omitido (ya exportado): {archivo}",
+        "en": "⏭️ Skipped (already exported): {archivo}"
+    },
+    "reanudado": {
+        "es": "💾 Reanudado desde el checkpoint: {archivo}",
+        "en": "💾 Resumed from checkpoint: {archivo}"
+    },
+    "reintento_degradado": {
+        "es": "🩹 Reintentando en modo degradado: {archivo}",
+        "en": "🩹 Retrying in degraded mode: {archivo}"
+    },
+    "reclamado": {
+        "es": "📬 Documento reclamado por este nodo: {archivo}",
+        "en": "📬 Document claimed by this node: {archivo}"
+    },
+    "colas_etapas": {
+        "es": "📦 Profundidad de colas por etapa registrada",
+        "en": "📦 Per-stage queue depth recorded"
+    },
+    "metricas_ejecucion": {
+        "es": "⏱️ Métricas por etapa registradas",
+        "en": "⏱️ Per-stage metrics recorded"
+    },
     "archivo_inaccesible": {
         "es": "❌ Archivo inaccesible o corrupto: {archivo}",
         "en": "❌ Unreadable or corrupt file: {archivo}"
+    },
+    "ocr_fallido": {
+        "es": "⚠️ Páginas sin OCR, queda pendiente de reintento: {archivo}",
+        "en": "⚠️ Pages without OCR, left pending for retry: {archivo}"
     }
 }
 
@@ -64,24 +91,39 @@ LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 EXECUTION_ID = os.getenv("EXECUTION_ID", uuid.uuid4().hex)
 
 LOGS_DIR = Path("output/logs")
-LOGS_DIR.mkdir(parents=True, exist_ok=True)
 
-timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+# LOG_TIMESTAMP permite que varios procesos de una misma ejecución compartan archivos de log
+timestamp = os.getenv("LOG_TIMESTAMP") or datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
 global_log_txt = LOGS_DIR / f"run_{timestamp}.log"
 global_log_jsonl = LOGS_DIR / f"run_{timestamp}.jsonl"
 
-logger.remove()
-logger.add(global_log_txt, level=LOG_LEVEL, format="{time} | {level} | {message}")
-logger.add(global_log_jsonl, serialize=True, level=LOG_LEVEL)
+# loguru y la carpeta de logs se preparan con el primer evento, no al importar:
+# `main.py --help` o una ejecución sin PDFs no crean archivos ni cargan loguru.
+logger = None
+
+
+def _preparar_logs():
+    """Crea la carpeta de logs y configura loguru la primera vez que se registra algo."""
+    global logger
+    if logger is not None:
+        return
+    LOGS_DIR.mkdir(parents=True, exist_ok=True)
+    from loguru import logger as _loguru
+    _loguru.remove()
+    _loguru.add(global_log_txt, level=LOG_LEVEL, format="{time} | {level} | {message}")
+    _loguru.add(global_log_jsonl, serialize=True, level=LOG_LEVEL)
+    logger = _loguru
 
 # ─────────────────────────────────────────────────────────────
 # 🧩 log_evento(): para eventos generales (pipeline, errores)
 # ─────────────────────────────────────────────────────────────
 def log_evento(evento: str, archivo: str = "", categoria: str = "", dewey: str = "", nivel: str = "INFO", **extra) -> str:
     """
-    Registra un evento general en consola, archivo .log y .jsonl
+    Registra un evento general en consola, archivo .log y .jsonl.
+    Los argumentos extra se agregan como campos del evento en el .jsonl.
     """
     global LANG
+    _preparar_logs()
     LANG = os.getenv("LANG", "es")
     idioma = MENSAJES.get(evento, {}).get(LANG, evento)
     mensaje = idioma.format(archivo=archivo, categoria=categoria, dewey=dewey)
@@ -95,6 +137,9 @@ def log_evento(evento: str, archivo: str = "", categoria: str = "", dewey: str =
         "dewey": dewey,
         "nivel": nivel.upper(),
     }
+    # Campos adicionales (razón, mensaje de error, métricas...) solo van al log estructurado
+    for clave, valor in extra.items():
+        log_data.setdefault(clave, valor)
 
     # Visual amigable
     print(mensaje)
@@ -108,7 +153,7 @@ def log_evento(evento: str, archivo: str = "", categoria: str = "", dewey: str =
     # Log estructurado
     try:
         with open(global_log_jsonl, "a", encoding="utf-8") as f:
-            f.write(json.dumps(log_data) + "\n")
+            f.write(json.dumps(log_data, default=str) + "\n")
     except Exception as e:
         print(f"❌ Error escribiendo log estructurado: {e}")
 
@@ -123,6 +168,34 @@ def log_evento(evento: str, archivo: str = "", categoria: str = "", dewey: str =
 
     return mensaje
 
+# ─────────────────────────────────────────────────────────────
+# ⏱️ log_metricas(): mediciones por etapa (solo al .jsonl, sin ruido en consola)
+# ─────────────────────────────────────────────────────────────
+def log_metricas(archivo: str, registros: list, evento: str = "metrica_etapa"):
+    """
+    Escribe una línea `metrica_etapa` por cada medición de `src.metricas`
+    en el log estructurado de la ejecución. Con `evento` se reutiliza para otras
+    mediciones sin salida por consola (p. ej. las estimaciones del planificador).
+    """
+    if not registros:
+        return
+    _preparar_logs()
+    ahora = datetime.now(timezone.utc).isoformat()
+    try:
+        with open(global_log_jsonl, "a", encoding="utf-8") as f:
+            for registro in registros:
+                log_data = {
+                    "timestamp": ahora,
+                    "ejecucion": EXECUTION_ID,
+                    "evento": evento,
+                    "archivo": archivo,
+                    "nivel": "DEBUG",
+                }
+                log_data.update(registro)
+                f.write(json.dumps(log_data, default=str) + "\n")
+    except Exception as e:
+        print(f"❌ Error escribiendo métricas: {e}")
+
 # ─────────────────────────────────────────────────────────────
 # 🧬 log_validacion(): eventos semánticos AI-ready
 # ─────────────────────────────────────────────────────────────
@@ -140,6 +213,8 @@ def log_validacion(evento: str, error_code: str, severity: str, zone: str, archi
         print(f"❌ Razones vacías o mal formateadas para {evento}")
         return
 
+    _preparar_logs()
+
     log_data = {
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "ejecucion": EXECUTION_ID,
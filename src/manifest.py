@@ -0,0 +1,188 @@
+"""
+🗂️ manifest.py – Registro persistente de documentos ya exportados
+
+Permite ejecuciones incrementales: cada documento exportado se anota en
+`output/manifest.jsonl` con su hash MD5 y la huella de la versión del pipeline
+que lo produjo. En la siguiente ejecución, un PDF cuyo hash ya figura con la
+misma huella (y cuya carpeta de salida sigue existiendo) se omite.
+
+🧬 Formato:
+- Un JSON por línea, solo se agregan líneas (append-only). Si un hash aparece
+  varias veces, gana la última línea. Al cargarlo, si sobran líneas (repetidas
+  o corruptas), se reescribe de forma atómica con la última de cada hash.
+- La huella cambia al modificar cualquier gen que altere la salida
+  (sonda, parser, OCR y su motor y filtro de páginas, limpieza, enriquecimiento,
+  clasificación, exportación) y con las opciones de ejecución que cambian el
+  texto (`--motor-ocr`/`PIPELINE_MOTOR_OCR`, `--no-filtro-ocr`, idioma del OCR).
+"""
+
+import hashlib
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from src.utils import archivo_atomico, calcular_hash_md5
+
+MANIFEST_PATH = Path("output") / "manifest.jsonl"
+
+# Versión lógica del pipeline; subirla invalida todas las exportaciones previas
+PIPELINE_VERSION = "V3.R2"
+
+# Genes cuyo código determina el contenido exportado (incluida la decisión de OCR,
+# el motor, el filtro de páginas y el reparto por rangos, que cambian el texto)
+MODULOS_HUELLA = [
+    "documento", "sonda", "parser", "rangos", "ocr", "motores_ocr", "filtro_paginas",
+    "cleaner", "enhancer", "enhancer_utils", "classifier", "exporter",
+]
+
+
+def ajustes_huella() -> Dict[str, object]:
+    """Opciones de ejecución de este proceso que cambian el texto exportado."""
+    from src import filtro_paginas, motores_ocr
+    from src.parser import LANG_OCR
+
+    return {"motor_ocr": motores_ocr.MOTOR, "filtro_paginas": filtro_paginas.ACTIVO, "lang_ocr": LANG_OCR}
+
+
+def huella_pipeline(carpeta: Path = None, ajustes: Dict[str, object] = None) -> str:
+    """
+    Calcula la huella de la versión del pipeline: MD5 de `PIPELINE_VERSION`,
+    el código fuente de los genes listados en `MODULOS_HUELLA` (en `carpeta`,
+    por defecto la de este módulo) y los `ajustes` de ejecución (por defecto,
+    los actuales de `ajustes_huella()`).
+    """
+    base = Path(carpeta) if carpeta else Path(__file__).resolve().parent
+    h = hashlib.md5(PIPELINE_VERSION.encode("utf-8"))
+    for nombre in MODULOS_HUELLA:
+        ruta = base / f"{nombre}.py"
+        if ruta.exists():
+            h.update(ruta.read_bytes())
+    ajustes = ajustes_huella() if ajustes is None else ajustes
+    h.update(json.dumps(ajustes, sort_keys=True, default=str).encode("utf-8"))
+    return h.hexdigest()
+
+
+def cargar_manifest(ruta: Path = None, compactar: bool = True) -> Dict[str, dict]:
+    """
+    Carga el manifest como dict {hash: entrada}. Tolera líneas corruptas
+    (p. ej. una ejecución interrumpida a mitad de escritura).
+
+    Con `compactar`, si el archivo tiene líneas de más (hashes repetidos o
+    corruptas), se reescribe de forma atómica con la última entrada de cada
+    hash. No debe compactarse con otros procesos escribiendo (p. ej. `--cola`).
+    """
+    manifest = {}
+    ruta = Path(ruta or MANIFEST_PATH)
+    if not ruta.exists():
+        return manifest
+    lineas = 0
+    with open(ruta, encoding="utf-8") as f:
+        for linea in f:
+            lineas += 1
+            try:
+                entrada = json.loads(linea)
+                manifest[entrada["hash"]] = entrada
+            except (json.JSONDecodeError, KeyError, TypeError):
+                continue
+    if compactar and lineas > len(manifest):
+        with archivo_atomico(ruta) as f:
+            f.writelines(json.dumps(entrada, ensure_ascii=False) + "\n" for entrada in manifest.values())
+    return manifest
+
+
+def registrar_exportacion(
+    manifest: Dict[str, dict],
+    resultado: dict,
+    huella: str,
+    ruta: Path = None
+) -> dict:
+    """
+    Agrega al manifest (memoria y disco) el resultado de un documento exportado.
+
+    Args:
+        manifest: Manifest cargado con `cargar_manifest()`.
+        resultado: Resultado de `procesar_documento()` (requiere `hash` y `carpeta`).
+        huella: Huella del pipeline con que se exportó.
+        ruta: Archivo del manifest (por defecto `MANIFEST_PATH`).
+
+    Returns:
+        La entrada registrada.
+    """
+    entrada = {
+        "hash": resultado["hash"],
+        "huella": huella,
+        "archivo": resultado.get("archivo", ""),
+        "carpeta": str(resultado.get("carpeta", "")),
+        "categoria": resultado.get("categoria", ""),
+        "dewey": resultado.get("dewey", ""),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+    if resultado.get("degradado"):
+        entrada["degradado"] = True
+    if resultado.get("ocr_fallidas"):
+        entrada["ocr_fallidas"] = resultado["ocr_fallidas"]
+    ruta = Path(ruta or MANIFEST_PATH)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    with open(ruta, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+    manifest[entrada["hash"]] = entrada
+    return entrada
+
+
+def esta_vigente(manifest: Dict[str, dict], hash_doc: str, huella: str) -> bool:
+    """
+    True si el hash ya se exportó con esta misma huella y su carpeta sigue en disco.
+    Una exportación degradada (reintento barato tras agotar el presupuesto) o con
+    páginas cuyo OCR falló no cuenta: la siguiente ejecución vuelve a intentar la
+    extracción completa.
+    """
+    entrada = manifest.get(hash_doc)
+    if not entrada or entrada.get("huella") != huella or entrada.get("degradado") or entrada.get("ocr_fallidas"):
+        return False
+    carpeta = entrada.get("carpeta")
+    return bool(carpeta) and Path(carpeta).exists()
+
+
+def filtrar_pendientes(
+    rutas: Iterable[str],
+    manifest: Dict[str, dict],
+    huella: str,
+    forzar: bool = False
+) -> Tuple[List[Tuple[str, str]], List[dict]]:
+    """
+    Separa los PDFs que deben procesarse de los que pueden omitirse.
+
+    Se omiten:
+    - `sin_cambios`: el hash ya está exportado con la huella actual.
+    - `duplicado`: otro archivo de este mismo lote tiene idéntico contenido.
+
+    Args:
+        rutas: Rutas de los PDFs encontrados.
+        manifest: Manifest cargado.
+        huella: Huella actual del pipeline.
+        forzar: Si True, solo se descartan duplicados dentro del lote.
+
+    Returns:
+        (pendientes como [(ruta, hash)], omitidos como [{"archivo", "hash", "razon"}])
+    """
+    pendientes = []
+    omitidos = []
+    vistos = set()
+    for ruta in rutas:
+        ruta = str(ruta)
+        try:
+            hash_doc = calcular_hash_md5(ruta)
+        except OSError:
+            # Se deja pasar: el pipeline registrará el error del documento
+            pendientes.append((ruta, None))
+            continue
+        if hash_doc in vistos:
+            omitidos.append({"archivo": ruta, "hash": hash_doc, "razon": "duplicado"})
+            continue
+        vistos.add(hash_doc)
+        if not forzar and esta_vigente(manifest, hash_doc, huella):
+            omitidos.append({"archivo": ruta, "hash": hash_doc, "razon": "sin_cambios"})
+            continue
+        pendientes.append((ruta, hash_doc))
+    return pendientes, omitidos
@@ -0,0 +1,232 @@
+"""
+⏱️ metricas.py – Instrumentación por etapa: tiempos, bytes, páginas y caracteres
+
+Responde a la pregunta "¿en qué se fue el tiempo de esta ejecución?":
+sonda de complejidad, pdfplumber, PyMuPDF, OCR, bucle adaptativo del enhancer,
+exportación...
+
+Uso:
+
+    with medir("pdfplumber", bytes=tamano) as m:
+        texto = ...
+        m.anotar(paginas=n, caracteres=len(texto))
+
+🧠 Decisiones de diseño:
+- Desactivadas por defecto. Con `ACTIVAS = False`, `medir()` devuelve siempre
+  el mismo objeto nulo: el coste es una llamada y una comparación.
+- Se activan con `activar()` o con la variable de entorno `PIPELINE_METRICAS=1`
+  (así los procesos hijos heredan la decisión).
+- Cada hilo acumula sus registros; `documento()` delimita los de un PDF para
+  que viajen con su resultado hasta el proceso coordinador.
+- El tiempo de CPU es el del proceso e incluye a sus hijos ya terminados
+  (p. ej. tesseract); con varios hilos trabajando a la vez es aproximado.
+"""
+
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List
+
+ACTIVAS = os.getenv("PIPELINE_METRICAS", "0") == "1"
+
+# Registros y documento en curso, por hilo (el pipeline async exporta desde varios hilos)
+_local = threading.local()
+
+
+def _estado():
+    if not hasattr(_local, "registros"):
+        _local.registros = []
+        _local.documento = ""
+    return _local
+
+
+def activar(estado: bool = True) -> None:
+    """Activa/desactiva la instrumentación en este proceso y en los hijos que cree."""
+    global ACTIVAS
+    ACTIVAS = estado
+    os.environ["PIPELINE_METRICAS"] = "1" if estado else "0"
+
+
+def _cpu() -> float:
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+class _MedicionNula:
+    """Sustituto sin coste cuando las métricas están desactivadas."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def anotar(self, **datos):
+        pass
+
+    def anotar_archivo(self, ruta):
+        pass
+
+
+_NULA = _MedicionNula()
+
+
+class _Medicion:
+    __slots__ = ("etapa", "datos", "_t0", "_c0")
+
+    def __init__(self, etapa: str, datos: dict):
+        self.etapa = etapa
+        self.datos = datos
+
+    def __enter__(self):
+        self._c0 = _cpu()
+        self._t0 = time.perf_counter()
+        return self
+
+    def anotar(self, **datos):
+        """Agrega contadores a la medición en curso (bytes, paginas, caracteres...)."""
+        self.datos.update(datos)
+
+    def anotar_archivo(self, ruta):
+        """Anota el tamaño en bytes de `ruta` (solo se consulta con las métricas activas)."""
+        try:
+            self.datos["bytes"] = os.path.getsize(ruta)
+        except OSError:
+            pass
+
+    def __exit__(self, tipo, valor, traza):
+        estado = _estado()
+        registro = {
+            "etapa": self.etapa,
+            "documento": estado.documento,
+            "wall_s": round(time.perf_counter() - self._t0, 6),
+            "cpu_s": round(_cpu() - self._c0, 6),
+            "ok": tipo is None,
+        }
+        registro.update(self.datos)
+        estado.registros.append(registro)
+        return False
+
+
+def medir(etapa: str, **datos):
+    """Context manager que mide una etapa; no hace nada si las métricas están desactivadas."""
+    if not ACTIVAS:
+        return _NULA
+    return _Medicion(etapa, datos)
+
+
+@contextmanager
+def documento(ruta: str):
+    """
+    Delimita las mediciones de un documento y las entrega al salir.
+
+        with documento(ruta) as registros:
+            ...
+        resultado["metricas"] = registros
+    """
+    estado = _estado()
+    anterior, estado.documento = estado.documento, ruta
+    inicio = len(estado.registros)
+    propios: List[dict] = []
+    try:
+        yield propios
+    finally:
+        propios.extend(estado.registros[inicio:])
+        del estado.registros[inicio:]
+        estado.documento = anterior
+
+
+def ejecutar_medido(ruta: str, funcion, *args, **kwargs):
+    """
+    Ejecuta `funcion` dentro de `documento(ruta)`; pensado para correr en otro
+    proceso y devolver juntos el resultado y sus mediciones.
+
+    Returns:
+        (resultado, registros)
+    """
+    with documento(ruta) as registros:
+        resultado = funcion(*args, **kwargs)
+    return resultado, registros
+
+
+# ─────────────────────────────────────────────────────────────
+# 📊 Resumen de fin de ejecución
+# ─────────────────────────────────────────────────────────────
+def _percentil(valores: List[float], p: float) -> float:
+    """Percentil por rango más cercano (sin dependencias externas)."""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    k = max(0, min(len(ordenados) - 1, math.ceil(p / 100 * len(ordenados)) - 1))
+    return ordenados[k]
+
+
+def resumir(registros: Iterable[dict], duracion_s: float, documentos: int) -> Dict[str, object]:
+    """
+    Agrega las mediciones por etapa.
+
+    Returns:
+        {"etapas": {etapa: {n, p50_s, p95_s, max_s, total_s, cpu_s, paginas}},
+         "paginas", "docs_s", "paginas_s", "duracion_s", "omitidas_ocr"}
+        (`omitidas_ocr`: páginas en blanco y repetidas que no pasaron por el motor de OCR)
+    """
+    por_etapa: Dict[str, List[dict]] = {}
+    paginas_doc: Dict[str, int] = {}
+    for registro in registros:
+        por_etapa.setdefault(registro["etapa"], []).append(registro)
+        # Varias etapas cuentan las mismas páginas: se toma el máximo por documento
+        doc = registro.get("documento", "")
+        paginas_doc[doc] = max(paginas_doc.get(doc, 0), registro.get("paginas", 0))
+
+    etapas = {}
+    for etapa, lista in por_etapa.items():
+        tiempos = [r["wall_s"] for r in lista]
+        etapas[etapa] = {
+            "n": len(lista),
+            "p50_s": round(_percentil(tiempos, 50), 4),
+            "p95_s": round(_percentil(tiempos, 95), 4),
+            "max_s": round(max(tiempos), 4),
+            "total_s": round(sum(tiempos), 4),
+            "cpu_s": round(sum(r["cpu_s"] for r in lista), 4),
+            "paginas": sum(r.get("paginas", 0) for r in lista),
+        }
+
+    paginas = sum(paginas_doc.values())
+    duracion_s = max(duracion_s, 1e-9)
+    ocr = por_etapa.get("ocr", [])
+    return {
+        "etapas": etapas,
+        "paginas": paginas,
+        "duracion_s": round(duracion_s, 3),
+        "docs_s": round(documentos / duracion_s, 3),
+        "paginas_s": round(paginas / duracion_s, 3),
+        "omitidas_ocr": {
+            clave: sum(r.get(clave, 0) for r in ocr) for clave in ("paginas_en_blanco", "paginas_repetidas")
+        },
+    }
+
+
+def formatear_tabla(resumen: Dict[str, object]) -> str:
+    """Tabla de texto para la consola, junto al "Resumen del Pipeline"."""
+    lineas = [
+        "⏱️ Tiempos por etapa:",
+        f"  {'etapa':<18}{'n':>5}{'p50 (s)':>10}{'p95 (s)':>10}{'máx (s)':>10}{'CPU (s)':>10}",
+    ]
+    for etapa, d in sorted(resumen["etapas"].items(), key=lambda e: -e[1]["total_s"]):
+        lineas.append(
+            f"  {etapa:<18}{d['n']:>5}{d['p50_s']:>10.3f}{d['p95_s']:>10.3f}{d['max_s']:>10.3f}{d['cpu_s']:>10.2f}"
+        )
+    lineas.append(
+        f"  ⚡ {resumen['docs_s']} docs/s | {resumen['paginas_s']} páginas/s | {resumen['duracion_s']} s en total"
+    )
+    omitidas = resumen.get("omitidas_ocr", {})
+    if any(omitidas.values()):
+        lineas.append(
+            f"  🫥 OCR omitido: {omitidas['paginas_en_blanco']} páginas en blanco, "
+            f"{omitidas['paginas_repetidas']} repetidas"
+        )
+    return "\n".join(lineas)
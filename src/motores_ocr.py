@@ -0,0 +1,179 @@
+"""
+🔌 motores_ocr.py – Motores de OCR intercambiables
+
+`pytesseract.image_to_string()` lanza un proceso de Tesseract por página: guarda
+la imagen en un temporal, arranca el binario y vuelve a cargar el modelo del
+idioma. En páginas cortas, ese arranque es buena parte del tiempo de OCR.
+
+Los motores comparten una interfaz mínima (como los observadores de `observador.py`):
+
+    motor.nombre                           # "tesserocr" | "pytesseract"
+    motor.por_lotes                        # True si compensa entregarle varias páginas por llamada
+    motor.reconocer(imagen, lang)          # imagen PIL o ruta de una imagen → texto
+    motor.reconocer_lote(imagenes, lang)   # lista de imágenes o rutas → lista de textos
+
+Con `con_confianza=True`, cada texto viene con la confianza media de sus
+palabras (0–100, 0 si no hay ninguna): `(texto, confianza)`. Es lo que usa la
+resolución adaptativa de `ocr.py`.
+
+- `MotorTesserocr`: la API de Tesseract dentro del proceso (paquete opcional
+  `tesserocr`). El modelo se carga una vez por idioma y proceso y se reutiliza en
+  todas las páginas, también en los procesos de `ocr.iter_ocr_paralelo()`.
+- `MotorPytesseract`: el camino de siempre, un proceso por llamada. En modo lote
+  recibe las rutas de varias páginas ya volcadas a disco en un archivo de lista:
+  un solo arranque y una sola carga del modelo por lote.
+
+🧠 Decisiones de diseño:
+- `crear_motor()` usa `tesserocr` si está instalado y su modelo carga; si no,
+  `pytesseract` (como `crear_observador()` con inotify y el sondeo).
+- Se elige como las métricas: `activar(nombre)` o `PIPELINE_MOTOR_OCR`
+  (`auto`, `tesserocr`, `pytesseract`), que heredan los procesos hijos.
+- Un lote cuya salida no se puede partir por páginas (Tesseract sin separador
+  de página) se repite página a página: nunca se mezclan textos.
+"""
+
+import atexit
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Union
+
+MOTORES = ("auto", "tesserocr", "pytesseract")
+
+# Motor elegido ("auto": tesserocr si está disponible, si no pytesseract)
+MOTOR = os.getenv("PIPELINE_MOTOR_OCR", "auto") or "auto"
+
+# Tesseract escribe este separador tras el texto de cada imagen
+SEPARADOR_PAGINA = "\f"
+
+# Motor de este proceso, creado en el primer uso (ver `motor_ocr()`)
+_motor = None
+
+
+def confianzas_tsv(tsv: str) -> Dict[int, float]:
+    """Confianza media de las palabras de cada página (`page_num`, base 1) de una salida TSV de Tesseract."""
+    filas = tsv.splitlines()
+    if not filas:
+        return {}
+    columnas = filas[0].split("\t")
+    i_nivel, i_pagina, i_conf, i_texto = (columnas.index(c) for c in ("level", "page_num", "conf", "text"))
+    sumas: Dict[int, List[float]] = {}
+    for fila in filas[1:]:
+        campos = fila.split("\t")
+        if len(campos) <= i_texto or campos[i_nivel] != "5" or not campos[i_texto].strip():
+            continue
+        confianza = float(campos[i_conf])
+        if confianza >= 0:
+            sumas.setdefault(int(campos[i_pagina]), []).append(confianza)
+    return {pagina: sum(valores) / len(valores) for pagina, valores in sumas.items()}
+
+
+def activar(nombre: str = "auto") -> None:
+    """Elige el motor de OCR en este proceso y en los hijos que cree."""
+    global MOTOR, _motor
+    if nombre not in MOTORES:
+        raise ValueError(f"Motor de OCR desconocido: {nombre!r} (opciones: {', '.join(MOTORES)})")
+    MOTOR = nombre
+    _motor = None
+    os.environ["PIPELINE_MOTOR_OCR"] = nombre
+
+
+class MotorPytesseract:
+    """Un proceso de Tesseract por llamada; por lotes, uno para varias páginas."""
+
+    nombre = "pytesseract"
+    por_lotes = True
+
+    def __init__(self):
+        import pytesseract
+
+        self._pytesseract = pytesseract
+
+    def _ejecutar(self, imagen, lang: str, con_confianza: bool):
+        """Texto (y TSV con la confianza de cada palabra) de una sola ejecución de Tesseract."""
+        if not con_confianza:
+            return self._pytesseract.image_to_string(imagen, lang=lang), None
+        texto, tsv = self._pytesseract.run_and_get_multiple_output(imagen, extensions=["txt", "tsv"], lang=lang)
+        return texto, confianzas_tsv(tsv)
+
+    def reconocer(self, imagen, lang: str = "eng", con_confianza: bool = False):
+        texto, confianzas = self._ejecutar(imagen, lang, con_confianza)
+        return (texto, confianzas.get(1, 0.0)) if con_confianza else texto
+
+    def reconocer_lote(self, imagenes: List[Union[str, Path]], lang: str = "eng", con_confianza: bool = False) -> list:
+        """Reconoce varias imágenes en disco con un solo proceso (archivo de lista de Tesseract)."""
+        if len(imagenes) < 2 or not all(isinstance(imagen, (str, Path)) for imagen in imagenes):
+            return [self.reconocer(imagen, lang, con_confianza) for imagen in imagenes]
+        with tempfile.TemporaryDirectory(prefix="openpages_lote_") as carpeta:
+            lista = Path(carpeta) / "paginas.txt"
+            lista.write_text("".join(f"{imagen}\n" for imagen in imagenes), encoding="utf-8")
+            salida, confianzas = self._ejecutar(str(lista), lang, con_confianza)
+        partes = salida.split(SEPARADOR_PAGINA)
+        if len(partes) < len(imagenes) or any(parte.strip() for parte in partes[len(imagenes):]):
+            return [self.reconocer(imagen, lang, con_confianza) for imagen in imagenes]
+        # Cada texto termina en el separador, igual que al reconocer la página sola
+        textos = [parte + SEPARADOR_PAGINA for parte in partes[:len(imagenes)]]
+        if not con_confianza:
+            return textos
+        return [(texto, confianzas.get(n, 0.0)) for n, texto in enumerate(textos, 1)]
+
+
+class MotorTesserocr:
+    """API de Tesseract en el proceso: el modelo de cada idioma se carga una sola vez."""
+
+    nombre = "tesserocr"
+    por_lotes = False  # sin arranques que amortizar: cada página se reconoce al rasterizarla
+
+    def __init__(self, lang: str = "eng"):
+        import tesserocr
+
+        self._tesserocr = tesserocr
+        self._apis = {}
+        self._api(lang)  # falla aquí si falta el modelo, y `crear_motor()` cae a pytesseract
+        atexit.register(self.cerrar)
+
+    def _api(self, lang: str):
+        api = self._apis.get(lang)
+        if api is None:
+            api = self._apis[lang] = self._tesserocr.PyTessBaseAPI(lang=lang)
+        return api
+
+    def reconocer(self, imagen, lang: str = "eng", con_confianza: bool = False):
+        api = self._api(lang)
+        if isinstance(imagen, (str, Path)):
+            api.SetImageFile(str(imagen))
+        else:
+            api.SetImage(imagen)
+        texto = api.GetUTF8Text()
+        if not con_confianza:
+            return texto
+        confianzas = api.AllWordConfidences()
+        return texto, (sum(confianzas) / len(confianzas) if confianzas else 0.0)
+
+    def reconocer_lote(self, imagenes: list, lang: str = "eng", con_confianza: bool = False) -> list:
+        return [self.reconocer(imagen, lang, con_confianza) for imagen in imagenes]
+
+    def cerrar(self):
+        for api in self._apis.values():
+            api.End()
+        self._apis.clear()
+
+
+def crear_motor(nombre: str = None):
+    """Crea el motor pedido (por defecto, `MOTOR`); sin tesserocr usable, pytesseract."""
+    nombre = nombre or MOTOR
+    if nombre in ("auto", "tesserocr"):
+        try:
+            return MotorTesserocr()
+        except (ImportError, RuntimeError) as e:
+            if nombre == "tesserocr":
+                print(f"⚠️ tesserocr no disponible ({e}). Usando pytesseract.")
+    return MotorPytesseract()
+
+
+def motor_ocr():
+    """Motor de este proceso: se crea una vez y se reutiliza en todas las páginas."""
+    global _motor
+    if _motor is None:
+        _motor = crear_motor()
+    return _motor
@@ -0,0 +1,306 @@
+"""
+👀 observador.py – Modo daemon: vigila la carpeta de entrada e ingiere PDFs nuevos
+
+Pensado para estaciones de escaneo que depositan PDFs continuamente en `input/`.
+En lugar de relanzar `main.py` con cron (que vuelve a recorrer todo), un proceso
+de larga vida:
+
+1. Observa la carpeta con inotify (Linux, vía ctypes, sin dependencias extra)
+   o, si no está disponible, por sondeo periódico.
+2. Aplica *debounce*: un PDF solo se procesa cuando su tamaño y fecha de
+   modificación llevan `debounce` segundos sin cambiar (el escáner terminó de escribir).
+3. Pasa los archivos listos por el manifest (omite los ya exportados) y luego
+   por el pipeline, con el estado ya cargado en memoria (módulos importados,
+   expresiones regulares compiladas, diccionario OCR, binarios de OCR detectados).
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Dict, List, Set, Tuple
+
+# Máscaras de inotify (ver `man 7 inotify`)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+MASCARA_EVENTOS = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+_EVENTO = struct.Struct("iIII")
+
+# Segundos que un archivo debe permanecer estable antes de procesarse
+DEBOUNCE_SEGUNDOS = 2.0
+
+# Periodo de sondeo (y de revisión de archivos en debounce)
+INTERVALO_SONDEO = 1.0
+
+
+def _es_pdf(ruta: Path) -> bool:
+    return ruta.suffix.lower() == ".pdf"
+
+
+def _firma(ruta: Path):
+    """(tamaño, mtime_ns) del archivo, o None si ya no existe."""
+    try:
+        st = ruta.stat()
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+# ─────────────────────────────────────────────────────────────
+# 🔭 Observadores: devuelven rutas que *pueden* haber cambiado
+# ─────────────────────────────────────────────────────────────
+class ObservadorSondeo:
+    """Fallback portátil: compara la firma de cada PDF en cada recorrido."""
+
+    nombre = "sondeo"
+
+    def __init__(self, carpeta: Path):
+        self.carpeta = Path(carpeta)
+        self._firmas: Dict[Path, tuple] = {ruta: _firma(ruta) for ruta in self.carpeta.rglob("*.pdf")}
+
+    def esperar(self, timeout: float) -> Set[Path]:
+        time.sleep(timeout)
+        cambios = set()
+        actuales = {}
+        for ruta in self.carpeta.rglob("*.pdf"):
+            firma = _firma(ruta)
+            actuales[ruta] = firma
+            if self._firmas.get(ruta) != firma:
+                cambios.add(ruta)
+        self._firmas = actuales
+        return cambios
+
+    def cerrar(self):
+        pass
+
+
+class ObservadorInotify:
+    """Observador basado en inotify; vigila la carpeta y sus subcarpetas."""
+
+    nombre = "inotify"
+
+    def __init__(self, carpeta: Path):
+        self.carpeta = Path(carpeta)
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falló")
+        self._dirs: Dict[int, Path] = {}
+        self._agregar_arbol(self.carpeta)
+
+    def _agregar(self, carpeta: Path):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(carpeta), MASCARA_EVENTOS)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch falló para {carpeta}")
+        self._dirs[wd] = carpeta
+
+    def _agregar_arbol(self, carpeta: Path) -> Set[Path]:
+        """Vigila `carpeta` y sus subcarpetas; devuelve los PDFs que ya contienen."""
+        self._agregar(carpeta)
+        for sub in carpeta.rglob("*"):
+            if sub.is_dir():
+                self._agregar(sub)
+        return set(carpeta.rglob("*.pdf"))
+
+    def esperar(self, timeout: float) -> Set[Path]:
+        listos, _, _ = select.select([self._fd], [], [], timeout)
+        if not listos:
+            return set()
+        try:
+            datos = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        cambios = set()
+        offset = 0
+        while offset < len(datos):
+            wd, mascara, _, largo = _EVENTO.unpack_from(datos, offset)
+            nombre = datos[offset + _EVENTO.size: offset + _EVENTO.size + largo].rstrip(b"\0")
+            offset += _EVENTO.size + largo
+
+            if mascara & IN_Q_OVERFLOW:
+                # Se perdieron eventos: se revisa todo el árbol
+                cambios.update(self.carpeta.rglob("*.pdf"))
+                continue
+            base = self._dirs.get(wd)
+            if base is None or not nombre:
+                continue
+            ruta = base / os.fsdecode(nombre)
+            if mascara & IN_ISDIR:
+                if mascara & (IN_CREATE | IN_MOVED_TO):
+                    # Los archivos pudieron llegar antes de registrar la carpeta nueva
+                    cambios.update(self._agregar_arbol(ruta))
+            elif _es_pdf(ruta):
+                cambios.add(ruta)
+        return cambios
+
+    def cerrar(self):
+        os.close(self._fd)
+
+
+def crear_observador(carpeta: Path, forzar_sondeo: bool = False):
+    """Usa inotify si el sistema lo permite; en otro caso, sondeo periódico."""
+    if not forzar_sondeo:
+        try:
+            return ObservadorInotify(carpeta)
+        except (OSError, AttributeError):
+            pass
+    return ObservadorSondeo(carpeta)
+
+
+# ─────────────────────────────────────────────────────────────
+# ⏳ Bucle con debounce
+# ─────────────────────────────────────────────────────────────
+def vigilar_carpeta(
+    carpeta: Path,
+    procesar: Callable[[List[Path]], None],
+    debounce: float = DEBOUNCE_SEGUNDOS,
+    intervalo: float = INTERVALO_SONDEO,
+    detener: threading.Event = None,
+    forzar_sondeo: bool = False,
+    incluir_existentes: bool = True
+):
+    """
+    Vigila `carpeta` hasta que se active `detener`, llamando a `procesar()`
+    con cada grupo de PDFs estables (sin cambios durante `debounce` segundos).
+
+    Args:
+        carpeta: Carpeta de entrada (se vigila recursivamente).
+        procesar: Recibe la lista de rutas listas para procesar.
+        debounce: Segundos de estabilidad exigidos a cada archivo.
+        intervalo: Espera máxima entre revisiones.
+        detener: Evento para terminar el bucle (p. ej. desde un manejador de señales).
+        forzar_sondeo: Si True, no intenta usar inotify.
+        incluir_existentes: Si True, los PDFs ya presentes al arrancar también se evalúan.
+    """
+    carpeta = Path(carpeta)
+    carpeta.mkdir(parents=True, exist_ok=True)
+    detener = detener or threading.Event()
+    observador = crear_observador(carpeta, forzar_sondeo=forzar_sondeo)
+    print(f"👀 Vigilando '{carpeta}' (modo {observador.nombre}, debounce {debounce}s)")
+
+    # ruta → (firma observada, instante del último cambio)
+    en_espera: Dict[Path, Tuple[tuple, float]] = {}
+    if incluir_existentes:
+        ahora = time.monotonic()
+        for ruta in carpeta.rglob("*.pdf"):
+            en_espera[ruta] = (_firma(ruta), ahora)
+
+    try:
+        while not detener.is_set():
+            espera = min(intervalo, debounce) if en_espera else intervalo
+            ahora = time.monotonic()
+            for ruta in observador.esperar(espera):
+                firma = _firma(ruta)
+                if firma is not None:
+                    en_espera[ruta] = (firma, ahora)
+
+            ahora = time.monotonic()
+            listos = []
+            for ruta, (firma, desde) in list(en_espera.items()):
+                actual = _firma(ruta)
+                if actual is None:
+                    del en_espera[ruta]  # borrado o movido antes de terminar
+                elif actual != firma:
+                    en_espera[ruta] = (actual, ahora)  # sigue escribiéndose
+                elif ahora - desde >= debounce:
+                    listos.append(ruta)
+                    del en_espera[ruta]
+
+            if listos:
+                procesar(sorted(listos))
+    finally:
+        observador.cerrar()
+
+
+def ejecutar_daemon(
+    carpeta: str,
+    workers: int = 1,
+    debug: bool = False,
+    debounce: float = DEBOUNCE_SEGUNDOS,
+    detener: threading.Event = None,
+    forzar_sondeo: bool = False,
+    opciones: Dict[str, object] = None
+):
+    """
+    Modo daemon del pipeline: vigila `carpeta` e ingiere cada PDF nuevo o modificado.
+
+    Los documentos pasan por el manifest (se omiten los ya exportados con la
+    versión actual del pipeline) y se procesan en este mismo proceso, o en un
+    pool de procesos que vive tanto como el daemon si `workers > 1`. Si un worker
+    muere, sus documentos cuentan como error y el pool se reemplaza.
+    `opciones` son las de cada documento, como en el modo por lotes (ver
+    `pipeline.procesar_con_registro()`).
+    """
+    # El pipeline (PyMuPDF, pdfplumber, OCR...) se importa al arrancar el daemon,
+    # no al importar este módulo.
+    from src import cache_extraccion
+    from src.logger import log_evento
+    from src.manifest import cargar_manifest, filtrar_pendientes, huella_pipeline, registrar_exportacion
+    from src.pipeline import procesar_con_registro, _compartir_contexto_logs
+
+    manifest = cargar_manifest()
+    huella = huella_pipeline()
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    if pool:
+        _compartir_contexto_logs()
+
+    def _fallido(ruta, e):
+        log_evento("error_parse", archivo=ruta, nivel="ERROR", mensaje=str(e))
+        return {"archivo": ruta, "ok": False, "error": str(e) or type(e).__name__}
+
+    def _procesar(rutas: List[Path]):
+        nonlocal pool
+        pendientes, omitidos = filtrar_pendientes(rutas, manifest, huella)
+        for omitido in omitidos:
+            log_evento("omitido", archivo=omitido["archivo"], razon=omitido["razon"])
+        if pool:
+            futuros = []
+            for ruta, hash_doc in pendientes:
+                try:
+                    futuro = pool.submit(procesar_con_registro, ruta, debug, hash_doc, opciones)
+                except BrokenProcessPool:
+                    # Un worker de esta tanda ya murió: lo que queda va a un pool nuevo
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool = ProcessPoolExecutor(max_workers=workers)
+                    futuro = pool.submit(procesar_con_registro, ruta, debug, hash_doc, opciones)
+                futuros.append((ruta, futuro))
+            resultados = []
+            roto = False
+            for ruta, futuro in futuros:
+                try:
+                    resultados.append(futuro.result())
+                except Exception as e:
+                    # El worker murió (os._exit, OOM killer...): el documento cuenta como error
+                    roto = roto or isinstance(e, BrokenProcessPool)
+                    resultados.append(_fallido(ruta, e))
+            if roto:
+                # Un pool roto no acepta más trabajo: el daemon sigue con uno nuevo
+                pool.shutdown(wait=False, cancel_futures=True)
+                pool = ProcessPoolExecutor(max_workers=workers)
+        else:
+            resultados = [procesar_con_registro(ruta, debug, hash_doc, opciones) for ruta, hash_doc in pendientes]
+        for resultado in resultados:
+            if resultado.get("ok"):
+                registrar_exportacion(manifest, resultado, huella)
+        if cache_extraccion.activa():
+            cache_extraccion.podar()
+
+    try:
+        vigilar_carpeta(carpeta, _procesar, debounce=debounce, detener=detener, forzar_sondeo=forzar_sondeo)
+    finally:
+        if pool:
+            pool.shutdown(wait=True)
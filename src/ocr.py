@@ -8,101 +8,465 @@
 # 💬 Reflexión: ¿Qué pasa si la calidad de imagen es mala? ¿Y si las páginas tienen rotación?
 # ¿Deberíamos permitir preprocesamiento (contraste, binarización)? Eso puede ser una Vuelta 3...
 
-from pdf2image import convert_from_path
-from pdf2image.exceptions import PDFInfoNotInstalledError
-from PIL import Image
-import pytesseract
+# ⚡ pytesseract, pdf2image y Pillow solo se importan cuando un documento necesita OCR
+# (ver `_cargar_ocr()`): la mayoría de los PDFs tienen capa de texto y no los usan.
+
+from __future__ import annotations
+
 import os
-import shutil
+import tempfile
 import fitz  # PyMuPDF como alternativa
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager, nullcontext
 from pathlib import Path
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+from src import cache_extraccion, filtro_paginas, motores_ocr, rangos
+from src.metricas import medir
+from src.documento import abrir_documento
 
 # ✅ Ruta local esperada donde se instaló Tesseract
 TESSERACT_LOCAL_PATH = Path.home() / "AppData" / "Local" / "Programs" / "Tesseract-OCR" / "tesseract.exe"
-if TESSERACT_LOCAL_PATH.exists():
-    pytesseract.pytesseract.tesseract_cmd = str(TESSERACT_LOCAL_PATH)
-    print(f"✅ Tesseract detectado en: {TESSERACT_LOCAL_PATH}")
-else:
-    print("⚠️ No se encontró tesseract.exe en la ruta local esperada.")
 
 # ✅ Ruta local esperada para Poppler (solo Windows)
 POPPLER_LOCAL_PATH = Path.home() / "AppData" / "Local" / "Programs" / "poppler-24.08.0" / "Library" / "bin"
 if not POPPLER_LOCAL_PATH.exists():
     POPPLER_LOCAL_PATH = None
-    print("⚠️ No se encontró Poppler en la ruta local esperada.")
-else:
-    print(f"✅ Poppler detectado en: {POPPLER_LOCAL_PATH}")
 
-# 📁 Carpeta temporal para imágenes OCR
-CARPETA_TEMP = "temp_ocr"
+# Dependencias de OCR, cargadas en el primer uso
+pytesseract = None
+convert_from_path = None
+PDFInfoNotInstalledError = None
+Image = None
+
+
+def _cargar_ocr():
+    """Importa las dependencias de OCR y detecta los binarios locales (una vez por proceso)."""
+    global pytesseract, convert_from_path, PDFInfoNotInstalledError, Image
+    if pytesseract is not None:
+        return
+    import pytesseract as _pytesseract
+    from pdf2image import convert_from_path as _convert_from_path
+    from pdf2image.exceptions import PDFInfoNotInstalledError as _PDFInfoNotInstalledError
+    from PIL import Image as _Image
+
+    if TESSERACT_LOCAL_PATH.exists():
+        _pytesseract.pytesseract.tesseract_cmd = str(TESSERACT_LOCAL_PATH)
+        print(f"✅ Tesseract detectado en: {TESSERACT_LOCAL_PATH}")
+    else:
+        print("⚠️ No se encontró tesseract.exe en la ruta local esperada.")
+    if POPPLER_LOCAL_PATH is None:
+        print("⚠️ No se encontró Poppler en la ruta local esperada.")
+    else:
+        print(f"✅ Poppler detectado en: {POPPLER_LOCAL_PATH}")
+
+    convert_from_path = _convert_from_path
+    PDFInfoNotInstalledError = _PDFInfoNotInstalledError
+    Image = _Image
+    pytesseract = _pytesseract
+
+# 💾 Las páginas se rasterizan de una en una y en memoria. Solo si el bitmap estimado
+# de una página supera este tamaño se vuelca a una carpeta temporal privada (y se
+# borra al terminar su OCR): Tesseract lee el archivo sin cargarlo en Python.
+UMBRAL_DERRAME_MB = 256
+
+# Resolución por defecto de pdf2image (Poppler) cuando no se indica `dpi`
+DPI_POPPLER = 200
+
+# Se pone a False la primera vez que Poppler falla: las llamadas página a página
+# (`ocr_pagina()`) no vuelven a intentarlo ni a avisar en cada página
+_poppler_disponible = True
 
+# Páginas a partir de las cuales el OCR de un documento se reparte entre procesos
+# (cada página cuesta segundos: compensa casi siempre, a diferencia de la extracción de texto)
+MIN_PAGINAS_OCR_PARALELO = 2
 
-def convertir_pdf_a_imagenes(pdf_path: str, poppler_path=POPPLER_LOCAL_PATH) -> list[Image.Image]:
+# Páginas que el OCR secuencial entrega juntas a un motor que trabaja por lotes
+# (`motores_ocr.MotorPytesseract`: un proceso de Tesseract y una carga del modelo por lote)
+TAMANO_LOTE_OCR = 8
+
+# 🎚️ Resolución adaptativa (cuando no se fija `dpi`): cada página se reconoce primero a
+# DPI_OCR_INICIAL y, si la confianza media de sus palabras queda por debajo de
+# CONFIANZA_MIN_OCR, se rasteriza y reconoce otra vez a DPI_OCR_ALTO; se queda la lectura
+# más confiable. Los escaneos limpios se leen bien a baja resolución, los malos tienen su detalle.
+DPI_OCR_INICIAL = 150
+DPI_OCR_ALTO = 300
+CONFIANZA_MIN_OCR = 75
+
+# Páginas que no pasan por el motor (ver `src/filtro_paginas.py`) y su contador
+OMITIDAS = {"en blanco": "paginas_en_blanco", "repetida": "paginas_repetidas"}
+
+# Resolución de rasterizado en modo degradado (reintento de un documento que agotó
+# su presupuesto de tiempo o memoria): menos píxeles, OCR más rápido y menos preciso
+DPI_DEGRADADO = 100
+
+
+def convertir_pdf_a_imagenes(pdf_path: str, poppler_path=POPPLER_LOCAL_PATH, dpi: int = None) -> list[Image.Image]:
     """
-    Convierte cada página del PDF en una imagen (formato PNG), usando pdf2image.
+    Convierte cada página del PDF en una imagen, usando pdf2image.
     Si Poppler no está disponible, lanza excepción que puede ser manejada por fallback.
+    `dpi=None` usa la resolución por defecto de pdf2image (200).
+
+    ⚠️ Devuelve todas las páginas a la vez: el OCR usa `_pagina_rasterizada()`, página a página.
     """
-    os.makedirs(CARPETA_TEMP, exist_ok=True)
-    try:
-        imagenes = convert_from_path(pdf_path, poppler_path=poppler_path)
-        rutas_imagenes = []
-        for i, imagen in enumerate(imagenes):
-            ruta = os.path.join(CARPETA_TEMP, f"pagina_{i+1}.png")
-            imagen.save(ruta, "PNG")
-            rutas_imagenes.append(ruta)
-        return [Image.open(ruta) for ruta in rutas_imagenes]
-    except PDFInfoNotInstalledError:
-        raise
+    _cargar_ocr()
+    opciones = {"dpi": dpi} if dpi else {}
+    return convert_from_path(pdf_path, poppler_path=poppler_path, **opciones)
+
 
+def _matriz(dpi: int = None) -> fitz.Matrix:
+    """Escala de rasterizado de PyMuPDF: 2× (144 dpi) por defecto, o la de `dpi`."""
+    zoom = dpi / 72 if dpi else 2
+    return fitz.Matrix(zoom, zoom)
 
-def convertir_pdf_con_fitzz(pdf_path: str) -> list[Image.Image]:
+
+def convertir_pdf_con_fitzz(pdf_path, dpi: int = None) -> list[Image.Image]:
     """
     Conversión alternativa: rasteriza el PDF usando PyMuPDF.
     🔬 Menor calidad que Poppler, pero útil cuando este no está disponible.
+
+    Acepta una ruta o un DocumentoPDF (reutiliza el documento ya abierto).
     """
-    doc = fitz.open(pdf_path)
+    _cargar_ocr()
     imagenes = []
-    for page in doc:
-        pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))
-        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-        imagenes.append(img)
+    with abrir_documento(pdf_path) as doc:
+        for page in doc.fitz():
+            pix = page.get_pixmap(matrix=_matriz(dpi))
+            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+            imagenes.append(img)
     return imagenes
 
 
-def extraer_texto_ocr(imagen: Image.Image, lang: str = 'eng') -> str:
-    return pytesseract.image_to_string(imagen, lang=lang)
+def extraer_texto_ocr(imagen: Union[Image.Image, str], lang: str = 'eng') -> str:
+    """OCR de una imagen en memoria o de la ruta de una imagen volcada a disco."""
+    _cargar_ocr()
+    return motores_ocr.motor_ocr().reconocer(imagen, lang=lang)
+
+
+def extraer_textos_ocr(imagenes: List[Union[Image.Image, str]], lang: str = 'eng', con_confianza: bool = False) -> list:
+    """
+    OCR de varias imágenes en una sola llamada al motor (ver `src/motores_ocr.py`).
+    Con `con_confianza=True`, devuelve `(texto, confianza media de las palabras)` por imagen.
+    """
+    _cargar_ocr()
+    return motores_ocr.motor_ocr().reconocer_lote(imagenes, lang=lang, con_confianza=con_confianza)
+
+
+def _bytes_bitmap(pagina, dpi: int) -> int:
+    """Tamaño aproximado del bitmap RGB de una página de PyMuPDF rasterizada a `dpi`."""
+    escala = dpi / 72
+    return int(pagina.rect.width * escala * pagina.rect.height * escala * 3)
 
 
-def borrar_temporales():
-    if os.path.exists(CARPETA_TEMP):
-        shutil.rmtree(CARPETA_TEMP)
+@contextmanager
+def _pagina_rasterizada(documento, idx: int, dpi: int = None, poppler_path=POPPLER_LOCAL_PATH,
+                        solo_poppler: bool = False, carpeta: str = None):
+    """
+    Rasteriza una página (índice base 0) y entrega `(imagen, etiqueta)`: la imagen en
+    memoria o, si es enorme, la ruta de su volcado en una carpeta temporal privada
+    que se borra al salir. Usa Poppler (`OCR`, solo esa página) y, si no está
+    disponible, PyMuPDF (`OCR Lite`); con `solo_poppler=True` propaga el error.
+    Con `carpeta`, la página siempre se vuelca ahí (y la borra quien la creó).
+    """
+    global _poppler_disponible
+    pagina = documento.fitz()[idx]
+    usar_poppler = _poppler_disponible or solo_poppler
+    derramar = _bytes_bitmap(pagina, dpi or (DPI_POPPLER if usar_poppler else 144)) > UMBRAL_DERRAME_MB * 1024 ** 2
+    propia = carpeta is None and derramar
+    with (tempfile.TemporaryDirectory(prefix="openpages_ocr_") if propia else nullcontext(carpeta)) as carpeta:
+        imagen = None
+        if usar_poppler:
+            try:
+                opciones = {"dpi": dpi} if dpi else {}
+                if carpeta:
+                    opciones.update(output_folder=carpeta, paths_only=True)
+                imagen = convert_from_path(
+                    documento.ruta, first_page=idx + 1, last_page=idx + 1, poppler_path=poppler_path, **opciones
+                )[0]
+                etiqueta = "OCR"
+            except PDFInfoNotInstalledError:
+                if solo_poppler:
+                    raise
+                print("⚠️ Poppler no disponible. Usando modo OCR Lite (calidad reducida).")
+                _poppler_disponible = False
+        if imagen is None:
+            pix = pagina.get_pixmap(matrix=_matriz(dpi))
+            if carpeta:
+                imagen = os.path.join(carpeta, f"pagina_{idx + 1}.ppm")
+                pix.save(imagen)
+            else:
+                imagen = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
+            del pix
+            etiqueta = "OCR Lite"
+        yield imagen, etiqueta
 
 
-def ocr_completo(pdf_path: str, lang: str = "eng") -> str:
-    imagenes = convertir_pdf_a_imagenes(pdf_path)
+def ocr_completo(pdf_path, lang: str = "eng", dpi: int = None) -> str:
+    """
+    OCR con Poppler, rasterizando y reconociendo una página a la vez (sin pasar por disco),
+    con el mismo filtro de páginas y la misma resolución adaptativa que `iter_ocr_paginas`.
+    Lanza `PDFInfoNotInstalledError` si Poppler no está disponible.
+    """
+    _cargar_ocr()
     texto_total = []
-    for idx, imagen in enumerate(imagenes):
-        texto = extraer_texto_ocr(imagen, lang=lang)
-        print(f"[OCR] Página {idx + 1} procesada")
-        texto_total.append(texto)
-    borrar_temporales()
+    resoluciones, conteo = {}, {}
+    with abrir_documento(pdf_path) as documento:
+        for idx in range(len(documento.fitz())):
+            texto, etiqueta, resolucion = _ocr_grupo(documento, [idx], lang, dpi, solo_poppler=True)[0]
+            _anotar_pagina(idx, etiqueta, resolucion, resoluciones, conteo)
+            texto_total.append(texto)
     return "\n".join(texto_total)
 
 
-def ocr_completo_inteligente(pdf_path: str, lang: str = "eng") -> str:
+@lru_cache(maxsize=1)
+def _version_tesseract() -> str:
+    """Versión del binario de Tesseract (parte de la huella de la caché de OCR)."""
+    _cargar_ocr()
+    try:
+        return str(pytesseract.get_tesseract_version())
+    except Exception:
+        return "?"
+
+
+def ocr_completo_inteligente(pdf_path, lang: str = "eng", dpi: int = None) -> str:
     """
     Versión tolerante del OCR: usa Poppler si está disponible, y fallback con PyMuPDF si no.
 
     📚 Ideal para facilitar pruebas locales, sin obligar a instalar binarios externos.
+    🧵 Con presupuesto de procesos por documento (`--paginas-paralelas`), las páginas se
+    reconocen en paralelo, una por proceso y con Tesseract a un hilo (ver `iter_ocr_paralelo`).
+    🎚️ Sin `dpi`, cada página empieza a baja resolución y solo las de confianza baja se
+    repiten a más; los dpi usados quedan en la métrica `dpi_paginas` (ver `DPI_OCR_INICIAL`).
+    🫥 Las páginas en blanco y las repetidas no pasan por el motor; su número queda en las
+    métricas `paginas_en_blanco` y `paginas_repetidas` (ver `src/filtro_paginas.py`).
+    🗃️ Con la caché de extracción activa, el texto reconocido se guarda por hash del PDF,
+    idioma, dpi, versión de Tesseract y motor (ver `src/cache_extraccion.py`).
     """
-    try:
-        return ocr_completo(pdf_path, lang=lang)
-    except PDFInfoNotInstalledError:
-        print("⚠️ Poppler no disponible. Usando modo OCR Lite (calidad reducida).")
-        imagenes = convertir_pdf_con_fitzz(pdf_path)
-        texto_total = []
-        for idx, imagen in enumerate(imagenes):
-            texto = extraer_texto_ocr(imagen, lang=lang)
-            print(f"[OCR Lite] Página {idx + 1} procesada")
-            texto_total.append(texto)
-        return "\n".join(texto_total)
+    _cargar_ocr()
+    with medir("ocr") as m, abrir_documento(pdf_path) as documento:
+        hash_doc = documento.hash_md5() if cache_extraccion.activa() else None
+        motor = motores_ocr.motor_ocr().nombre
+        ajustes = {
+            "lang": lang, "dpi": dpi, "tesseract": _version_tesseract(), "motor": motor,
+            "filtro": filtro_paginas.ACTIVO,
+        } if hash_doc else {}
+        guardado = cache_extraccion.leer(hash_doc, "ocr", **ajustes)
+        if guardado is not None:
+            m.anotar(cache=True, caracteres=len(guardado))
+            return guardado
+        # Página a página (en paralelo si hay presupuesto): Poppler, o PyMuPDF si no está
+        resoluciones, conteo = {}, {}
+        texto = "\n".join(iter_ocr_paginas(documento, lang=lang, dpi=dpi, resoluciones=resoluciones, conteo=conteo))
+        m.anotar(paginas=len(documento.fitz()), procesos=procesos_ocr(len(documento.fitz())), motor=motor,
+                 dpi_paginas=[resoluciones[idx] for idx in sorted(resoluciones)], **conteo)
+        if not _poppler_disponible:
+            m.anotar(modo="lite")
+        m.anotar(caracteres=len(texto))
+        cache_extraccion.guardar(hash_doc, "ocr", texto, **ajustes)
+        return texto
+
+
+def iter_ocr_paginas(
+    pdf_path,
+    lang: str = "eng",
+    poppler_path=POPPLER_LOCAL_PATH,
+    dpi: int = None,
+    paginas: Iterable[int] = None,
+    resoluciones: Dict[int, int] = None,
+    conteo: Dict[str, int] = None
+) -> Iterator[str]:
+    """
+    🌊 OCR en streaming: rasteriza y reconoce una página a la vez, de modo que
+    en memoria solo vive el bitmap de la página actual.
+
+    Usa Poppler página a página (`first_page`/`last_page`) y, si no está disponible,
+    cae al modo OCR Lite con PyMuPDF, igual que `ocr_completo_inteligente`.
+    `paginas` limita el OCR a esos índices (base 0), en el orden dado.
+    Sin `dpi`, la resolución de cada página es adaptativa (ver `DPI_OCR_INICIAL`);
+    si se pasa `resoluciones`, se anota en él la usada en cada página ({índice: dpi}).
+    Las páginas en blanco o repetidas no pasan por el motor (dpi None); si se pasa
+    `conteo`, acumula cuántas de cada (`paginas_en_blanco`, `paginas_repetidas`).
+    Con presupuesto de procesos por documento, las páginas se reparten entre
+    varios procesos (ver `iter_ocr_paralelo`); si no, con un motor por lotes
+    (pytesseract) se reconocen de `TAMANO_LOTE_OCR` en `TAMANO_LOTE_OCR`.
+    """
+    _cargar_ocr()
+    resoluciones = {} if resoluciones is None else resoluciones
+    conteo = {} if conteo is None else conteo
+    with abrir_documento(pdf_path) as documento:
+        indices = list(range(len(documento.fitz())) if paginas is None else paginas)
+        procesos = procesos_ocr(len(indices))
+        if procesos > 1:
+            yield from iter_ocr_paralelo(documento.ruta, indices, lang=lang, dpi=dpi, procesos=procesos,
+                                         resoluciones=resoluciones, conteo=conteo)
+            return
+        tamano = TAMANO_LOTE_OCR if motores_ocr.motor_ocr().por_lotes else 1
+        en_disco = tamano > 1 and len(indices) > 1
+        for inicio in range(0, len(indices), tamano):
+            grupo = indices[inicio:inicio + tamano]
+            lecturas = _ocr_grupo(documento, grupo, lang, dpi, poppler_path, en_disco=en_disco)
+            for idx, (texto, etiqueta, resolucion) in zip(grupo, lecturas):
+                _anotar_pagina(idx, etiqueta, resolucion, resoluciones, conteo)
+                yield texto
+
+
+def _anotar_pagina(idx: int, etiqueta: str, resolucion: int, resoluciones: Dict[int, int], conteo: Dict[str, int]):
+    """Aviso de progreso de una página, su dpi y, si no pasó por el motor, su contador."""
+    resoluciones[idx] = resolucion
+    if etiqueta in OMITIDAS:
+        conteo[OMITIDAS[etiqueta]] = conteo.get(OMITIDAS[etiqueta], 0) + 1
+        print(f"[OCR] Página {idx + 1} omitida ({etiqueta})")
+    else:
+        print(f"[{etiqueta}] Página {idx + 1} procesada ({resolucion} dpi)")
+
+
+def _ocr_grupo(documento, indices: List[int], lang: str, dpi: int = None, poppler_path=POPPLER_LOCAL_PATH,
+               en_disco: bool = False, solo_poppler: bool = False, filtrar: bool = True) -> List[Tuple[str, str, int]]:
+    """
+    Reconoce las páginas `indices` con una llamada al motor por resolución: a `dpi` si se
+    fija; si no, a `DPI_OCR_INICIAL` y, las de confianza baja, otra vez a `DPI_OCR_ALTO`.
+    Con `en_disco` (motores por lotes), las páginas se vuelcan a una carpeta temporal privada
+    del grupo (en memoria, solo la que se rasteriza). Devuelve `(texto, etiqueta, dpi)` por página;
+    las páginas en blanco o repetidas no se reconocen y llevan su clase como etiqueta y dpi None.
+    Con `filtrar=False` no se revisan ni se recuerdan (ya lo hizo quien las reparte).
+    """
+    lecturas = {}
+    revisiones = {}  # páginas nuevas: se recuerdan tras reconocerlas
+    gemelas = {}     # página → la primera igual a ella de este grupo
+    pendientes = []
+    for idx in indices:
+        revision = filtro_paginas.revisar(documento.fitz()[idx], lang) if filtrar else None
+        if revision is not None and revision["clase"] != "nueva":
+            lecturas[idx] = (revision["texto"], revision["clase"], None, 100.0)
+            continue
+        if revision is not None:
+            gemela = next((j for j in pendientes if filtro_paginas.iguales(revision, revisiones[j])), None)
+            if gemela is not None:
+                gemelas[idx] = gemela
+                continue
+            revisiones[idx] = revision
+        pendientes.append(idx)
+    for resolucion in (dpi,) if dpi else (DPI_OCR_INICIAL, DPI_OCR_ALTO):
+        with (tempfile.TemporaryDirectory(prefix="openpages_ocr_") if en_disco else nullcontext()) as carpeta, \
+                ExitStack() as paginas:
+            imagenes, etiquetas = [], []
+            for idx in pendientes:
+                imagen, etiqueta = paginas.enter_context(
+                    _pagina_rasterizada(documento, idx, dpi=resolucion, poppler_path=poppler_path,
+                                        solo_poppler=solo_poppler, carpeta=carpeta)
+                )
+                imagenes.append(imagen)
+                etiquetas.append(etiqueta)
+            resultados = extraer_textos_ocr(imagenes, lang=lang, con_confianza=True)
+        for idx, etiqueta, (texto, confianza) in zip(pendientes, etiquetas, resultados):
+            if idx not in lecturas or confianza >= lecturas[idx][3]:
+                lecturas[idx] = (texto, etiqueta, resolucion, confianza)
+        pendientes = [idx for idx in pendientes if lecturas[idx][3] < CONFIANZA_MIN_OCR]
+        if not pendientes:
+            break
+    for idx, revision in revisiones.items():
+        filtro_paginas.recordar(revision, lecturas[idx][0])
+    for idx, gemela in gemelas.items():
+        lecturas[idx] = (lecturas[gemela][0], "repetida", None, lecturas[gemela][3])
+    return [lecturas[idx][:3] for idx in indices]
+
+
+# ─────────────────────────────────────────────────────────────
+# 🧵 OCR en paralelo por páginas
+# ─────────────────────────────────────────────────────────────
+
+def procesos_ocr(paginas: int) -> int:
+    """Procesos de OCR para `paginas` páginas: el presupuesto por documento de `src/rangos.py`."""
+    if paginas < MIN_PAGINAS_OCR_PARALELO:
+        return 1
+    return min(rangos.PROCESOS_PAGINAS, paginas)
+
+
+def _iniciar_proceso_ocr():
+    # Tesseract usa varios hilos OpenMP por defecto: con un proceso por núcleo,
+    # un hilo por proceso evita que procesos × hilos supere los núcleos
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+
+def _ocr_pagina_en_proceso(ruta: str, idx: int, lang: str, dpi: int) -> Tuple[str, str, int]:
+    """Trabajo de un proceso: abre su propio manejador, rasteriza y reconoce una página."""
+    _cargar_ocr()
+    with abrir_documento(ruta) as documento:
+        return _ocr_grupo(documento, [idx], lang, dpi, filtrar=False)[0]
+
+
+def iter_ocr_paralelo(
+    ruta,
+    indices: List[int],
+    lang: str = "eng",
+    dpi: int = None,
+    procesos: int = 2,
+    resoluciones: Dict[int, int] = None,
+    conteo: Dict[str, int] = None
+) -> Iterator[str]:
+    """
+    OCR de las páginas `indices` en un pool de `procesos` procesos, con Tesseract a un hilo
+    por proceso. Produce los textos en el orden de `indices`, con el mismo aviso de progreso
+    (y las mismas anotaciones en `resoluciones` y `conteo`) que la versión secuencial;
+    como mucho `2 × procesos` páginas están en curso a la vez.
+
+    El filtro de páginas corre aquí, en el proceso que reparte: así una página repetida se
+    reconoce una sola vez aunque sus copias caigan en procesos distintos, y lo reconocido
+    queda recordado para los documentos siguientes de este proceso.
+    """
+    resoluciones = {} if resoluciones is None else resoluciones
+    conteo = {} if conteo is None else conteo
+    ventana = 2 * procesos
+    en_vuelo = {}  # páginas nuevas enviadas y aún sin recordar: índice → (revisión, futuro)
+    with abrir_documento(ruta) as documento, \
+            ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_proceso_ocr) as pool:
+        en_curso = deque()
+        for idx in indices:
+            en_curso.append(_encargar(documento, pool, idx, lang, dpi, en_vuelo))
+            if len(en_curso) >= ventana:
+                yield _recoger(*en_curso.popleft(), en_vuelo, resoluciones, conteo)
+        while en_curso:
+            yield _recoger(*en_curso.popleft(), en_vuelo, resoluciones, conteo)
+
+
+def _encargar(documento, pool, idx: int, lang: str, dpi: int, en_vuelo: dict) -> Tuple[int, Future, bool]:
+    """
+    Revisa la página y solo envía al pool las nuevas. Devuelve `(idx, futuro, repetida)`:
+    una página en blanco o ya vista llega con su lectura resuelta; la igual a otra aún
+    en curso, con el futuro de esa otra y `repetida=True`.
+    """
+    revision = filtro_paginas.revisar(documento.fitz()[idx], lang)
+    if revision is not None and revision["clase"] != "nueva":
+        lectura = Future()
+        lectura.set_result((revision["texto"], revision["clase"], None))
+        return idx, lectura, False
+    if revision is not None:
+        for otra, futuro in en_vuelo.values():
+            if filtro_paginas.iguales(revision, otra):
+                return idx, futuro, True
+    futuro = pool.submit(_ocr_pagina_en_proceso, str(documento.ruta), idx, lang, dpi)
+    if revision is not None:
+        en_vuelo[idx] = (revision, futuro)
+    return idx, futuro, False
+
+
+def _recoger(idx: int, futuro, repetida: bool, en_vuelo: dict, resoluciones: Dict[int, int],
+             conteo: Dict[str, int]) -> str:
+    texto, etiqueta, resolucion = futuro.result()
+    if repetida:
+        etiqueta, resolucion = "repetida", None
+    elif idx in en_vuelo:
+        filtro_paginas.recordar(en_vuelo.pop(idx)[0], texto)
+    _anotar_pagina(idx, etiqueta, resolucion, resoluciones, conteo)
+    return texto
+
+
+def ocr_pagina(pdf_path, idx: int, lang: str = "eng", dpi: int = None) -> str:
+    """OCR de una sola página (índice base 0), para las rutas que combinan capa de texto y OCR."""
+    with medir("ocr") as m:
+        resoluciones, conteo = {}, {}
+        texto = "".join(iter_ocr_paginas(pdf_path, lang=lang, dpi=dpi, paginas=[idx],
+                                         resoluciones=resoluciones, conteo=conteo))
+        m.anotar(pagina=idx + 1, dpi=resoluciones.get(idx), caracteres=len(texto), **conteo)
+        return texto
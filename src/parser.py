@@ -1,71 +1,303 @@
 from pathlib import Path
-import fitz  # PyMuPDF
-import pdfplumber
+from typing import Dict, Iterable, Iterator, Union
+from src import cache_extraccion, filtro_paginas, motores_ocr
 from src.cleaner import limpiar_texto
-from src.ocr import ocr_completo_inteligente
+from src.documento import DocumentoPDF, abrir_documento
+from src.ocr import ocr_completo_inteligente, iter_ocr_paginas, DPI_DEGRADADO
+from src.metricas import medir
+from src.rangos import extraer_en_paralelo, procesos_para
+from src.sonda import sonda_de, clasificar_pagina, THRESHOLD_MIN_CARACTERES
+
+# Todas las funciones aceptan una ruta o un DocumentoPDF ya abierto (ver src/documento.py):
+# así la sonda, la extracción y el OCR de un documento comparten una sola lectura del archivo.
+RutaODocumento = Union[str, Path, DocumentoPDF]
 
 # ---
 # 📦 parser.py – Núcleo de extracción de texto
 #
 # Este módulo decide cómo extraer texto desde un PDF:
-# - Si el PDF contiene texto "normal", usa PyMuPDF o pdfplumber.
-# - Si detecta que el PDF está escaneado (imágenes), activa el gen OCR.
+# - Página a página: PyMuPDF para el texto corrido, pdfplumber para columnas y tablas.
+# - Las páginas escaneadas (imágenes) o ilegibles activan el gen OCR.
 #
 # 🧠 Reflexiones para futuras mutaciones:
 # - ¿Deberíamos permitir forzar el uso de OCR manualmente?
-# - ¿Y si combinamos texto extraído + OCR como capas complementarias?
+# - ✅ Texto extraído + OCR combinados por página: ver `iter_hibrido()`.
 # - ¿Podemos estimar idioma del PDF para OCR más preciso automáticamente?
 
 # Heurística: si el texto extraído es muy corto, probablemente sea un PDF escaneado
-THRESHOLD_MIN_CARACTERES = 100
+# (el umbral, THRESHOLD_MIN_CARACTERES, vive en src/sonda.py)
+
+# Idioma con que el parser llama al OCR
+LANG_OCR = "eng"
 
+# Páginas de OCR seguidas que `iter_hibrido` reúne, como mucho, antes de reconocerlas
+MAX_TRAMO_OCR = 64
 
-def es_pdf_complejo(ruta_pdf: str) -> bool:
+
+def es_pdf_complejo(ruta_pdf: RutaODocumento) -> bool:
     """
     Intenta determinar si un PDF está compuesto por imágenes escaneadas
     mediante un umbral de cantidad mínima de caracteres extraídos.
 
+    La decisión sale de la sonda por muestreo con PyMuPDF (`src/sonda.py`), que se
+    detiene al reunir el umbral y deja la clasificación por página en `doc.sonda`.
+
     ❓ ¿Y si el texto es muy corto pero no escaneado? Puede haber falsos positivos.
     """
     try:
-        with pdfplumber.open(ruta_pdf) as pdf:
-            texto = " ".join([page.extract_text() or "" for page in pdf.pages])
-            return len(texto.strip()) < THRESHOLD_MIN_CARACTERES
+        return sonda_de(ruta_pdf)["escaneado"]
     except Exception:
-        return True  # Si pdfplumber falla, asumimos que es complejo
+        return True  # Si el PDF no se puede sondear, asumimos que es complejo
 
 
-def extract_with_pdfplumber(ruta_pdf: str) -> str:
-    """Extrae texto desde PDF usando pdfplumber (más fiel al layout)."""
-    with pdfplumber.open(ruta_pdf) as pdf:
-        return "\n".join([page.extract_text() or "" for page in pdf.pages])
+def extract_with_pdfplumber(ruta_pdf: RutaODocumento) -> str:
+    """
+    Extrae texto desde PDF usando pdfplumber (más fiel al layout).
+    Los documentos grandes se reparten por rangos de páginas (ver `src/rangos.py`).
+    """
+    with medir("pdfplumber") as m, abrir_documento(ruta_pdf) as doc:
+        paginas = len(doc.fitz())
+        procesos = procesos_para(paginas)
+        if procesos > 1:
+            texto = "\n".join(extraer_en_paralelo(doc.ruta, "pdfplumber", paginas, procesos))
+            m.anotar(procesos=procesos)
+        else:
+            texto = "\n".join([page.extract_text() or "" for page in doc.pdfplumber().pages])
+        m.anotar(paginas=paginas, caracteres=len(texto))
+        return texto
 
 
-def extract_with_pymupdf(ruta_pdf: str) -> str:
+def extract_with_pymupdf(ruta_pdf: RutaODocumento) -> str:
     """Extrae texto con PyMuPDF, muy rápido pero menos preciso con columnas o fórmulas."""
-    doc = fitz.open(ruta_pdf)
-    return "\n".join([page.get_text("text") for page in doc])
+    with medir("pymupdf") as m, abrir_documento(ruta_pdf) as doc:
+        pdf = doc.fitz()
+        procesos = procesos_para(len(pdf))
+        if procesos > 1:
+            texto = "\n".join(extraer_en_paralelo(doc.ruta, "pymupdf", len(pdf), procesos))
+            m.anotar(procesos=procesos)
+        else:
+            texto = "\n".join([page.get_text("text") for page in pdf])
+        m.anotar(paginas=len(pdf), caracteres=len(texto))
+        return texto
+
+
+def iter_pdfplumber(ruta_pdf: RutaODocumento, paginas: Iterable[int] = None) -> Iterator[str]:
+    """
+    Versión por páginas de `extract_with_pdfplumber`: produce el texto de una página a la vez.
+    `paginas` limita la extracción a esos índices (base 0), como en el resto de iteradores.
+    """
+    with abrir_documento(ruta_pdf) as doc:
+        pdf = doc.pdfplumber()
+        for idx in range(len(pdf.pages)) if paginas is None else paginas:
+            page = pdf.pages[idx]
+            yield page.extract_text() or ""
+            page.flush_cache()  # libera los objetos de layout ya usados
+
+
+def iter_pymupdf(ruta_pdf: RutaODocumento, paginas: Iterable[int] = None) -> Iterator[str]:
+    """Versión por páginas de `extract_with_pymupdf`."""
+    with abrir_documento(ruta_pdf) as doc:
+        pdf = doc.fitz()
+        for idx in range(len(pdf)) if paginas is None else paginas:
+            yield pdf[idx].get_text("text")
+
+
+def _texto_pdfplumber(pagina, columnas: Dict[str, float] = None) -> str:
+    """
+    Texto de una página de pdfplumber. A dos columnas (geometría de `sonda.geometria_columnas()`),
+    `extract_text()` mezclaría las líneas de ambas: se extraen por separado encabezado,
+    columna izquierda, columna derecha y pie, asignando cada carácter por su centro.
+    """
+    if not columnas:
+        return pagina.extract_text() or ""
+    x0, y0, x1, y1 = pagina.bbox
+    corte, arriba, abajo = x0 + columnas["corte"], y0 + columnas["arriba"], y0 + columnas["abajo"]
+    regiones = [(x0, y0, x1, arriba), (x0, arriba, corte, abajo), (corte, arriba, x1, abajo), (x0, abajo, x1, y1)]
+
+    def _en(region):
+        rx0, rtop, rx1, rbottom = region
+        return lambda obj: (rx0 <= (obj["x0"] + obj["x1"]) / 2 < rx1
+                            and rtop <= (obj["top"] + obj["bottom"]) / 2 < rbottom)
+
+    partes = (pagina.filter(_en(region)).extract_text() or "" for region in regiones)
+    return "\n".join(parte for parte in partes if parte.strip())
+
+
+def iter_hibrido(
+    ruta_pdf: RutaODocumento,
+    dpi: int = None,
+    conteo: Dict[str, int] = None,
+    paginas: Iterable[int] = None
+) -> Iterator[str]:
+    """
+    🧩 Extracción híbrida por página, según el `extractor` que decide
+    `sonda.clasificar_pagina()` para cada una, en el orden original del documento:
+
+    - `pymupdf`:    páginas de texto corrido (la gran mayoría, y la vía rápida).
+    - `pdfplumber`: páginas a dos columnas o con tablas, donde conserva mejor el orden.
+    - `ocr`:        páginas sin capa de texto utilizable (escaneadas o ilegibles).
+
+    Un libro de 400 páginas con 3 láminas escaneadas pasa 3 páginas por OCR, no 400;
+    uno escaneado entero va por OCR de principio a fin, sin pasar por pdfplumber.
+    Las páginas de OCR seguidas se reconocen juntas (`_ocr_tramo`), en paralelo o por
+    lotes como en `iter_ocr_paginas`. Si el OCR o pdfplumber fallan en una página,
+    se conserva lo que dio PyMuPDF.
+    `conteo`, si se pasa, acumula páginas, paginas_ocr, paginas_pdfplumber y ocr_fallidas
+    (y las páginas que el filtro de OCR omitió).
+    """
+    conteo = conteo if conteo is not None else {}
+    with abrir_documento(ruta_pdf) as doc:
+        pdf = doc.fitz()
+        tramo = []  # páginas seguidas que esperan OCR: (índice, texto de PyMuPDF)
+        for idx in range(len(pdf)) if paginas is None else paginas:
+            info = clasificar_pagina(pdf[idx], con_texto=True)
+            conteo["paginas"] = conteo.get("paginas", 0) + 1
+            if info["extractor"] == "ocr":
+                tramo.append((idx, info["texto"]))
+                if len(tramo) >= MAX_TRAMO_OCR:
+                    yield from _ocr_tramo(doc, tramo, dpi, conteo)
+                    tramo = []
+                continue
+            yield from _ocr_tramo(doc, tramo, dpi, conteo)
+            tramo = []
+            texto = info["texto"]
+            if info["extractor"] == "pdfplumber":
+                try:
+                    pagina = doc.pdfplumber().pages[idx]
+                    texto = _texto_pdfplumber(pagina, info.get("columnas"))
+                    pagina.flush_cache()
+                    conteo["paginas_pdfplumber"] = conteo.get("paginas_pdfplumber", 0) + 1
+                except Exception:
+                    pass  # se queda el texto de PyMuPDF
+            yield texto
+        yield from _ocr_tramo(doc, tramo, dpi, conteo)
+
 
+def _ocr_tramo(doc: DocumentoPDF, tramo: list, dpi: int, conteo: Dict[str, int]) -> Iterator[str]:
+    """
+    OCR de un tramo de páginas `(índice, texto de PyMuPDF)`, en su orden. Si el OCR
+    falla (p. ej. sin Tesseract), las páginas que faltan se quedan con su capa de
+    texto y cuentan en `ocr_fallidas`.
+    """
+    hechas = 0
+    try:
+        for texto in iter_ocr_paginas(doc, lang=LANG_OCR, dpi=dpi, paginas=[idx for idx, _ in tramo], conteo=conteo):
+            hechas += 1
+            conteo["paginas_ocr"] = conteo.get("paginas_ocr", 0) + 1
+            yield texto
+    except Exception:
+        pass
+    if hechas < len(tramo):
+        conteo["ocr_fallidas"] = conteo.get("ocr_fallidas", 0) + len(tramo) - hechas
+        for _, texto in tramo[hechas:]:
+            yield texto
 
-def extract_text(ruta_pdf: str) -> str:
+
+def extract_hybrid(ruta_pdf: RutaODocumento, dpi: int = None, conteo: Dict[str, int] = None) -> str:
+    """
+    Versión completa de `iter_hibrido`: texto de todas las páginas, con OCR solo donde hace falta.
+    Los documentos grandes se reparten por rangos de páginas (ver `src/rangos.py`).
+    """
+    conteo = conteo if conteo is not None else {}
+    with medir("hibrido") as m, abrir_documento(ruta_pdf) as doc:
+        paginas = len(doc.fitz())
+        procesos = procesos_para(paginas)
+        if procesos > 1 and dpi is None:
+            texto = "\n".join(extraer_en_paralelo(doc.ruta, "hibrido", paginas, procesos, conteo=conteo))
+            m.anotar(procesos=procesos)
+        else:
+            texto = "\n".join(iter_hibrido(doc, dpi=dpi, conteo=conteo))
+        m.anotar(caracteres=len(texto), **conteo)
+    if conteo.get("ocr_fallidas"):
+        print(f"⚠️ OCR fallido en {conteo['ocr_fallidas']} página(s): se conserva su capa de texto.")
+    return texto
+
+
+def _ajustes_cache(degradado: bool) -> Dict[str, object]:
+    """Ajustes que cambian el texto extraído: forman parte de la clave de la caché `extraccion`."""
+    return {
+        "degradado": degradado,
+        "lang": LANG_OCR,
+        "dpi": DPI_DEGRADADO if degradado else None,
+        "filtro": filtro_paginas.ACTIVO,
+        "motor": motores_ocr.MOTOR,
+    }
+
+
+def extract_text(ruta_pdf: RutaODocumento, degradado: bool = False, conteo: Dict[str, int] = None) -> str:
     """
     Ruta principal de extracción. Intenta lo más eficiente primero,
     y recurre al OCR solo si es necesario.
 
     🔁 Este enfoque mantiene el rendimiento sin sacrificar precisión cuando se requiere.
+    Todo PDF se extrae por página (`extract_hybrid`), aunque la sonda lo dé por escaneado:
+    las páginas escaneadas o con texto ilegible pasan por OCR y solo las de columnas
+    o tablas por pdfplumber. Si ninguna página dio texto, OCR del documento entero.
+
+    🩹 `degradado=True` (reintento tras agotar el presupuesto de tiempo o memoria):
+    solo PyMuPDF, sin sonda ni pdfplumber, y OCR a `DPI_DEGRADADO`.
+
+    🗃️ Con la caché de extracción activa (`src/cache_extraccion.py`), el resultado se
+    guarda por hash del PDF y se reutiliza mientras no cambie el extractor.
+
+    `conteo`, si se pasa, recibe los contadores de `iter_hibrido`; `ocr_fallidas` > 0
+    indica páginas que se quedaron sin OCR (el llamador no debe darlas por buenas).
     """
     texto_crudo = ""
+    conteo = conteo if conteo is not None else {}
 
-    if es_pdf_complejo(ruta_pdf):
-        try:
-            texto_crudo = extract_with_pdfplumber(ruta_pdf)
+    with medir("extraccion") as m, abrir_documento(ruta_pdf) as doc:
+        m.anotar_archivo(doc.ruta)
+        hash_doc = doc.hash_md5() if cache_extraccion.activa() else None
+        ajustes = _ajustes_cache(degradado)
+        guardado = cache_extraccion.leer(hash_doc, "extraccion", **ajustes)
+        if guardado is not None:
+            m.anotar(cache=True, caracteres=len(guardado))
+            return guardado
+
+        if degradado:
+            m.anotar(degradado=True)
+            texto_crudo = extract_with_pymupdf(doc)
             if not texto_crudo.strip():
-                raise ValueError("Sin texto extraído con pdfplumber")
+                texto_crudo = ocr_completo_inteligente(doc, lang=LANG_OCR, dpi=DPI_DEGRADADO)
+        else:
+            texto_crudo = extract_hybrid(doc, conteo=conteo)
+            if not texto_crudo.strip():
+                texto_crudo = ocr_completo_inteligente(doc, lang=LANG_OCR)
+
+        texto = limpiar_texto(texto_crudo)
+        m.anotar(caracteres=len(texto))
+        if not conteo.get("ocr_fallidas"):  # con páginas sin OCR, la próxima vez se reintenta
+            cache_extraccion.guardar(hash_doc, "extraccion", texto, **ajustes)
+        return texto
+
+
+def extract_pages(ruta_pdf: RutaODocumento, degradado: bool = False, conteo: Dict[str, int] = None) -> Iterator[str]:
+    """
+    🌊 Variante en streaming de `extract_text`: produce el texto página a página,
+    ya pasado por `limpiar_texto`, sin unir nunca el documento completo en memoria.
+
+    Sigue la misma ruta que `extract_text`: `iter_hibrido`, con OCR y pdfplumber solo
+    en las páginas que los necesitan. El fallback a OCR del documento entero solo se
+    activa si ninguna página produjo texto; como esas páginas estaban vacías, no se ha
+    emitido nada todavía y el cambio es transparente.
+    `degradado` y `conteo` funcionan como en `extract_text`.
+    """
+    conteo = conteo if conteo is not None else {}
+    with abrir_documento(ruta_pdf) as doc:
+        paginas = iter_pymupdf(doc) if degradado else iter_hibrido(doc, conteo=conteo)
+
+        hubo_texto = False
+        try:
+            for pagina in paginas:
+                if pagina.strip():
+                    hubo_texto = True
+                    yield limpiar_texto(pagina)
         except Exception:
-            texto_crudo = ocr_completo_inteligente(ruta_pdf)
-    else:
-        texto_crudo = extract_with_pymupdf(ruta_pdf)
-        if not texto_crudo.strip():
-            texto_crudo = ocr_completo_inteligente(ruta_pdf)
+            if hubo_texto:
+                raise  # Ya se emitió texto parcial: no podemos cambiar de extractor a mitad
 
-    return limpiar_texto(texto_crudo)
\ No newline at end of file
+        if not hubo_texto:
+            for pagina in iter_ocr_paginas(doc, lang=LANG_OCR, dpi=DPI_DEGRADADO if degradado else None):
+                if pagina.strip():
+                    yield limpiar_texto(pagina)
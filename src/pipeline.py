@@ -0,0 +1,432 @@
+"""
+🧵 pipeline.py – Orquestación por documento y por lote
+
+Este módulo encapsula el recorrido completo de un PDF
+(extracción → limpieza → enriquecimiento → clasificación → validación → exportación)
+en una única función reutilizable, y permite repartir un lote de documentos
+entre varios procesos.
+
+🧠 Decisiones de diseño:
+- `procesar_documento()` es una función de nivel de módulo para que pueda
+  enviarse a otros procesos (pickle).
+- El reparto es dinámico: cada documento es una tarea independiente y cada
+  worker toma la siguiente en cuanto queda libre. Así un PDF escaneado lento
+  no bloquea un bloque entero de PDFs de texto.
+- Los errores nunca cruzan la frontera del proceso como excepciones: cada
+  documento devuelve un dict con `ok`, y el coordinador solo suma.
+- `procesar_documento_stream()` recorre el mismo camino página a página para
+  PDFs muy grandes: la memoria depende de una página, no del libro entero.
+- Cada PDF se abre una sola vez (`DocumentoPDF`): la sonda, la extracción,
+  el OCR y el hash comparten los mismos bytes y documentos parseados.
+- `procesar_lote()` respeta el orden recibido (ver `planificador.py`) y puede
+  limitar cuántos documentos del carril `ocr` ocupan workers a la vez.
+"""
+
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List
+
+from src.parser import extract_text, extract_pages
+from src.cleaner import limpiar_texto_completo, limpiar_paginas
+from src.enhancer import enriquecer_texto, enriquecer_paginas
+from src.classifier import clasificar_documento, iniciar_clasificacion, observar_fragmento, cerrar_clasificacion
+from src.exporter import exportar_archivos, exportar_archivos_stream
+from src import logger as _logger
+from src.logger import log_evento, log_metricas
+from src.validator import validar_documento, iniciar_validacion, observar_validacion, cerrar_validacion
+from src.documento import DocumentoPDF
+from src.checkpoint import Diario, diario_del_proceso
+from src import metricas
+from src.metricas import medir
+
+
+def procesar_documento(
+    ruta: str,
+    debug: bool = False,
+    hash_doc: str = None,
+    degradado: bool = False,
+    diario: Diario = None
+) -> Dict[str, str]:
+    """
+    Ejecuta el pipeline completo sobre un único PDF.
+
+    Args:
+        ruta: Ruta del PDF dentro de la carpeta de entrada.
+        debug: Si True, muestra detalles de cada paso.
+        hash_doc: Hash MD5 ya calculado (p. ej. al consultar el manifest), para no releer el PDF.
+        degradado: Extracción barata (ver `extract_text()`), para reintentos tras un límite excedido.
+        diario: Diario de checkpoints: cada etapa completada se anota y, si una ejecución
+            anterior quedó a medias, el documento continúa desde su última etapa.
+
+    Returns:
+        dict con archivo, hash, carpeta, categoría, dewey, título y autor
+        (y `reanudado` con la etapa recuperada del diario, si la hubo, y `ocr_fallidas`
+        con las páginas que se exportaron sin su OCR).
+
+    Raises:
+        Cualquier excepción de extracción/exportación; el llamador decide cómo registrarla.
+    """
+    # Extracción y logging inicial
+    if debug:
+        print(f"\n📘 Procesando: {ruta}")
+    with DocumentoPDF(ruta) as doc:
+        # Hash para trazabilidad (y clave del diario), sobre los bytes que usará la extracción
+        if not hash_doc:
+            with medir("hash") as m:
+                m.anotar_archivo(ruta)
+                hash_doc = doc.hash_md5()
+
+        # Las etapas de una extracción degradada quedan marcadas: una ejecución normal no las reutiliza
+        marca = {"degradado": True} if degradado else {}
+        etapa, guardado = diario.recuperar(hash_doc, degradado) if diario else (None, None)
+        if etapa == "exportado":
+            # Exportado por una ejecución que murió antes de anotarlo en el manifest
+            log_evento("reanudado", archivo=ruta, etapa=etapa)
+            resultado = {clave: guardado.get(clave) for clave in _CLAVES_RESULTADO}
+            resultado.update(archivo=ruta, reanudado=etapa)
+            return resultado
+        if etapa is None:
+            conteo = {}
+            texto_crudo = extract_text(doc, degradado=degradado, conteo=conteo)
+            if conteo.get("ocr_fallidas"):
+                # Exportación incompleta: el manifest y el diario la dejan pendiente de reintento
+                marca["ocr_fallidas"] = conteo["ocr_fallidas"]
+                log_evento("ocr_fallido", archivo=ruta, nivel="WARNING", paginas=conteo["ocr_fallidas"])
+            if diario:
+                diario.registrar(hash_doc, "extraido", texto_crudo, **marca)
+    log_evento("procesar", archivo=ruta)
+    if etapa:
+        log_evento("reanudado", archivo=ruta, etapa=etapa)
+
+    # Limpieza y enriquecimiento
+    if etapa == "enriquecido":
+        texto_enriquecido = guardado
+    else:
+        texto_crudo = guardado if etapa == "extraido" else texto_crudo
+        with medir("limpieza", caracteres=len(texto_crudo)):
+            texto_limpio = limpiar_texto_completo(texto_crudo, modo_md=True)
+        texto_enriquecido = enriquecer_texto(texto_limpio, archivo=ruta, debug=debug)
+        if diario:
+            diario.registrar(hash_doc, "enriquecido", texto_enriquecido, **marca)
+
+    # Clasificación
+    with medir("clasificacion", caracteres=len(texto_enriquecido)):
+        resultado = clasificar_documento(texto_enriquecido)
+    categoria = resultado.get("categoria")
+    dewey = resultado.get("dewey")
+    titulo = resultado.get("titulo")
+    autor = resultado.get("autor")
+    print(f"📖 Clasificado como: {categoria} ({dewey})")
+    print(f"📝 Título: {titulo or '[Sin título]'} | Autor: {autor or '[Sin autor]'}")
+
+    # Validación semántica (solo logging, no omitir)
+    with medir("validacion", caracteres=len(texto_enriquecido)):
+        es_valido, info = validar_documento(texto_enriquecido, ruta, hash_doc)
+    if debug and info.get('razones'):
+        for razon in info['razones']:
+            print(f"⚠️ {razon}")
+
+    # Exportar siempre
+    with medir("exportacion", caracteres=len(texto_enriquecido)):
+        carpeta = exportar_archivos(
+            tipo=Path(ruta).parent.name,
+            titulo=titulo,
+            texto=texto_enriquecido,
+            categoria=categoria,
+            dewey=dewey,
+            autor=autor,
+            hash_doc=hash_doc
+        )
+
+    # Logging final
+    log_evento("clasificado", archivo=ruta, categoria=categoria, dewey=dewey)
+    log_evento("export_ok", archivo=ruta, categoria=categoria, dewey=dewey)
+
+    resultado = {
+        "archivo": ruta,
+        "hash": hash_doc,
+        "carpeta": str(carpeta),
+        "categoria": categoria,
+        "dewey": dewey,
+        "titulo": titulo,
+        "autor": autor,
+    }
+    if diario:
+        diario.registrar(hash_doc, "exportado", **resultado, **marca)
+    if marca.get("ocr_fallidas"):
+        resultado["ocr_fallidas"] = marca["ocr_fallidas"]
+    if etapa:
+        resultado["reanudado"] = etapa
+    return resultado
+
+
+# Campos del resultado de `procesar_documento()` que guarda la etapa `exportado` del diario
+_CLAVES_RESULTADO = ("hash", "carpeta", "categoria", "dewey", "titulo", "autor")
+
+
+def procesar_documento_stream(ruta: str, debug: bool = False, hash_doc: str = None, degradado: bool = False) -> Dict[str, str]:
+    """
+    🌊 Variante en streaming de `procesar_documento()`, para PDFs muy grandes.
+
+    Las páginas fluyen por extracción → limpieza → enriquecimiento y se escriben
+    directamente al .txt de exportación; clasificación y validación observan
+    cada fragmento y solo guardan estado pequeño. El pico de memoria es
+    proporcional a una página.
+
+    Mismos argumentos y resultado que `procesar_documento()`.
+    """
+    if debug:
+        print(f"\n📘 Procesando (streaming): {ruta}")
+    log_evento("procesar", archivo=ruta)
+
+    with DocumentoPDF(ruta) as doc:
+        return _recorrer_stream(doc, debug, hash_doc, degradado)
+
+
+def _recorrer_stream(doc: DocumentoPDF, debug: bool, hash_doc: str, degradado: bool = False) -> Dict[str, str]:
+    """Cuerpo de `procesar_documento_stream()` con el PDF ya abierto."""
+    ruta = doc.ruta
+    if not hash_doc:
+        with medir("hash") as m:
+            m.anotar_archivo(ruta)
+            hash_doc = doc.hash_md5()
+
+    estado_clasificacion = iniciar_clasificacion()
+    estado_validacion = iniciar_validacion()
+    vistos = 0
+
+    def _observar(fragmentos):
+        nonlocal vistos
+        for fragmento in fragmentos:
+            vistos += 1
+            observar_fragmento(estado_clasificacion, fragmento)
+            observar_validacion(estado_validacion, fragmento)
+            yield fragmento
+
+    conteo = {}
+    fragmentos = enriquecer_paginas(limpiar_paginas(extract_pages(doc, degradado=degradado, conteo=conteo), modo_md=True))
+    resultado = {}
+
+    def _metadatos():
+        resultado.update(cerrar_clasificacion(estado_clasificacion))
+        return resultado
+
+    # Las etapas se intercalan página a página: se mide el recorrido completo
+    with medir("stream") as m:
+        m.anotar_archivo(ruta)
+        carpeta = exportar_archivos_stream(
+            tipo=Path(ruta).parent.name,
+            fragmentos=_observar(fragmentos),
+            hash_doc=hash_doc,
+            metadatos=_metadatos
+        )
+        m.anotar(fragmentos=vistos)
+
+    categoria = resultado.get("categoria")
+    dewey = resultado.get("dewey")
+    titulo = resultado.get("titulo")
+    autor = resultado.get("autor")
+    print(f"📖 Clasificado como: {categoria} ({dewey})")
+    print(f"📝 Título: {titulo or '[Sin título]'} | Autor: {autor or '[Sin autor]'}")
+    if debug:
+        print(f"🌊 Fragmentos procesados: {vistos}")
+
+    # Validación semántica (solo logging, no omitir)
+    es_valido, info = cerrar_validacion(estado_validacion, ruta, hash_doc)
+    if debug and info.get('razones'):
+        for razon in info['razones']:
+            print(f"⚠️ {razon}")
+
+    log_evento("clasificado", archivo=ruta, categoria=categoria, dewey=dewey)
+    log_evento("export_ok", archivo=ruta, categoria=categoria, dewey=dewey)
+
+    resultado = {
+        "archivo": ruta,
+        "hash": hash_doc,
+        "carpeta": str(carpeta),
+        "categoria": categoria,
+        "dewey": dewey,
+        "titulo": titulo,
+        "autor": autor,
+    }
+    if conteo.get("ocr_fallidas"):
+        log_evento("ocr_fallido", archivo=ruta, nivel="WARNING", paginas=conteo["ocr_fallidas"])
+        resultado["ocr_fallidas"] = conteo["ocr_fallidas"]
+    return resultado
+
+
+def procesar_con_registro(
+    ruta: str,
+    debug: bool = False,
+    hash_doc: str = None,
+    opciones: Dict[str, object] = None
+) -> Dict[str, object]:
+    """
+    Envoltura tolerante de `procesar_documento()`: nunca lanza excepciones.
+
+    Args:
+        opciones: Dict opcional; `stream=True` usa `procesar_documento_stream()`,
+            `degradado=True` pide la extracción barata, `limite_s` / `limite_mb`
+            ejecutan el documento en un proceso vigilado (ver `supervisor.py`) y
+            `checkpoint=True` anota cada etapa en el diario para poder reanudar
+            (ver `checkpoint.py`; no aplica al modo streaming).
+
+    Returns:
+        El resultado del documento con `ok=True`, o `{"archivo", "ok": False, "error"}`
+        tras registrar el evento `error_parse`; en ambos casos con `duracion_s`.
+        Con las métricas activas incluye además `metricas`: las mediciones por
+        etapa de este documento.
+    """
+    opciones = opciones or {}
+    if opciones.get("limite_s") or opciones.get("limite_mb"):
+        from src.supervisor import procesar_supervisado
+
+        return procesar_supervisado(ruta, debug, hash_doc, opciones)
+    procesar = procesar_documento_stream if opciones.get("stream") else procesar_documento
+    extra = {"diario": diario_del_proceso()} if opciones.get("checkpoint") and not opciones.get("stream") else {}
+    inicio = time.perf_counter()
+    with metricas.documento(ruta) as registros:
+        try:
+            resultado = procesar(ruta, debug=debug, hash_doc=hash_doc, degradado=bool(opciones.get("degradado")), **extra)
+            resultado["ok"] = True
+            if opciones.get("degradado"):
+                resultado["degradado"] = True
+        except Exception as e:
+            log_evento("error_parse", archivo=ruta, nivel="ERROR", mensaje=str(e))
+            if debug:
+                print(f"❌ Error procesando {ruta}: {e}")
+            resultado = {"archivo": ruta, "ok": False, "error": str(e)}
+    resultado["duracion_s"] = round(time.perf_counter() - inicio, 3)
+    if registros:
+        log_metricas(ruta, registros)
+        resultado["metricas"] = registros
+    return resultado
+
+
+def _compartir_contexto_logs():
+    """
+    Fija en el entorno el id de ejecución y el sello de tiempo de los logs,
+    para que los procesos hijos (incluso en modo spawn) escriban en los mismos archivos `run_*`.
+    """
+    os.environ["EXECUTION_ID"] = _logger.EXECUTION_ID
+    os.environ["LOG_TIMESTAMP"] = _logger.timestamp
+
+
+def procesar_lote(
+    rutas: Iterable[str],
+    workers: int = 1,
+    debug: bool = False,
+    al_terminar: Callable[[Dict[str, object]], None] = None,
+    hashes: Dict[str, str] = None,
+    opciones: Dict[str, object] = None,
+    carriles: Dict[str, str] = None,
+    limite_ocr: int = None
+) -> List[Dict[str, object]]:
+    """
+    Procesa un lote de PDFs, en serie (`workers=1`) o con un pool de procesos.
+
+    Cada documento se envía como una tarea independiente cuando un worker queda
+    libre, en el orden de `rutas`. Si un documento del carril `ocr` no cabe
+    (ya hay `limite_ocr` en curso), se adelanta el siguiente del carril `texto`.
+
+    Args:
+        rutas: Rutas de los PDFs a procesar.
+        workers: Número de procesos (1 = en serie, en el proceso actual).
+        debug: Si True, muestra detalles de cada paso.
+        al_terminar: Callback opcional invocado con cada resultado en el proceso coordinador.
+        hashes: Hashes ya calculados por ruta, para no releer cada PDF.
+        opciones: Opciones por documento (ver `procesar_con_registro()`).
+        carriles: Carril por ruta ('texto' u 'ocr'), p. ej. de `planificador.planificar()`.
+        limite_ocr: Máximo de documentos del carril `ocr` en curso a la vez (None = sin límite).
+
+    Returns:
+        Lista de resultados por documento, en orden de finalización. Nunca lanza:
+        si un worker muere, los documentos que tenía el pool en curso cuentan
+        como error y el resto se procesa en un pool nuevo.
+    """
+    rutas = [str(r) for r in rutas]
+    hashes = hashes or {}
+    carriles = carriles or {}
+    if limite_ocr is not None:
+        limite_ocr = max(1, limite_ocr)
+    resultados = []
+
+    def _registrar(resultado):
+        resultados.append(resultado)
+        if al_terminar:
+            al_terminar(resultado)
+
+    if workers <= 1 or len(rutas) <= 1:
+        for ruta in rutas:
+            _registrar(procesar_con_registro(ruta, debug, hashes.get(ruta), opciones))
+        return resultados
+
+    _compartir_contexto_logs()
+    workers = min(workers, len(rutas))
+    pendientes = list(rutas)
+    en_curso = {}
+
+    def _siguiente():
+        ocr_en_curso = sum(1 for r in en_curso.values() if carriles.get(r) == "ocr")
+        for i, ruta in enumerate(pendientes):
+            if carriles.get(ruta) != "ocr" or limite_ocr is None or ocr_en_curso < limite_ocr:
+                return pendientes.pop(i)
+        return None  # solo quedan documentos OCR y su carril está lleno
+
+    def _fallido(ruta, e):
+        log_evento("error_parse", archivo=ruta, nivel="ERROR", mensaje=str(e))
+        return {"archivo": ruta, "ok": False, "error": str(e) or type(e).__name__}
+
+    pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        while pendientes or en_curso:
+            roto, caidos = None, []
+            while len(en_curso) < workers:
+                ruta = _siguiente()
+                if ruta is None:
+                    break
+                try:
+                    en_curso[pool.submit(procesar_con_registro, ruta, debug, hashes.get(ruta), opciones)] = ruta
+                except BrokenProcessPool as e:
+                    pendientes.insert(0, ruta)  # no llegó a enviarse
+                    roto = e
+                    break
+            if roto is None:
+                terminados, _ = wait(list(en_curso), return_when=FIRST_COMPLETED)
+                for futuro in terminados:
+                    ruta = en_curso.pop(futuro)
+                    try:
+                        resultado = futuro.result()
+                    except BrokenProcessPool as e:
+                        roto = e
+                        caidos.append(ruta)
+                        continue
+                    except Exception as e:
+                        resultado = _fallido(ruta, e)
+                    _registrar(resultado)
+            if roto is not None:
+                # Un worker murió (os._exit, OOM killer...) y el pool entero queda inservible:
+                # los documentos en curso cuentan como error y el resto sigue en un pool nuevo.
+                caidos += en_curso.values()
+                en_curso.clear()
+                pool.shutdown(wait=False, cancel_futures=True)
+                if not caidos:
+                    # Sin documento en curso al que atribuir la caída, no se reintenta
+                    caidos, pendientes[:] = list(pendientes), []
+                for ruta in caidos:
+                    _registrar(_fallido(ruta, roto))
+                if pendientes:
+                    pool = ProcessPoolExecutor(max_workers=workers)
+    finally:
+        pool.shutdown()
+
+    return resultados
+
+
+def resumir(resultados: List[Dict[str, object]]) -> Dict[str, int]:
+    """Cuenta documentos procesados y con error a partir de los resultados."""
+    procesados = sum(1 for r in resultados if r.get("ok"))
+    return {"procesados": procesados, "errores": len(resultados) - procesados}
@@ -0,0 +1,402 @@
+"""
+⚡ pipeline_async.py – Pipeline por etapas con asyncio y colas acotadas
+
+Variante de `pipeline.procesar_lote()` en la que cada etapa del recorrido
+corre en su propio executor y se comunica con la siguiente mediante una
+`asyncio.Queue` de capacidad limitada:
+
+    lectura/hash → extracción/OCR → limpieza+enriquecimiento → clasificación+validación → exportación
+      (hilos)        (procesos)            (procesos)                  (procesos)             (hilos)
+
+🧠 Decisiones de diseño:
+- El bucle de eventos solo coordina: las escrituras (exportación, `log_evento`)
+  y la lectura del PDF para el hash van a executors de hilos, el trabajo de
+  CPU a executors de procesos. Así la E/S de un documento se solapa con la
+  limpieza o clasificación de otro.
+- Las colas acotadas dan contrapresión: si la limpieza va lenta, la extracción
+  se detiene al llenar su cola en lugar de acumular textos en memoria.
+- Un documento con error se marca y atraviesa las etapas restantes sin
+  procesarse, hasta el colector, que lo registra como `error_parse`.
+- Un muestreador registra la profundidad de cada cola para detectar cuellos de botella.
+- Cada llamada a un executor pasa por `metricas.ejecutar_medido()`, de modo que
+  las mediciones por etapa vuelven con el documento aunque se tomen en otro proceso.
+- La lectura solo busca el hash en la caché persistente: la extracción abre el PDF
+  una vez (`DocumentoPDF`) y, si hace falta, calcula el hash sobre esos mismos bytes.
+- Con `checkpoint`, cada etapa anota su avance en el diario como `procesar_documento()`
+  y un documento a medias continúa desde su última etapa.
+- Con `carriles` y `limite_ocr`, como en `procesar_lote()`, a lo sumo `limite_ocr`
+  documentos del carril `ocr` se extraen a la vez; los de texto no esperan por ellos.
+- Si un proceso muere (OOM killer...), su pool queda roto: los documentos que tenía en
+  curso cuentan como error y la etapa sigue con un pool nuevo.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.checkpoint import diario_del_proceso
+from src.documento import DocumentoPDF
+from src.parser import extract_text
+from src.cleaner import limpiar_texto_completo
+from src.enhancer import enriquecer_texto
+from src.classifier import clasificar_documento
+from src.exporter import exportar_archivos
+from src import logger as _logger
+from src.logger import log_evento, log_metricas
+from src.metricas import ejecutar_medido, medir
+from src.validator import validar_documento
+from src.utils import buscar_hash_en_cache
+
+ETAPAS = ["lectura", "extraccion", "enriquecimiento", "clasificacion", "exportacion"]
+
+# Capacidad por defecto de cada cola entre etapas (documentos en espera)
+CAPACIDAD_COLA = 4
+
+# Segundos entre muestras de profundidad de colas
+INTERVALO_MUESTREO = 0.5
+
+_FIN = None  # centinela de fin de flujo
+
+# Opciones de `procesar_con_registro()` que este pipeline no admite (ver `main.py`)
+OPCIONES_NO_ADMITIDAS = ("stream", "limite_s", "limite_mb", "degradar", "degradado")
+
+# Campos del resultado que guarda la etapa `exportado` del diario (como en `pipeline.py`)
+_CLAVES_RESULTADO = ("hash", "carpeta", "categoria", "dewey", "titulo", "autor")
+
+
+# ─────────────────────────────────────────────────────────────
+# 🧩 Trabajo de cada etapa (nivel de módulo: debe poder enviarse a procesos)
+# ─────────────────────────────────────────────────────────────
+def _etapa_lectura(ruta: str) -> Optional[str]:
+    """Hash del PDF si la caché persistente lo tiene (sin leer el archivo); si no, None."""
+    return buscar_hash_en_cache(os.stat(ruta), "md5")
+
+
+def _etapa_extraccion(ruta: str, hash_doc: str, checkpoint: bool) -> Tuple[str, Optional[str], object, int]:
+    """
+    Abre el PDF una sola vez: hash (si falta), etapa recuperada del diario y extracción.
+
+    Returns:
+        (hash, etapa recuperada o None, texto o entrada `exportado` del diario, páginas sin OCR)
+    """
+    with DocumentoPDF(ruta) as doc:
+        if not hash_doc:
+            with medir("hash") as m:
+                m.anotar_archivo(ruta)
+                hash_doc = doc.hash_md5()
+        diario = diario_del_proceso() if checkpoint else None
+        etapa, guardado = diario.recuperar(hash_doc) if diario else (None, None)
+        if etapa is not None:
+            return hash_doc, etapa, guardado, 0
+        conteo = {}
+        texto = extract_text(doc, conteo=conteo)
+        fallidas = conteo.get("ocr_fallidas", 0)
+        if diario:
+            diario.registrar(hash_doc, "extraido", texto, **({"ocr_fallidas": fallidas} if fallidas else {}))
+        return hash_doc, None, texto, fallidas
+
+
+def _etapa_enriquecimiento(ruta: str, texto_crudo: str, debug: bool, hash_doc: str = None,
+                           checkpoint: bool = False, marca: Dict[str, object] = None) -> str:
+    with medir("limpieza", caracteres=len(texto_crudo)):
+        texto_limpio = limpiar_texto_completo(texto_crudo, modo_md=True)
+    texto = enriquecer_texto(texto_limpio, archivo=ruta, debug=debug)
+    if checkpoint:
+        diario_del_proceso().registrar(hash_doc, "enriquecido", texto, **(marca or {}))
+    return texto
+
+
+def _etapa_clasificacion(ruta: str, texto: str, hash_doc: str, debug: bool) -> dict:
+    with medir("clasificacion", caracteres=len(texto)):
+        resultado = clasificar_documento(texto)
+    with medir("validacion", caracteres=len(texto)):
+        _, info = validar_documento(texto, ruta, hash_doc)
+    if debug and info.get('razones'):
+        for razon in info['razones']:
+            print(f"⚠️ {razon}")
+    return resultado
+
+
+# ─────────────────────────────────────────────────────────────
+# 🔁 Motor de etapas
+# ─────────────────────────────────────────────────────────────
+async def _consumidor(entrada: asyncio.Queue, salida: asyncio.Queue, procesar: Callable):
+    while True:
+        item = await entrada.get()
+        if item is _FIN:
+            await entrada.put(_FIN)  # lo reenvía para los demás consumidores de la etapa
+            return
+        if "error" not in item:
+            try:
+                await procesar(item)
+            except Exception as e:
+                item["error"] = str(e)
+        await salida.put(item)
+
+
+async def _correr_etapa(entrada: asyncio.Queue, salida: asyncio.Queue, procesar: Callable, concurrencia: int):
+    await asyncio.gather(*[_consumidor(entrada, salida, procesar) for _ in range(concurrencia)])
+    await salida.put(_FIN)
+
+
+async def _muestrear_colas(colas: Dict[str, asyncio.Queue], muestras: Dict[str, List[int]],
+                           terminado: asyncio.Event, debug: bool):
+    while not terminado.is_set():
+        for nombre, cola in colas.items():
+            muestras[nombre].append(cola.qsize())
+        if debug:
+            estado = " | ".join(f"{n}: {c.qsize()}/{c.maxsize}" for n, c in colas.items())
+            print(f"📦 Colas → {estado}")
+        try:
+            await asyncio.wait_for(terminado.wait(), timeout=INTERVALO_MUESTREO)
+        except asyncio.TimeoutError:
+            pass
+
+
+def resumir_colas(muestras: Dict[str, List[int]]) -> Dict[str, Dict[str, float]]:
+    """Convierte las muestras de profundidad en {etapa: {"max", "media"}}."""
+    return {
+        nombre: {
+            "max": max(valores) if valores else 0,
+            "media": round(sum(valores) / len(valores), 2) if valores else 0.0,
+        }
+        for nombre, valores in muestras.items()
+    }
+
+
+async def ejecutar_pipeline_async(
+    rutas: Iterable[str],
+    workers: int = 1,
+    debug: bool = False,
+    al_terminar: Callable[[Dict[str, object]], None] = None,
+    hashes: Dict[str, str] = None,
+    capacidad_cola: int = CAPACIDAD_COLA,
+    opciones: Dict[str, object] = None,
+    carriles: Dict[str, str] = None,
+    limite_ocr: int = None
+) -> Tuple[List[Dict[str, object]], Dict[str, Dict[str, float]]]:
+    """
+    Ejecuta el pipeline por etapas sobre un lote de PDFs.
+
+    Args:
+        rutas: Rutas de los PDFs a procesar.
+        workers: Procesos para la extracción; limpieza y clasificación usan la mitad (mínimo 1).
+        debug: Si True, muestra la profundidad de las colas durante la ejecución.
+        al_terminar: Callback opcional invocado con cada resultado.
+        hashes: Hashes ya calculados por ruta.
+        capacidad_cola: Documentos máximos en espera entre dos etapas.
+        opciones: Opciones por documento; solo se admite `checkpoint` (ver `OPCIONES_NO_ADMITIDAS`).
+        carriles: Carril por ruta ('texto' u 'ocr'), p. ej. de `planificador.planificar()`.
+        limite_ocr: Máximo de documentos del carril `ocr` extrayéndose a la vez (None = sin límite).
+
+    Returns:
+        (resultados por documento, resumen de profundidad de colas por etapa)
+
+    Raises:
+        ValueError: Si `opciones` pide algo que este pipeline no admite.
+    """
+    opciones = opciones or {}
+    no_admitidas = [clave for clave in OPCIONES_NO_ADMITIDAS if opciones.get(clave)]
+    if no_admitidas:
+        raise ValueError(f"Opciones no admitidas por el pipeline async: {', '.join(no_admitidas)}")
+    checkpoint = bool(opciones.get("checkpoint"))
+    rutas = [str(r) for r in rutas]
+    hashes = hashes or {}
+    carriles = carriles or {}
+    loop = asyncio.get_running_loop()
+    workers = max(1, workers)
+    cpu_secundario = max(1, workers // 2)
+    carril_ocr = asyncio.Semaphore(max(1, limite_ocr)) if limite_ocr is not None else None
+
+    # Los hijos (incluso en modo spawn) deben escribir en los mismos logs de la ejecución
+    os.environ["EXECUTION_ID"] = _logger.EXECUTION_ID
+    os.environ["LOG_TIMESTAMP"] = _logger.timestamp
+
+    # Los pools de procesos se recrean si un worker muere: se guardan por etapa
+    tamanos = {"extraccion": workers, "enriquecimiento": cpu_secundario, "clasificacion": cpu_secundario}
+    pools = {nombre: ProcessPoolExecutor(max_workers=n) for nombre, n in tamanos.items()}
+    pools["lectura"] = ThreadPoolExecutor(max_workers=2, thread_name_prefix="lectura")
+    pools["exportacion"] = ThreadPoolExecutor(max_workers=2, thread_name_prefix="exportacion")
+    pool_logs = ThreadPoolExecutor(max_workers=1, thread_name_prefix="logs")  # un hilo: conserva el orden
+
+    def _log(*args, **kwargs):
+        return loop.run_in_executor(pool_logs, lambda: log_evento(*args, **kwargs))
+
+    async def _medido(item, etapa, funcion, *args):
+        """Ejecuta `funcion` en el pool de `etapa` y acumula sus mediciones en el documento."""
+        pool = pools[etapa]
+        try:
+            resultado, registros = await loop.run_in_executor(pool, ejecutar_medido, item["archivo"], funcion, *args)
+        except BrokenProcessPool:
+            # Un worker murió (os._exit, OOM killer...): los documentos que el pool tenía
+            # en curso fallan con este error y el primero en enterarse pone uno nuevo.
+            if pools[etapa] is pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+                pools[etapa] = ProcessPoolExecutor(max_workers=tamanos[etapa])
+            raise
+        if registros:
+            item.setdefault("metricas", []).extend(registros)
+        return resultado
+
+    def _marca(item):
+        return {"ocr_fallidas": item["ocr_fallidas"]} if item.get("ocr_fallidas") else {}
+
+    async def _leer(item):
+        if not item.get("hash"):
+            item["hash"] = await _medido(item, "lectura", _etapa_lectura, item["archivo"])
+
+    async def _extraer_documento(item):
+        item["hash"], etapa, guardado, fallidas = await _medido(
+            item, "extraccion", _etapa_extraccion, item["archivo"], item["hash"], checkpoint
+        )
+        if fallidas:
+            # Exportación incompleta: el manifest y el diario la dejan pendiente de reintento
+            item["ocr_fallidas"] = fallidas
+            await _log("ocr_fallido", archivo=item["archivo"], nivel="WARNING", paginas=fallidas)
+        if etapa == "exportado":
+            # Exportado por una ejecución que murió antes de anotarlo en el manifest
+            item.update({clave: guardado.get(clave) for clave in _CLAVES_RESULTADO}, reanudado=etapa)
+            await _log("reanudado", archivo=item["archivo"], etapa=etapa)
+            return
+        item["texto"] = guardado
+        await _log("procesar", archivo=item["archivo"])
+        if etapa:
+            item["reanudado"] = etapa
+            await _log("reanudado", archivo=item["archivo"], etapa=etapa)
+
+    async def _extraer(item):
+        if debug:
+            print(f"\n📘 Procesando: {item['archivo']}")
+        if carril_ocr is not None and carriles.get(item["archivo"]) == "ocr":
+            async with carril_ocr:
+                await _extraer_documento(item)
+        else:
+            await _extraer_documento(item)
+
+    async def _enriquecer(item):
+        if item.get("reanudado") in ("enriquecido", "exportado"):
+            return
+        item["texto"] = await _medido(
+            item, "enriquecimiento", _etapa_enriquecimiento, item["archivo"], item["texto"], debug,
+            item["hash"], checkpoint, _marca(item)
+        )
+
+    async def _clasificar(item):
+        if item.get("reanudado") == "exportado":
+            return
+        item.update(await _medido(
+            item, "clasificacion", _etapa_clasificacion, item["archivo"], item["texto"], item["hash"], debug
+        ))
+        print(f"📖 Clasificado como: {item['categoria']} ({item['dewey']})")
+        print(f"📝 Título: {item['titulo'] or '[Sin título]'} | Autor: {item['autor'] or '[Sin autor]'}")
+
+    def _exportar_medido(item):
+        with medir("exportacion", caracteres=len(item["texto"])):
+            carpeta = exportar_archivos(
+                tipo=Path(item["archivo"]).parent.name,
+                titulo=item["titulo"],
+                texto=item["texto"],
+                categoria=item["categoria"],
+                dewey=item["dewey"],
+                autor=item["autor"],
+                hash_doc=item["hash"]
+            )
+        if checkpoint:
+            resultado = {clave: item.get(clave) for clave in _CLAVES_RESULTADO}
+            resultado.update(archivo=item["archivo"], carpeta=str(carpeta))
+            diario_del_proceso().registrar(item["hash"], "exportado", **resultado, **_marca(item))
+        return carpeta
+
+    async def _exportar(item):
+        if item.get("reanudado") == "exportado":
+            return
+        carpeta = await _medido(item, "exportacion", _exportar_medido, item)
+        item["carpeta"] = str(carpeta)
+        del item["texto"]  # el texto ya no viaja más allá de la exportación
+        await _log("clasificado", archivo=item["archivo"], categoria=item["categoria"], dewey=item["dewey"])
+        await _log("export_ok", archivo=item["archivo"], categoria=item["categoria"], dewey=item["dewey"])
+
+    procesadores = [
+        (_leer, 2),
+        # Con carril OCR, los documentos que esperan turno no ocupan un proceso:
+        # sobran consumidores para que los de texto sigan entrando a la extracción
+        (_extraer, workers * 2 if carril_ocr is not None else workers),
+        (_enriquecer, cpu_secundario),
+        (_clasificar, cpu_secundario),
+        (_exportar, 2),
+    ]
+    colas = {nombre: asyncio.Queue(maxsize=capacidad_cola) for nombre in ETAPAS}
+    salida_final = asyncio.Queue(maxsize=capacidad_cola)
+    siguientes = [colas[n] for n in ETAPAS[1:]] + [salida_final]
+
+    muestras = {nombre: [] for nombre in ETAPAS}
+    terminado = asyncio.Event()
+    resultados = []
+
+    async def _producir():
+        for ruta in rutas:
+            await colas[ETAPAS[0]].put({"archivo": ruta, "hash": hashes.get(ruta)})
+        await colas[ETAPAS[0]].put(_FIN)
+
+    async def _recolectar():
+        while True:
+            item = await salida_final.get()
+            if item is _FIN:
+                return
+            if "error" in item:
+                await _log("error_parse", archivo=item["archivo"], nivel="ERROR", mensaje=item["error"])
+                if debug:
+                    print(f"❌ Error procesando {item['archivo']}: {item['error']}")
+                resultado = {"archivo": item["archivo"], "ok": False, "error": item["error"]}
+                if "metricas" in item:
+                    resultado["metricas"] = item["metricas"]
+            else:
+                item.pop("texto", None)
+                resultado = dict(item, ok=True)
+            if "metricas" in resultado:
+                await loop.run_in_executor(pool_logs, log_metricas, item["archivo"], resultado["metricas"])
+            resultados.append(resultado)
+            if al_terminar:
+                al_terminar(resultado)
+
+    muestreador = asyncio.create_task(_muestrear_colas(colas, muestras, terminado, debug))
+    try:
+        await asyncio.gather(
+            _producir(),
+            *[
+                _correr_etapa(colas[nombre], siguiente, procesar, concurrencia)
+                for nombre, siguiente, (procesar, concurrencia) in zip(ETAPAS, siguientes, procesadores)
+            ],
+            _recolectar(),
+        )
+    finally:
+        terminado.set()
+        await muestreador
+        for pool in [*pools.values(), pool_logs]:
+            pool.shutdown(wait=True)
+
+    profundidades = resumir_colas(muestras)
+    log_evento("colas_etapas", profundidades=profundidades)
+    return resultados, profundidades
+
+
+def procesar_lote_async(
+    rutas: Iterable[str],
+    workers: int = 1,
+    debug: bool = False,
+    al_terminar: Callable[[Dict[str, object]], None] = None,
+    hashes: Dict[str, str] = None,
+    capacidad_cola: int = CAPACIDAD_COLA,
+    opciones: Dict[str, object] = None,
+    carriles: Dict[str, str] = None,
+    limite_ocr: int = None
+) -> Tuple[List[Dict[str, object]], Dict[str, Dict[str, float]]]:
+    """Punto de entrada síncrono de `ejecutar_pipeline_async()`."""
+    return asyncio.run(ejecutar_pipeline_async(
+        rutas, workers=workers, debug=debug, al_terminar=al_terminar,
+        hashes=hashes, capacidad_cola=capacidad_cola,
+        opciones=opciones, carriles=carriles, limite_ocr=limite_ocr
+    ))
@@ -0,0 +1,104 @@
+"""
+🗓️ planificador.py – Orden de los documentos según su coste estimado
+
+`rglob()` devuelve los PDFs en orden de directorio: un libro escaneado de 900
+páginas puede tocar al final y alargar toda la ejecución. Antes de procesar,
+una sonda barata (`sonda.sondear_pdf()`, sin extraer el texto completo) anota de cada PDF:
+
+- número de páginas y tamaño en bytes
+- qué fracción de las páginas muestreadas tiene capa de texto
+
+y con eso estima su coste en segundos. El lote se ordena según una política:
+
+- `largos`: primero los más caros (minimiza la duración total con varios workers).
+- `cortos`: primero los más baratos (resultados cuanto antes).
+
+Los documentos que necesitarán OCR van al carril `ocr`, cuyo número de
+documentos simultáneos se limita en `procesar_lote()` para que no ocupen todos
+los workers. Cada estimación se registra en el log (`estimacion_costo`) junto
+con la duración real al terminar (`costo_real`), para calibrar las constantes.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+POLITICAS = ("largos", "cortos")
+
+# Segundos estimados por página según tenga o no capa de texto, y fijos por documento
+# (limpieza, clasificación y exportación). Calibrar con los eventos `costo_real`.
+COSTO_PAGINA_TEXTO = 0.02
+COSTO_PAGINA_OCR = 1.5
+COSTO_FIJO = 0.15
+
+# Páginas que se muestrean para decidir si hay capa de texto
+PAGINAS_MUESTRA = 3
+
+# Fracción de páginas sin texto a partir de la cual el documento va al carril OCR
+UMBRAL_OCR = 0.5
+
+
+def sondear(ruta: str, paginas_muestra: int = PAGINAS_MUESTRA) -> Dict[str, object]:
+    """
+    Sonda barata de un PDF: abre solo la tabla de páginas y muestrea algunas.
+
+    Returns:
+        dict con archivo, paginas, bytes, fraccion_texto (0–1), carril ('texto'/'ocr')
+        y costo_s. Si el PDF no se puede abrir, `paginas=0` y `error`.
+    """
+    from src.sonda import sondear_pdf  # la misma sonda que decide el extractor
+
+    sonda = {"archivo": str(ruta), "paginas": 0, "bytes": 0, "fraccion_texto": 1.0}
+    try:
+        sonda["bytes"] = Path(ruta).stat().st_size
+        muestra = sondear_pdf(ruta, muestras=paginas_muestra, parar_al_decidir=False)
+        sonda["paginas"] = muestra["paginas"]
+        if muestra["clases"]:
+            con_texto = sum(1 for clase in muestra["clases"].values() if clase == "texto")
+            sonda["fraccion_texto"] = round(con_texto / len(muestra["clases"]), 3)
+    except Exception as e:
+        sonda["error"] = str(e)
+
+    sonda["carril"] = "ocr" if 1 - sonda["fraccion_texto"] >= UMBRAL_OCR else "texto"
+    sonda["costo_s"] = round(estimar_costo(sonda["paginas"], sonda["fraccion_texto"]), 3)
+    return sonda
+
+
+def estimar_costo(paginas: int, fraccion_texto: float) -> float:
+    """Segundos estimados para procesar un documento."""
+    por_pagina = fraccion_texto * COSTO_PAGINA_TEXTO + (1 - fraccion_texto) * COSTO_PAGINA_OCR
+    return COSTO_FIJO + paginas * por_pagina
+
+
+def planificar(rutas: Iterable[str], politica: str = "largos") -> List[Dict[str, object]]:
+    """
+    Sondea cada ruta y devuelve las sondas en el orden de la política.
+
+    A igual coste se conserva el orden de entrada (orden estable).
+    """
+    if politica not in POLITICAS:
+        raise ValueError(f"Política desconocida: {politica!r} (opciones: {', '.join(POLITICAS)})")
+    sondas = [sondear(ruta) for ruta in rutas]
+    return sorted(sondas, key=lambda s: s["costo_s"], reverse=(politica == "largos"))
+
+
+def registrar_plan(plan: List[Dict[str, object]], politica: str):
+    """Escribe en el log estructurado una línea `estimacion_costo` por documento, con su posición."""
+    from src.logger import log_metricas
+
+    log_metricas("", [dict(sonda, politica=politica, posicion=i) for i, sonda in enumerate(plan)],
+                 evento="estimacion_costo")
+
+
+def registrar_costo_real(sonda: Dict[str, object], resultado: Dict[str, object]):
+    """Escribe en el log estructurado la duración real de un documento junto a su estimación."""
+    from src.logger import log_metricas
+
+    if "duracion_s" in resultado:
+        log_metricas(sonda["archivo"], [{
+            "costo_s": sonda["costo_s"],
+            "duracion_s": resultado["duracion_s"],
+            "paginas": sonda["paginas"],
+            "fraccion_texto": sonda["fraccion_texto"],
+            "carril": sonda["carril"],
+            "ok": bool(resultado.get("ok")),
+        }], evento="costo_real")
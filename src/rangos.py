@@ -0,0 +1,122 @@
+"""
+✂️ rangos.py – Extracción paralela por rangos de páginas
+
+Una obra de consulta de 1.500 páginas se extrae página a página en un solo
+proceso: con pdfplumber, varios minutos mientras los demás núcleos esperan.
+Con un presupuesto de procesos por documento, los PDFs grandes se parten en
+rangos de páginas contiguas que extraen varios procesos a la vez, cada uno con
+su propio manejador del archivo; los textos se reúnen en el orden original,
+idénticos a los de la extracción secuencial.
+
+    python main.py --workers 2 --paginas-paralelas   # 8 núcleos → 4 procesos por documento
+
+🧠 Decisiones de diseño:
+- Presupuesto de núcleos: `main.py` reparte los núcleos entre los workers de
+  documentos (`núcleos // workers` procesos por documento), de modo que ambos
+  niveles de paralelismo juntos no superan la máquina.
+- El presupuesto viaja en la variable de entorno `PIPELINE_PROCESOS_PAGINAS`
+  (como `PIPELINE_METRICAS`): los procesos de documentos la heredan.
+- Solo se paraleliza a partir de `MIN_PAGINAS_PARALELO` páginas; por debajo,
+  arrancar procesos cuesta más de lo que ahorra.
+- Tamaño de rango automático: unos `RANGOS_POR_PROCESO` rangos por proceso
+  (las páginas escaneadas o densas no quedan todas en el mismo), entre
+  `MIN_BLOQUE` y `MAX_BLOQUE` páginas.
+- El mismo presupuesto reparte el OCR de un documento página a página
+  (`ocr.iter_ocr_paralelo()`), con Tesseract a un hilo por proceso.
+- Con límites de tiempo o memoria (`supervisor.py`) se extrae en secuencia:
+  la RSS vigilada es la del proceso del documento, no la de sus hijos.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+# Procesos de extracción por documento (1 = secuencial, el comportamiento por defecto)
+PROCESOS_PAGINAS = max(1, int(os.getenv("PIPELINE_PROCESOS_PAGINAS", "1") or 1))
+
+# Páginas a partir de las cuales compensa repartir un documento
+MIN_PAGINAS_PARALELO = 200
+
+# Rangos por proceso y límites del tamaño de rango (en páginas)
+RANGOS_POR_PROCESO = 4
+MIN_BLOQUE = 25
+MAX_BLOQUE = 250
+
+
+def activar(procesos: int) -> None:
+    """Fija los procesos por documento en este proceso y en los hijos que cree."""
+    global PROCESOS_PAGINAS
+    PROCESOS_PAGINAS = max(1, int(procesos))
+    os.environ["PIPELINE_PROCESOS_PAGINAS"] = str(PROCESOS_PAGINAS)
+
+
+def presupuesto(workers: int, nucleos: int = None) -> int:
+    """Procesos por documento que caben junto a `workers` documentos en paralelo."""
+    nucleos = nucleos or os.cpu_count() or 1
+    return max(1, nucleos // max(1, workers))
+
+
+def procesos_para(paginas: int) -> int:
+    """Procesos a usar para un documento de `paginas` páginas (1 = secuencial)."""
+    if PROCESOS_PAGINAS <= 1 or paginas < MIN_PAGINAS_PARALELO:
+        return 1
+    return min(PROCESOS_PAGINAS, -(-paginas // MIN_BLOQUE))
+
+
+def tamano_bloque(paginas: int, procesos: int) -> int:
+    """Páginas por rango: ~`RANGOS_POR_PROCESO` rangos por proceso, entre `MIN_BLOQUE` y `MAX_BLOQUE`."""
+    bloque = -(-paginas // (max(1, procesos) * RANGOS_POR_PROCESO))
+    return max(MIN_BLOQUE, min(MAX_BLOQUE, bloque))
+
+
+def rangos_de(paginas: int, bloque: int) -> List[Tuple[int, int]]:
+    """Rangos [inicio, fin) contiguos que cubren `paginas` páginas."""
+    return [(inicio, min(inicio + bloque, paginas)) for inicio in range(0, paginas, bloque)]
+
+
+def _extraer_rango(ruta: str, motor: str, inicio: int, fin: int) -> Tuple[List[str], Dict[str, int]]:
+    """Trabajo de un proceso: abre su propio manejador y extrae las páginas [inicio, fin)."""
+    global PROCESOS_PAGINAS
+    from src import parser
+
+    PROCESOS_PAGINAS = 1  # ya es uno de los procesos del documento: su OCR no abre otro pool
+    conteo = {}
+    paginas = range(inicio, fin)
+    if motor == "hibrido":
+        textos = list(parser.iter_hibrido(ruta, paginas=paginas, conteo=conteo))
+    elif motor == "pdfplumber":
+        textos = list(parser.iter_pdfplumber(ruta, paginas=paginas))
+    else:
+        textos = list(parser.iter_pymupdf(ruta, paginas=paginas))
+    return textos, conteo
+
+
+def extraer_en_paralelo(
+    ruta: str,
+    motor: str,
+    paginas: int,
+    procesos: int,
+    conteo: Dict[str, int] = None
+) -> List[str]:
+    """
+    Extrae un documento por rangos en `procesos` procesos.
+
+    Args:
+        ruta: Ruta del PDF (cada proceso lo abre por su cuenta).
+        motor: 'pymupdf', 'pdfplumber' o 'hibrido' (ver `parser.py`).
+        conteo: Si se pasa, acumula los contadores de `iter_hibrido` de todos los rangos.
+
+    Returns:
+        Texto de cada página, en el orden del documento.
+    """
+    rangos = rangos_de(paginas, tamano_bloque(paginas, procesos))
+    textos = []
+    with ProcessPoolExecutor(max_workers=min(procesos, len(rangos))) as pool:
+        futuros = [pool.submit(_extraer_rango, str(ruta), motor, inicio, fin) for inicio, fin in rangos]
+        for futuro in futuros:  # en orden de rango: el texto sale en el orden del documento
+            parte, conteo_rango = futuro.result()
+            textos.extend(parte)
+            if conteo is not None:
+                for clave, valor in conteo_rango.items():
+                    conteo[clave] = conteo.get(clave, 0) + valor
+    return textos
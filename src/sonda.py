@@ -0,0 +1,253 @@
+"""
+🔎 sonda.py – Sonda rápida de un PDF por muestreo de páginas
+
+Antes de extraer, el pipeline necesita saber si un PDF tiene capa de texto
+(PyMuPDF) o es un escaneo (OCR). Extraer todas las páginas para
+decidirlo cuesta casi lo mismo que la extracción real; esta sonda:
+
+1. Muestrea páginas repartidas por el documento (todas, si son pocas).
+2. Clasifica cada una con PyMuPDF a partir de sus bloques: caracteres y
+   bloques de texto, e imágenes (área que cubren).
+3. Se detiene en cuanto la decisión está clara: al reunir
+   `THRESHOLD_MIN_CARACTERES` caracteres, el PDF ya no es un escaneo.
+
+Clases de página:
+- `texto`:     tiene capa de texto suficiente.
+- `basura`:    tiene capa de texto, pero ilegible: glifos sin mapa Unicode
+               (`(cid:NN)`), caracteres de reemplazo o *mojibake*.
+- `escaneado`: sin texto y con imágenes que cubren buena parte de la página.
+- `vacia`:     ni texto ni imágenes relevantes.
+
+Las páginas `basura` y `escaneado` son las que necesitan OCR (`CLASES_OCR`);
+`parser.iter_hibrido()` usa esta misma clasificación página a página.
+
+Disposición de las páginas de texto, a partir de la geometría de sus bloques:
+- `columnas`: dos columnas, bloques estrechos a ambos lados del centro que se
+              solapan en altura (`geometria_columnas()` da el corte entre ellas).
+- `tabla`:    varias filas con tres o más bloques alineados.
+- `simple`:   el resto.
+
+Cada página lleva además su `extractor`, la decisión de ruta auditable:
+`ocr`, `pdfplumber` (columnas y tablas, donde conserva mejor el orden),
+`pymupdf` (el resto, un orden de magnitud más rápido) o `ninguno` (vacía).
+
+El resultado se guarda en `DocumentoPDF.sonda` para que las etapas
+siguientes (extracción, OCR por página) no vuelvan a mirar las mismas páginas.
+También es la base de `utils.es_pdf_complejo()` (bloques por página) y del
+planificador (fracción de páginas con texto): una sola sonda para todo.
+"""
+
+import re
+import unicodedata
+from typing import Dict, List, Optional
+
+from src.documento import abrir_documento
+from src.metricas import medir
+
+# Caracteres totales a partir de los cuales el PDF tiene capa de texto
+THRESHOLD_MIN_CARACTERES = 100
+
+# Páginas que se muestrean como máximo (repartidas por el documento)
+MAX_MUESTRAS = 8
+
+# Una página con menos caracteres que esto no cuenta como página de texto
+MIN_CARACTERES_PAGINA = 20
+
+# Fracción del área de la página cubierta por imágenes para considerarla escaneada
+# (por debajo, una página sin texto con un logo o un filete cuenta como vacía)
+COBERTURA_ESCANEO = 0.05
+
+# Fracción de caracteres ilegibles a partir de la cual el texto de una página es basura
+MAX_FRACCION_BASURA = 0.3
+
+# Glifos sin mapa Unicode (así los deja la extracción) y UTF-8 leído como Latin-1 ("Ã©", "Â¿")
+PATRON_CID = re.compile(r"\(cid:\d+\)")
+PATRON_MOJIBAKE = re.compile(r"[ÃÂ][\u0080-\u00bf]")
+
+# Clases de página que necesitan OCR
+CLASES_OCR = ("escaneado", "basura")
+
+# Columnas: bloques más estrechos que esta fracción del ancho, al menos N a cada lado del centro
+ANCHO_MAX_COLUMNA = 0.55
+MIN_BLOQUES_COLUMNA = 2
+
+# Tablas: filas (bloques con el mismo borde superior, ± puntos) con varias celdas
+TOLERANCIA_FILA = 3.0
+MIN_CELDAS_FILA = 3
+MIN_FILAS_TABLA = 3
+
+# Disposiciones que se extraen con pdfplumber
+DISPOSICIONES_PDFPLUMBER = ("columnas", "tabla")
+
+
+def es_texto_basura(texto: str) -> bool:
+    """True si buena parte del texto son glifos `(cid:NN)`, caracteres de reemplazo, de control o mojibake."""
+    texto = texto.strip()
+    if not texto:
+        return False
+    ilegibles = sum(len(c) for c in PATRON_CID.findall(texto))
+    ilegibles += 2 * len(PATRON_MOJIBAKE.findall(texto))
+    ilegibles += sum(
+        1 for c in texto
+        if c == "\ufffd" or (unicodedata.category(c) in ("Cc", "Co", "Cs") and c not in "\n\r\t")
+    )
+    return ilegibles / len(texto) > MAX_FRACCION_BASURA
+
+
+def geometria_columnas(cajas: List[tuple], ancho: float) -> Optional[Dict[str, float]]:
+    """
+    Si las cajas (x0, y0, x1, y1) de los bloques de texto forman dos columnas,
+    devuelve {corte, arriba, abajo}: la x entre columnas y la franja vertical que ocupan.
+    """
+    centro, margen = ancho / 2, ancho * 0.05
+    estrechas = [c for c in cajas if c[2] - c[0] < ANCHO_MAX_COLUMNA * ancho]
+    izquierda = [c for c in estrechas if c[2] <= centro + margen]
+    derecha = [c for c in estrechas if c[0] >= centro - margen]
+    if len(izquierda) < MIN_BLOQUES_COLUMNA or len(derecha) < MIN_BLOQUES_COLUMNA:
+        return None
+    # Las dos columnas deben compartir altura (no un encabezado a un lado y un pie al otro)
+    if min(max(c[3] for c in izquierda), max(c[3] for c in derecha)) <= max(
+        min(c[1] for c in izquierda), min(c[1] for c in derecha)
+    ):
+        return None
+    fin_izquierda, inicio_derecha = max(c[2] for c in izquierda), min(c[0] for c in derecha)
+    columnas = izquierda + derecha
+    return {
+        "corte": round((fin_izquierda + inicio_derecha) / 2 if fin_izquierda < inicio_derecha else centro, 1),
+        "arriba": round(min(c[1] for c in columnas), 1),
+        "abajo": round(max(c[3] for c in columnas), 1),
+    }
+
+
+def disposicion(cajas: List[tuple], ancho: float) -> str:
+    """Disposición de una página según las cajas (x0, y0, x1, y1) de sus bloques de texto."""
+    filas = {}
+    for _, y0, _, _ in cajas:
+        fila = round(y0 / TOLERANCIA_FILA)
+        filas[fila] = filas.get(fila, 0) + 1
+    if sum(1 for celdas in filas.values() if celdas >= MIN_CELDAS_FILA) >= MIN_FILAS_TABLA:
+        return "tabla"
+    return "columnas" if geometria_columnas(cajas, ancho) else "simple"
+
+
+def extractor_de(info: Dict[str, object]) -> str:
+    """Extractor para una página clasificada: ocr, pdfplumber, pymupdf o ninguno."""
+    if info["clase"] in CLASES_OCR:
+        return "ocr"
+    if info["clase"] == "vacia":
+        return "ninguno"
+    return "pdfplumber" if info["disposicion"] in DISPOSICIONES_PDFPLUMBER else "pymupdf"
+
+
+def indices_muestra(total: int, muestras: int = MAX_MUESTRAS) -> List[int]:
+    """Índices de página repartidos de forma uniforme, en orden, incluyendo la primera y la última."""
+    if total <= muestras:
+        return list(range(total))
+    if muestras <= 1:
+        return [0]
+    return sorted({round(i * (total - 1) / (muestras - 1)) for i in range(muestras)})
+
+
+def clasificar_pagina(pagina, con_texto: bool = False) -> Dict[str, object]:
+    """
+    Clasifica una página de PyMuPDF con una sola pasada por sus bloques.
+
+    Returns:
+        dict con clase, caracteres, bloques (de texto), cobertura_imagen (0–1),
+        disposicion, extractor y, a dos columnas, columnas (`geometria_columnas()`);
+        con `con_texto=True`, también el texto de la página (equivale a `get_text("text")`).
+    """
+    import fitz  # PyMuPDF (ya cargado por `doc.fitz()`)
+
+    area = abs(pagina.rect) or 1.0
+    caracteres = bloques = 0
+    area_imagen = 0.0
+    textos = []
+    cajas = []
+    # Con TEXT_PRESERVE_IMAGES, las imágenes aparecen como bloques de tipo 1
+    for x0, y0, x1, y1, texto, _, tipo in pagina.get_text("blocks", flags=fitz.TEXT_PRESERVE_IMAGES):
+        if tipo == 0:
+            caracteres += len(texto.strip())
+            bloques += 1
+            textos.append(texto)
+            cajas.append((x0, y0, x1, y1))
+        else:
+            area_imagen += max(0.0, x1 - x0) * max(0.0, y1 - y0)
+    cobertura = min(1.0, area_imagen / area)
+
+    texto = "".join(textos)
+    if caracteres >= MIN_CARACTERES_PAGINA:
+        clase = "basura" if es_texto_basura(texto) else "texto"
+    elif cobertura >= COBERTURA_ESCANEO:
+        clase = "escaneado"
+    else:
+        clase = "vacia"
+    info = {
+        "clase": clase,
+        "caracteres": caracteres,
+        "bloques": bloques,
+        "cobertura_imagen": round(cobertura, 3),
+        "disposicion": disposicion(cajas, pagina.rect.width) if clase == "texto" else None,
+    }
+    info["extractor"] = extractor_de(info)
+    if info["disposicion"] == "columnas":
+        info["columnas"] = geometria_columnas(cajas, pagina.rect.width)
+    if con_texto:
+        info["texto"] = texto
+    return info
+
+
+def sondear_pdf(
+    ruta_pdf,
+    muestras: int = MAX_MUESTRAS,
+    parar_al_decidir: bool = True,
+    indices: Optional[List[int]] = None
+) -> Dict[str, object]:
+    """
+    Sonda un PDF (ruta o `DocumentoPDF`) muestreando páginas con PyMuPDF.
+
+    Args:
+        muestras: Máximo de páginas a mirar (repartidas por el documento).
+        parar_al_decidir: Si True, deja de muestrear al reunir `THRESHOLD_MIN_CARACTERES`.
+        indices: Páginas concretas a mirar (en lugar del muestreo repartido).
+
+    Returns:
+        dict con:
+        - paginas: total de páginas del documento
+        - clases: {índice: clase} de las páginas miradas
+        - extractores: {índice: extractor} de las páginas miradas (ver `extractor_de`)
+        - detalle: {índice: clasificar_pagina()} de las páginas miradas
+        - caracteres / bloques: totales de las páginas miradas
+        - escaneado: True si no se reunió texto suficiente (hace falta pdfplumber/OCR)
+    """
+    with medir("sonda") as m, abrir_documento(ruta_pdf) as doc:
+        pdf = doc.fitz()
+        total = len(pdf)
+        detalle = {}
+        caracteres = bloques = 0
+        elegidos = [i for i in indices if 0 <= i < total] if indices is not None else indices_muestra(total, muestras)
+        for i in elegidos:
+            detalle[i] = clasificar_pagina(pdf[i])
+            caracteres += detalle[i]["caracteres"]
+            bloques += detalle[i]["bloques"]
+            if parar_al_decidir and caracteres >= THRESHOLD_MIN_CARACTERES:
+                break
+        sonda = {
+            "paginas": total,
+            "clases": {i: d["clase"] for i, d in detalle.items()},
+            "extractores": {i: d["extractor"] for i, d in detalle.items()},
+            "detalle": detalle,
+            "caracteres": caracteres,
+            "bloques": bloques,
+            "escaneado": caracteres < THRESHOLD_MIN_CARACTERES,
+        }
+        m.anotar(paginas=len(detalle), caracteres=caracteres)
+        if indices is None and muestras == MAX_MUESTRAS and parar_al_decidir:
+            doc.sonda = sonda  # la sonda estándar se reutiliza en las etapas siguientes
+        return sonda
+
+
+def sonda_de(ruta_pdf) -> Dict[str, object]:
+    """Sonda estándar de un documento, reutilizando la ya hecha si el `DocumentoPDF` la tiene."""
+    sonda = getattr(ruta_pdf, "sonda", None)
+    return sonda if sonda is not None else sondear_pdf(ruta_pdf)
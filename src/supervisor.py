@@ -0,0 +1,158 @@
+"""
+⏱️ supervisor.py – Presupuesto de tiempo y memoria por documento
+
+Un PDF patológico (un escaneo de 300 MB, un archivo malformado que deja a
+pdfplumber dando vueltas) no debe detener un lote nocturno. Con límites
+activos, cada documento se procesa en un proceso hijo vigilado:
+
+- si supera `limite_s` segundos de tiempo real, o
+- si su memoria residente (RSS) supera `limite_mb`,
+
+el hijo se mata, el documento queda como `error_parse` con la `razon`
+(`tiempo_excedido`, `memoria_excedida`, `proceso_caido`) y, si se pidió,
+se reintenta una vez en modo degradado (solo PyMuPDF, OCR a menor resolución;
+ver `parser.extract_text()`), con los mismos límites.
+
+    python main.py --timeout 300 --max-rss 2048 --degradar
+
+🧠 Decisiones de diseño:
+- El hijo se vigila desde fuera: un extractor atascado en código C no puede
+  ejecutar un temporizador propio, pero sí puede ser matado.
+- La RSS se lee de `/proc/<pid>/statm` (Linux). En otros sistemas solo se
+  aplica el límite de tiempo.
+- El proceso hijo ejecuta el mismo `procesar_con_registro()`: resultados,
+  métricas y logs son idénticos a los de una ejecución sin límites.
+"""
+
+import multiprocessing
+import os
+import time
+from typing import Dict, Optional
+
+# Cada cuánto se revisa el hijo
+INTERVALO_VIGILANCIA = 0.2
+
+# Claves de `opciones` que solo interesan al supervisor
+_CLAVES_SUPERVISOR = ("limite_s", "limite_mb", "degradar")
+
+
+def rss_mb(pid: int) -> Optional[float]:
+    """Memoria residente de un proceso en MB, o None si no se puede leer."""
+    try:
+        with open(f"/proc/{pid}/statm", encoding="ascii") as f:
+            paginas = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return paginas * os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+
+
+def _hijo(conexion, ruta: str, debug: bool, hash_doc: str, opciones: Dict[str, object]):
+    from src import rangos
+    from src.pipeline import procesar_con_registro
+
+    rangos.activar(1)  # extracción secuencial: la RSS vigilada es solo la de este proceso
+
+    conexion.send(procesar_con_registro(ruta, debug, hash_doc, opciones))
+    conexion.close()
+
+
+def ejecutar_con_limites(
+    ruta: str,
+    debug: bool = False,
+    hash_doc: str = None,
+    opciones: Dict[str, object] = None,
+    limite_s: float = None,
+    limite_mb: float = None
+) -> Dict[str, object]:
+    """
+    Procesa un documento en un proceso hijo y lo mata si excede los límites.
+
+    Returns:
+        El resultado del hijo o, si se le mató o murió, `{"archivo", "ok": False,
+        "error", "razon", "duracion_s"}`. No registra eventos.
+    """
+    from src.pipeline import _compartir_contexto_logs
+
+    _compartir_contexto_logs()  # el hijo escribe en los mismos archivos run_*
+    contexto = multiprocessing.get_context()
+    recibir, enviar = contexto.Pipe(duplex=False)
+    proceso = contexto.Process(target=_hijo, args=(enviar, ruta, debug, hash_doc, opciones or {}),
+                               name=f"documento:{os.path.basename(ruta)}")
+    inicio = time.perf_counter()
+    proceso.start()
+    enviar.close()
+
+    razon = error = None
+    try:
+        while True:
+            if recibir.poll(INTERVALO_VIGILANCIA):
+                try:
+                    resultado = recibir.recv()
+                    # Con el resultado en mano no se espera sin límite a que el hijo salga
+                    # (atexit, hilos no daemon...): si sigue vivo, `finally` lo mata
+                    proceso.join(INTERVALO_VIGILANCIA)
+                    return resultado
+                except EOFError:
+                    pass  # el hijo cerró la tubería sin enviar nada: murió
+            transcurrido = time.perf_counter() - inicio
+            if not proceso.is_alive():
+                proceso.join()
+                razon, error = "proceso_caido", f"El proceso del documento terminó con código {proceso.exitcode}"
+                break
+            if limite_s and transcurrido > limite_s:
+                razon, error = "tiempo_excedido", f"Excedió el límite de {limite_s:g} s"
+                break
+            memoria = rss_mb(proceso.pid) if limite_mb else None
+            if memoria is not None and memoria > limite_mb:
+                razon, error = "memoria_excedida", f"Excedió el límite de {limite_mb:g} MB (RSS {memoria:.0f} MB)"
+                break
+    finally:
+        if proceso.is_alive():
+            proceso.kill()
+            proceso.join()
+        recibir.close()
+
+    return {
+        "archivo": ruta,
+        "ok": False,
+        "error": error,
+        "razon": razon,
+        "duracion_s": round(time.perf_counter() - inicio, 3),
+    }
+
+
+def procesar_supervisado(
+    ruta: str,
+    debug: bool = False,
+    hash_doc: str = None,
+    opciones: Dict[str, object] = None
+) -> Dict[str, object]:
+    """
+    Variante de `procesar_con_registro()` con presupuesto: lee `limite_s`, `limite_mb`
+    y `degradar` de `opciones`. Nunca lanza excepciones.
+    """
+    from src.logger import log_evento
+
+    opciones = dict(opciones or {})
+    limite_s = opciones.get("limite_s")
+    limite_mb = opciones.get("limite_mb")
+    degradar = opciones.get("degradar")
+    opciones_hijo = {k: v for k, v in opciones.items() if k not in _CLAVES_SUPERVISOR}
+
+    resultado = ejecutar_con_limites(ruta, debug, hash_doc, opciones_hijo, limite_s, limite_mb)
+    if resultado.get("ok") or "razon" not in resultado:
+        return resultado  # terminó dentro del presupuesto (bien, o con su propio error ya registrado)
+
+    log_evento("error_parse", archivo=ruta, nivel="ERROR", mensaje=resultado["error"], razon=resultado["razon"])
+    if debug:
+        print(f"⏱️ {ruta}: {resultado['error']}")
+    if not degradar or opciones_hijo.get("degradado"):
+        return resultado
+
+    log_evento("reintento_degradado", archivo=ruta, razon=resultado["razon"])
+    reintento = ejecutar_con_limites(ruta, debug, hash_doc, dict(opciones_hijo, degradado=True), limite_s, limite_mb)
+    if not reintento.get("ok") and "razon" in reintento:
+        log_evento("error_parse", archivo=ruta, nivel="ERROR", mensaje=reintento["error"],
+                   razon=reintento["razon"], degradado=True)
+    reintento["duracion_s"] = round(resultado["duracion_s"] + reintento.get("duracion_s", 0), 3)
+    return reintento
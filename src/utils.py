@@ -6,7 +6,8 @@ Proporciona funciones reutilizables que permiten:
 - Evaluar la complejidad visual de un PDF (bloques o escaneado)
 - Detectar posibles fórmulas u objetos no textuales
 - Normalizar texto para matching semántico
-- Calcular un hash único (MD5) que actúa como identificador genético del documento
+- Calcular un hash único (MD5) que actúa como identificador genético del documento,
+  por bloques (memoria constante) y con caché persistente por archivo
 
 Todas las funciones están diseñadas para ser:
 ✔️ Independientes
@@ -16,9 +17,26 @@ Todas las funciones están diseñadas para ser:
 """
 
 from unidecode import unidecode
-import fitz  # PyMuPDF
 import re
+import os
+import json
+import time
 import hashlib
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Optional, TextIO
+
+# Caché persistente de hashes: (dispositivo, inodo, tamaño, mtime) → hash
+HASH_CACHE_PATH = Path("output") / "hash_cache.jsonl"
+HASH_CACHE_ACTIVA = os.getenv("HASH_CACHE", "1") != "0"
+
+# Bytes leídos por bloque al calcular un hash
+TAMANO_BLOQUE = 1024 * 1024
+
+# Un archivo modificado hace menos de esto puede seguir escribiéndose, o tener
+# otro cambio con el mismo mtime en sistemas de archivos de poca resolución: no se cachea.
+MARGEN_MTIME_NS = 2_000_000_000
 
 
 def es_pdf_complejo(ruta_pdf: str, max_paginas: int = 3, umbral: int = 8) -> bool:
@@ -37,20 +55,17 @@ def es_pdf_complejo(ruta_pdf: str, max_paginas: int = 3, umbral: int = 8) -> boo
     Returns:
         True si el PDF es complejo, False si es "simple".
     """
+    from src.sonda import sondear_pdf  # importarlo aquí mantiene `utils` ligero para el manifest y la CLI
+
+    # Misma sonda que usa el parser, sobre las primeras páginas y sin parada temprana
     try:
-        doc = fitz.open(ruta_pdf)
+        sonda = sondear_pdf(ruta_pdf, parar_al_decidir=False, indices=list(range(max_paginas)))
     except Exception as e:
         print(f"❌ Error abriendo PDF: {e}")
         return True  # Por defecto, tratamos como complejo si no se puede abrir
 
-    paginas = min(len(doc), max_paginas)
-    total_bloques = 0
-
-    for i in range(paginas):
-        bloques = doc[i].get_text("blocks")
-        total_bloques += len(bloques)
-
-    doc.close()
+    paginas = len(sonda["clases"])
+    total_bloques = sonda["bloques"]
 
     if total_bloques == 0:
         return True  # Escaneado o sin texto detectable
@@ -113,9 +128,129 @@ def calcular_hash_md5(path_pdf: str) -> str:
     Returns:
         Cadena hexadecimal (32 caracteres)
     """
+    return calcular_hash(path_pdf, "md5")
+
+
+# ─────────────────────────────────────────────────────────────
+# 🧮 Hash por bloques con caché persistente
+# ─────────────────────────────────────────────────────────────
+def nuevo_hasher(algoritmo: str):
+    """Crea el objeto de hash de hashlib para `algoritmo`."""
+    return hashlib.new(algoritmo)
+
+
+def hash_de_flujo(f, algoritmo: str = "md5") -> str:
+    """Hash de un archivo binario abierto, leído por bloques en un único buffer reutilizado."""
+    hasher = nuevo_hasher(algoritmo)
+    buffer = bytearray(TAMANO_BLOQUE)
+    vista = memoryview(buffer)
+    while True:
+        leidos = f.readinto(buffer)
+        if not leidos:
+            break
+        hasher.update(vista[:leidos])
+    return hasher.hexdigest()
+
+
+_caches_hashes: Dict[str, Dict[str, str]] = {}
+
+
+def _clave_cache(st: os.stat_result, algoritmo: str) -> str:
+    return f"{st.st_dev}:{st.st_ino}:{st.st_size}:{st.st_mtime_ns}:{algoritmo}"
+
+
+def _cargar_cache_hashes(ruta: Path) -> Dict[str, str]:
+    clave = str(ruta)
+    if clave not in _caches_hashes:
+        cache = {}
+        if ruta.exists():
+            with open(ruta, encoding="utf-8") as f:
+                for linea in f:
+                    try:
+                        entrada = json.loads(linea)
+                        cache[entrada["clave"]] = entrada["hash"]
+                    except (json.JSONDecodeError, KeyError, TypeError):
+                        continue  # línea incompleta (p. ej. ejecución interrumpida)
+        _caches_hashes[clave] = cache
+    return _caches_hashes[clave]
+
+
+def buscar_hash_en_cache(st: os.stat_result, algoritmo: str, ruta_cache: Path = None) -> Optional[str]:
+    """Hash ya calculado para este archivo exacto (mismo dispositivo, inodo, tamaño y mtime), o None."""
+    if not HASH_CACHE_ACTIVA:
+        return None
+    return _cargar_cache_hashes(Path(ruta_cache or HASH_CACHE_PATH)).get(_clave_cache(st, algoritmo))
+
+
+def guardar_hash_en_cache(st: os.stat_result, algoritmo: str, valor: str, ruta_cache: Path = None) -> None:
+    """Anota un hash en la caché persistente (salvo archivos modificados hace muy poco)."""
+    if not HASH_CACHE_ACTIVA or time.time_ns() - st.st_mtime_ns < MARGEN_MTIME_NS:
+        return
+    ruta_cache = Path(ruta_cache or HASH_CACHE_PATH)
+    cache = _cargar_cache_hashes(ruta_cache)
+    clave = _clave_cache(st, algoritmo)
+    if cache.get(clave) == valor:
+        return
+    cache[clave] = valor
+    try:
+        ruta_cache.parent.mkdir(parents=True, exist_ok=True)
+        # Una línea por escritura en modo append: segura con varios procesos a la vez
+        with open(ruta_cache, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"clave": clave, "hash": valor}) + "\n")
+    except OSError:
+        pass  # la caché es una optimización: nunca interrumpe el pipeline
+
+
+def calcular_hash(path_pdf: str, algoritmo: str = "md5", usar_cache: bool = True, ruta_cache: Path = None) -> str:
+    """
+    Calcula el hash de un archivo con memoria constante y caché persistente.
+
+    Un archivo sin cambios (mismo dispositivo, inodo, tamaño y mtime) no se
+    vuelve a leer entre ejecuciones: su hash sale de `HASH_CACHE_PATH`. El pipeline
+    usa siempre MD5 (`calcular_hash_md5()`): el manifest, la cola y las carpetas de
+    salida se identifican por él.
+
+    Args:
+        path_pdf: Ruta al archivo.
+        algoritmo: Algoritmo de hashlib (por defecto MD5).
+        usar_cache: Si False, siempre lee el archivo.
+        ruta_cache: Archivo de caché (por defecto `HASH_CACHE_PATH`).
+
+    Returns:
+        Cadena hexadecimal del hash.
+    """
     try:
         with open(path_pdf, 'rb') as f:
-            contenido = f.read()
-            return hashlib.md5(contenido).hexdigest()
+            st = os.fstat(f.fileno())
+            if usar_cache:
+                cacheado = buscar_hash_en_cache(st, algoritmo, ruta_cache)
+                if cacheado:
+                    return cacheado
+            valor = hash_de_flujo(f, algoritmo)
     except FileNotFoundError:
         raise FileNotFoundError(f"⚠️ Archivo no encontrado para hashing: {path_pdf}")
+    if usar_cache:
+        guardar_hash_en_cache(st, algoritmo, valor, ruta_cache)
+    return valor
+
+
+# ─────────────────────────────────────────────────────────────
+# 💾 Escritura atómica
+# ─────────────────────────────────────────────────────────────
+@contextmanager
+def archivo_atomico(ruta: Path, binario: bool = False) -> Iterator[TextIO]:
+    """
+    Abre `ruta` para escribir texto de modo que aparezca completo o no aparezca:
+    se escribe en un temporal de la misma carpeta y se renombra al cerrar sin errores.
+    Una ejecución interrumpida nunca deja un archivo a medias con el nombre final.
+    Con `binario=True` el archivo se abre en modo bytes.
+    """
+    ruta = Path(ruta)
+    temporal = ruta.with_name(f".{ruta.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with (open(temporal, "wb") if binario else open(temporal, "w", encoding="utf-8")) as f:
+            yield f
+        os.replace(temporal, ruta)
+    finally:
+        if temporal.exists():
+            temporal.unlink()
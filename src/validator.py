@@ -3,6 +3,11 @@ from datetime import datetime
 from src.logger import log_validacion
 from src.utils import calcular_hash_md5
 
+SECCIONES_ESPERADAS = ['Introducción', 'Método', 'Resultados', 'Discusión', 'Referencias']
+
+# En modo streaming, el resumen se busca solo al inicio del documento
+MAX_CARACTERES_CABECERA = 20000
+
 def validar_documento(
     texto: str,
     ruta_pdf: str,
@@ -31,11 +36,18 @@ def validar_documento(
     errores += validar_secciones(texto)
     errores += validar_citas_referencias(texto)
 
+    _registrar_errores(errores, ruta_pdf, hash_doc)
+
+    # Nunca bloqueamos la exportación
+    return True, {"razones": errores}
+
+
+def _registrar_errores(errores: list[str], ruta_pdf: str, hash_doc: str = None) -> None:
+    """Registra cada error como evento de validación, calculando el hash si falta."""
     # Determinar identificador de documento para logging
     if not hash_doc:
         hash_doc = calcular_hash_md5(ruta_pdf)
 
-    # Registrar cada error como evento de validación
     for error in errores:
         log_validacion(
             evento="validation_error",
@@ -47,9 +59,6 @@ def validar_documento(
             hash=hash_doc
         )
 
-    # Nunca bloqueamos la exportación
-    return True, {"razones": errores}
-
 
 def validar_resumen(texto: str) -> list[str]:
     errores = []
@@ -65,7 +74,7 @@ def validar_resumen(texto: str) -> list[str]:
 
 
 def validar_secciones(texto: str) -> list[str]:
-    esperadas = ['Introducción', 'Método', 'Resultados', 'Discusión', 'Referencias']
+    esperadas = SECCIONES_ESPERADAS
     encontradas = re.findall(r'^\s*(%s)' % '|'.join(esperadas), texto, re.MULTILINE | re.IGNORECASE)
     encontradas_cap = set(map(str.capitalize, encontradas))
     faltantes = [sec for sec in esperadas if sec not in encontradas_cap]
@@ -112,3 +121,49 @@ def detectar_zona(error_msg: str) -> str:
     if "citas" in error_msg.lower():
         return "references"
     return "global"
+
+
+# ─────────────────────────────────────────────────────────────
+# 🌊 Validación incremental (streaming)
+# ─────────────────────────────────────────────────────────────
+
+def iniciar_validacion() -> dict:
+    """Crea el estado para validar un documento fragmento a fragmento."""
+    return {"caracteres": 0, "palabras": 0, "cabecera": "", "secciones": set(), "citas": False}
+
+
+def observar_validacion(estado: dict, fragmento: str) -> None:
+    """
+    Acumula contadores y hallazgos de un fragmento; memoria constante salvo
+    la cabecera (hasta `MAX_CARACTERES_CABECERA`) usada para el resumen.
+    """
+    estado["caracteres"] += len(fragmento.strip())
+    estado["palabras"] += len(fragmento.split())
+    faltan = MAX_CARACTERES_CABECERA - len(estado["cabecera"])
+    if faltan > 0:
+        estado["cabecera"] += fragmento[:faltan]
+    encontradas = re.findall(r'^\s*(%s)' % '|'.join(SECCIONES_ESPERADAS), fragmento, re.MULTILINE | re.IGNORECASE)
+    estado["secciones"].update(map(str.capitalize, encontradas))
+    if not estado["citas"] and not validar_citas_referencias(fragmento):
+        estado["citas"] = True
+
+
+def cerrar_validacion(estado: dict, ruta_pdf: str, hash_doc: str = None) -> tuple[bool, dict]:
+    """
+    Equivalente a `validar_documento` sobre el estado acumulado: registra los
+    errores y nunca bloquea la exportación.
+    """
+    errores = []
+    if estado["caracteres"] < 10:
+        errores.append("Texto vacío o ilegible.")
+    if estado["palabras"] < 150:
+        errores.append("Texto demasiado corto (menos de 150 palabras).")
+    errores += validar_resumen(estado["cabecera"])
+    faltantes = [sec for sec in SECCIONES_ESPERADAS if sec not in estado["secciones"]]
+    if faltantes:
+        errores.append(f"Secciones faltantes: {', '.join(faltantes)}")
+    if not estado["citas"]:
+        errores.append("No se detectaron citas ni referencias.")
+
+    _registrar_errores(errores, ruta_pdf, hash_doc)
+    return True, {"razones": errores}
@@ -0,0 +1,37 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# 🔧 Asegura visibilidad del módulo src/
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+# ─────────────────────────────────────────────────────────────
+# Fixtures compartidas
+# ─────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def salida_temporal(tmp_path, monkeypatch):
+    """
+    Redirige a una carpeta temporal lo que el pipeline escribe en `output/`:
+    exportaciones, logs, manifest, diario de checkpoints, cola de trabajos,
+    caché de hashes y caché de extracción. Los procesos hijos (fork) heredan
+    la redirección.
+    """
+    from src import cache_extraccion, checkpoint, cola, exporter, logger, manifest, utils
+
+    salida = tmp_path / "output"
+    logs = salida / "logs"
+    monkeypatch.setattr(exporter, "OUTPUT_DIR", salida)
+    monkeypatch.setattr(manifest, "MANIFEST_PATH", salida / "manifest.jsonl")
+    monkeypatch.setattr(checkpoint, "CHECKPOINT_DIR", salida / "checkpoint")
+    monkeypatch.setattr(cola, "COLA_DIR", salida / "cola")
+    monkeypatch.setattr(utils, "HASH_CACHE_PATH", salida / "hash_cache.jsonl")
+    monkeypatch.setattr(cache_extraccion, "CACHE_DIR", salida / "cache")
+    monkeypatch.setattr(logger, "LOGS_DIR", logs)
+    monkeypatch.setattr(logger, "global_log_txt", logs / logger.global_log_txt.name)
+    monkeypatch.setattr(logger, "global_log_jsonl", logs / logger.global_log_jsonl.name)
+    monkeypatch.setattr(logger, "logger", None)  # loguru se prepara de nuevo, hacia `logs`
+    checkpoint.diario_del_proceso.cache_clear()  # el diario del proceso se crea de nuevo, hacia `salida`
+    yield salida
+    checkpoint.diario_del_proceso.cache_clear()
@@ -0,0 +1,55 @@
+import sys
+from pathlib import Path
+
+# 🔧 Asegura visibilidad de benchmarks/ y src/
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from benchmarks.corpus import generar_texto, describir, parsear_tamano
+from benchmarks.bench_etapas import comparar, medir_etapa
+
+# ─────────────────────────────────────────────────────────────
+# Tests del corpus sintético
+# ─────────────────────────────────────────────────────────────
+
+def test_corpus_determinista_y_del_tamano_pedido():
+    texto = generar_texto(parsear_tamano("64KB"), idioma="en", perfil="limpio", semilla=3)
+    assert texto == generar_texto(65536, idioma="en", perfil="limpio", semilla=3)
+    assert len(texto.encode("utf-8")) <= 65536
+    assert texto != generar_texto(65536, idioma="en", perfil="limpio", semilla=4)
+
+def test_perfiles_introducen_sus_defectos():
+    assert describir(generar_texto(20000, perfil="cid"))["cid"] > 0
+    assert describir(generar_texto(20000, perfil="mojibake"))["mojibake"] > 0
+    assert describir(generar_texto(20000, perfil="guiones"))["guiones"] > 0
+    assert describir(generar_texto(20000, perfil="limpio"))["cid"] == 0
+
+# ─────────────────────────────────────────────────────────────
+# Tests del medidor y la comparación
+# ─────────────────────────────────────────────────────────────
+
+def test_medir_etapa_y_comparar():
+    medida = medir_etapa(str.upper, "abc" * 1000, tiempo_minimo=0.01)
+    assert medida["repeticiones"] >= 1 and medida["ops_s"] > 0
+
+    fila = {"etapa": "limpieza", "tamano": "1KB", "idioma": "es", "perfil": "limpio"}
+    diferencias = comparar([dict(fila, ops_s=50.0)], [dict(fila, ops_s=100.0)])
+    assert diferencias[0]["variacion_pct"] == -50.0
+    assert diferencias[0]["regresion"] is True
+
+# ─────────────────────────────────────────────────────────────
+# Tests del corpus de PDFs
+# ─────────────────────────────────────────────────────────────
+
+def test_corpus_pdf_tipos_y_reutilizacion(tmp_path):
+    import fitz
+    from benchmarks.corpus_pdf import generar_corpus
+
+    corpus = generar_corpus(tmp_path, documentos=1, paginas=2)
+    por_tipo = {d["tipo"]: d for d in corpus["pdfs"]}
+    with fitz.open(por_tipo["textual"]["archivo"]) as doc:
+        assert all(pagina.get_text().strip() for pagina in doc)
+    with fitz.open(por_tipo["escaneado"]["archivo"]) as doc:
+        assert not any(pagina.get_text().strip() for pagina in doc)
+    assert por_tipo["mixto"]["paginas_raster"] == 1
+
+    assert generar_corpus(tmp_path, documentos=1, paginas=2) == corpus
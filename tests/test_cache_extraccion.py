@@ -0,0 +1,91 @@
+import os
+import sys
+from pathlib import Path
+
+# 🔧 Asegura visibilidad del módulo src/
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from src import cache_extraccion, filtro_paginas, motores_ocr
+from src.cache_extraccion import guardar, leer, podar
+from src.parser import _ajustes_cache, extract_text
+from src.utils import calcular_hash_md5
+
+pytestmark = pytest.mark.usefixtures("salida_temporal")
+
+TEXTUAL = "tests/fixtures/pdf_textual.pdf"
+
+
+@pytest.fixture
+def cache_temporal(tmp_path, monkeypatch):
+    """Caché activa en una carpeta temporal."""
+    monkeypatch.setattr(cache_extraccion, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(cache_extraccion, "LIMITE_MB", 10)
+    return tmp_path
+
+# ─────────────────────────────────────────────────────────────
+# Tests de la caché
+# ─────────────────────────────────────────────────────────────
+
+def test_guarda_comprimido_y_recupera_con_los_mismos_ajustes(cache_temporal):
+    texto = "Texto extraído de prueba. " * 200
+    guardar("h1", "ocr", texto, lang="spa", dpi=300)
+
+    assert leer("h1", "ocr", lang="spa", dpi=300) == texto
+    assert leer("h1", "ocr", lang="eng", dpi=300) is None  # otros ajustes, otra clave
+    assert leer("h1", "extraccion") is None
+    (entrada,) = cache_temporal.glob("h1.ocr.*.txt.gz")
+    assert entrada.stat().st_size < len(texto) / 4
+
+def test_entrada_ilegible_se_descarta(cache_temporal):
+    guardar("h1", "extraccion", "texto")
+    (entrada,) = cache_temporal.glob("*.txt.gz")
+    entrada.write_bytes(b"no es gzip")
+    assert leer("h1", "extraccion") is None
+    assert not entrada.exists()
+
+def test_podar_expulsa_lo_usado_hace_mas_tiempo(cache_temporal):
+    for i, hash_doc in enumerate(["viejo", "usado", "nuevo"]):
+        guardar(hash_doc, "extraccion", os.urandom(4000).hex())  # ~8 KB poco comprimible
+        (entrada,) = cache_temporal.glob(f"{hash_doc}.*")
+        os.utime(entrada, (1000 + i, 1000 + i))
+    assert leer("usado", "extraccion") is not None  # un acierto lo vuelve reciente
+
+    tamano = sum(p.stat().st_size for p in cache_temporal.glob("*.txt.gz"))
+    assert podar(limite_mb=tamano * 0.7 / 1024 ** 2) == 1
+    assert sorted(p.name.split(".")[0] for p in cache_temporal.glob("*.txt.gz")) == ["nuevo", "usado"]
+
+def test_inactiva_no_escribe_nada(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache_extraccion, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(cache_extraccion, "LIMITE_MB", 0)
+    guardar("h1", "extraccion", "texto")
+    assert leer("h1", "extraccion") is None
+    assert list(tmp_path.iterdir()) == []
+
+# ─────────────────────────────────────────────────────────────
+# Tests de la extracción con caché
+# ─────────────────────────────────────────────────────────────
+
+def test_extract_text_reutiliza_la_extraccion_guardada(cache_temporal):
+    texto = extract_text(TEXTUAL)
+    hash_doc = calcular_hash_md5(TEXTUAL)
+    assert leer(hash_doc, "extraccion", **_ajustes_cache(False)) == texto
+
+    guardar(hash_doc, "extraccion", "Marcador de la caché", **_ajustes_cache(False))
+    assert extract_text(TEXTUAL) == "Marcador de la caché"
+    assert extract_text(TEXTUAL, degradado=True) != "Marcador de la caché"
+
+def test_extract_text_no_reutiliza_con_otros_ajustes_de_ocr(cache_temporal, monkeypatch):
+    hash_doc = calcular_hash_md5(TEXTUAL)
+    guardar(hash_doc, "extraccion", "Marcador de la caché", **_ajustes_cache(False))
+
+    monkeypatch.setattr(filtro_paginas, "ACTIVO", not filtro_paginas.ACTIVO)
+    assert extract_text(TEXTUAL) != "Marcador de la caché"
+
+def test_extract_text_no_reutiliza_con_otro_motor_de_ocr(cache_temporal, monkeypatch):
+    hash_doc = calcular_hash_md5(TEXTUAL)
+    guardar(hash_doc, "extraccion", "Marcador de la caché", **_ajustes_cache(False))
+
+    monkeypatch.setattr(motores_ocr, "MOTOR", "pytesseract" if motores_ocr.MOTOR != "pytesseract" else "auto")
+    assert extract_text(TEXTUAL) != "Marcador de la caché"
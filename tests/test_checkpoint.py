@@ -0,0 +1,95 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# 🔧 Asegura visibilidad del módulo src/
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.checkpoint import Diario
+from src.pipeline import procesar_documento
+from src.utils import archivo_atomico, calcular_hash_md5
+
+pytestmark = pytest.mark.usefixtures("salida_temporal")
+
+TEXTUAL = "tests/fixtures/pdf_textual.pdf"
+
+# ─────────────────────────────────────────────────────────────
+# Tests del diario de etapas
+# ─────────────────────────────────────────────────────────────
+
+def test_diario_recupera_la_ultima_etapa_con_su_texto(tmp_path):
+    diario = Diario(tmp_path, huella="v1")
+    diario.registrar("h1", "extraido", "texto crudo")
+    diario.registrar("h1", "enriquecido", "texto enriquecido")
+
+    assert Diario(tmp_path, huella="v1").recuperar("h1") == ("enriquecido", "texto enriquecido")
+    assert Diario(tmp_path, huella="v2").recuperar("h1") == (None, None)  # otra versión del pipeline
+    assert Diario(tmp_path, huella="v1").recuperar("otro") == (None, None)
+
+def test_exportado_borra_textos_y_requiere_la_carpeta(tmp_path):
+    diario = Diario(tmp_path, huella="v1")
+    diario.registrar("h1", "extraido", "texto")
+    diario.registrar("h1", "exportado", carpeta=str(tmp_path / "no_existe"))
+    assert not list(tmp_path.glob("h1.*.txt"))
+    assert Diario(tmp_path, huella="v1").recuperar("h1") == (None, None)
+
+def test_compactar_conserva_solo_pendientes(tmp_path):
+    diario = Diario(tmp_path, huella="v1")
+    diario.registrar("h1", "extraido", "uno")
+    diario.registrar("h2", "extraido", "dos")
+    diario.compactar(["h2"])
+    assert set(diario.cargar()) == {"h2"}
+    assert [p.name for p in tmp_path.glob("*.txt")] == ["h2.extraido.txt"]
+
+def test_diario_ignora_lineas_cortadas(tmp_path):
+    diario = Diario(tmp_path, huella="v1")
+    diario.registrar("h1", "extraido", "texto")
+    with open(diario.ruta, "a", encoding="utf-8") as f:
+        f.write('{"hash": "h2", "eta')  # el proceso murió a mitad de la línea
+    assert set(Diario(tmp_path, huella="v1").cargar()) == {"h1"}
+
+def test_archivo_atomico_no_deja_archivos_a_medias(tmp_path):
+    destino = tmp_path / "salida.txt"
+    with pytest.raises(RuntimeError):
+        with archivo_atomico(destino) as f:
+            f.write("mitad")
+            raise RuntimeError("interrupción")
+    assert list(tmp_path.iterdir()) == []
+
+# ─────────────────────────────────────────────────────────────
+# Tests de reanudación en el pipeline
+# ─────────────────────────────────────────────────────────────
+
+def test_documento_reanuda_desde_el_texto_extraido(tmp_path):
+    hash_doc = calcular_hash_md5(TEXTUAL)
+    diario = Diario(tmp_path)
+    diario.registrar(hash_doc, "extraido", "Marcador de reanudación.\n\n" + "Texto ya extraído antes. " * 20)
+
+    resultado = procesar_documento(TEXTUAL, hash_doc=hash_doc, diario=Diario(tmp_path))
+    assert resultado["reanudado"] == "extraido"
+    exportado = Path(resultado["carpeta"], f"{hash_doc}.txt").read_text(encoding="utf-8")
+    assert "Marcador de reanudación" in exportado
+    assert Diario(tmp_path).cargar()[hash_doc]["etapa"] == "exportado"
+
+def test_documento_degradado_no_cuenta_como_exportado(tmp_path):
+    hash_doc = calcular_hash_md5(TEXTUAL)
+    degradado = procesar_documento(TEXTUAL, hash_doc=hash_doc, degradado=True, diario=Diario(tmp_path))
+    assert Diario(tmp_path).cargar()[hash_doc]["degradado"] is True
+
+    # Otro reintento degradado lo reutiliza; una ejecución normal rehace la extracción completa
+    assert Diario(tmp_path).recuperar(hash_doc, degradado=True)[0] == "exportado"
+    completo = procesar_documento(TEXTUAL, hash_doc=hash_doc, diario=Diario(tmp_path))
+    assert "reanudado" not in completo
+    assert "degradado" not in Diario(tmp_path).cargar()[hash_doc]
+    assert completo["carpeta"] == degradado["carpeta"]
+
+def test_documento_exportado_no_se_rehace(tmp_path):
+    hash_doc = calcular_hash_md5(TEXTUAL)
+    primero = procesar_documento(TEXTUAL, hash_doc=hash_doc, diario=Diario(tmp_path))
+    assert "reanudado" not in primero
+
+    segundo = procesar_documento(TEXTUAL, hash_doc=hash_doc, diario=Diario(tmp_path))
+    assert segundo["reanudado"] == "exportado"
+    assert segundo["carpeta"] == primero["carpeta"]
+    assert segundo["categoria"] == primero["categoria"]
@@ -3,7 +3,15 @@
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parents[1]))
-from src.classifier import clasificar_tematica, extraer_titulo, extraer_autor, clasificar_documento
+from src.classifier import (
+    clasificar_tematica,
+    extraer_titulo,
+    extraer_autor,
+    clasificar_documento,
+    iniciar_clasificacion,
+    observar_fragmento,
+    cerrar_clasificacion
+)
 
 
 
@@ -40,3 +48,15 @@ This paper discusses supervised learning and applications in diagnostics."""
     assert resultado["dewey"] == "600"
     assert resultado["titulo"].startswith("Machine learning")
     assert resultado["autor"] == "Ana Gómez"
+
+def test_clasificacion_incremental_equivale_a_completa():
+    fragmentos = [
+        "Machine learning techniques in medicine\nBy Ana Gómez",
+        "\nThis paper discusses supervised learning.",
+        "\n\nA short note on history and Autor: Pedro Pérez",
+    ]
+    estado = iniciar_clasificacion()
+    for fragmento in fragmentos:
+        observar_fragmento(estado, fragmento)
+
+    assert cerrar_clasificacion(estado) == clasificar_documento("".join(fragmentos))
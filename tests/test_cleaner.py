@@ -8,6 +8,7 @@ from src.cleaner import (  # ✅ Ahora Python sabe dónde está 'src'
     normalizar_unicode,
     eliminar_lineas_ruido,
     limpiar_texto_completo,
+    limpiar_paginas,
 )
 
 
@@ -63,3 +64,14 @@ def test_texto_tecnico_simulado_formula():
     assert "E[X] = 0" in resultado
     assert "***" not in resultado
     assert "=====" not in resultado
+
+# 🔹 Test 6: Limpieza por páginas equivale a limpiar el documento unido
+def test_limpiar_paginas_equivale_a_documento_completo():
+    paginas = [
+        "INTRODUCCIÓN\nEste trabajo estudia el tema.",
+        "Otra página empieza en mayúscula\ny sigue en minúscula",
+        "continúa la frase anterior.\n****\n",
+    ]
+    completo = limpiar_texto_completo("\n".join(paginas), modo_md=True)
+    por_paginas = "".join(limpiar_paginas(paginas, modo_md=True))
+    assert por_paginas == completo
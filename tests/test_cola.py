@@ -0,0 +1,165 @@
+import os
+import sys
+import time
+from multiprocessing import get_context
+from pathlib import Path
+
+# 🔧 Asegura visibilidad del módulo src/
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from src import pipeline
+from src.cola import ColaTrabajos, procesar_lote_cola
+
+pytestmark = pytest.mark.usefixtures("salida_temporal")
+
+
+def _reclamar_todos(carpeta, nodo, hashes):
+    """Worker de prueba: un 'nodo' que intenta reclamar todos los hashes y devuelve los que ganó."""
+    cola = ColaTrabajos(carpeta, nodo=nodo)
+    return [h for h in hashes if cola.reclamar(h, f"{h}.pdf")]
+
+def _procesar_o_morir(ruta, debug=False, hash_doc=None, opciones=None):
+    if "muere" in ruta:
+        os._exit(1)  # el worker desaparece sin devolver nada
+    return {"archivo": ruta, "ok": True}
+
+# ─────────────────────────────────────────────────────────────
+# Tests de leases
+# ─────────────────────────────────────────────────────────────
+
+def test_un_solo_nodo_gana_el_lease(tmp_path):
+    a = ColaTrabajos(tmp_path, nodo="a")
+    b = ColaTrabajos(tmp_path, nodo="b")
+    assert a.reclamar("h1", "x.pdf") is True
+    assert b.reclamar("h1", "x.pdf") is False
+    assert b.estado("h1") == "en_curso"
+
+    a.completar("h1", {"archivo": "x.pdf", "carpeta": str(tmp_path)})
+    assert b.estado("h1") == "hecho"
+    assert b.reclamar("h1", "x.pdf") is False
+
+def test_exportacion_incompleta_no_cuenta_como_hecha(tmp_path):
+    cola = ColaTrabajos(tmp_path, nodo="a")
+    assert cola.reclamar("h1", "x.pdf")
+    cola.completar("h1", {"archivo": "x.pdf", "ocr_fallidas": 2})
+    assert cola.estado("h1") == "pendiente"
+    assert cola.reclamar("h1", "x.pdf") is True
+
+def test_hecho_sin_carpeta_de_salida_se_rehace(tmp_path):
+    cola = ColaTrabajos(tmp_path, nodo="a")
+    salida = tmp_path / "salida"
+    salida.mkdir()
+    assert cola.reclamar("h1", "x.pdf")
+    cola.completar("h1", {"archivo": "x.pdf", "carpeta": str(salida)})
+    assert cola.estado("h1") == "hecho"
+
+    salida.rmdir()
+    assert cola.estado("h1") == "pendiente"
+
+def test_forzar_ignora_hechos_e_intentos_anteriores(tmp_path):
+    previa = ColaTrabajos(tmp_path, nodo="a", max_intentos=1)
+    assert previa.reclamar("h1", "x.pdf") and previa.reclamar("h2", "y.pdf")
+    previa.completar("h1", {"archivo": "x.pdf", "carpeta": str(tmp_path)})
+    previa.fallar("h2", "boom")
+    assert previa.estado("h1") == "hecho" and previa.estado("h2") == "fallido"
+
+    time.sleep(0.01)
+    forzada = ColaTrabajos(tmp_path, nodo="b", max_intentos=1, desde=time.time())
+    assert forzada.estado("h1") == "pendiente" and forzada.estado("h2") == "pendiente"
+    assert forzada.reclamar("h2", "y.pdf")
+    assert forzada.fallar("h2", "otra vez") is False
+    assert forzada.estado("h2") == "fallido"
+
+def test_lease_caducado_se_reclama_y_el_dueno_anterior_lo_pierde(tmp_path):
+    a = ColaTrabajos(tmp_path, nodo="a", duracion_lease=0.2)
+    b = ColaTrabajos(tmp_path, nodo="b", duracion_lease=0.2)
+    assert a.reclamar("h1", "x.pdf")
+    time.sleep(0.3)  # 'a' no renovó: su lease caducó
+    assert b.reclamar("h1", "x.pdf") is True
+    assert a.renovar("h1") is False
+    assert b.renovar("h1") is True
+
+    # Liberar un lease ajeno no lo borra
+    a.liberar("h1")
+    assert b.estado("h1") == "en_curso"
+
+def test_fallos_se_reintentan_hasta_max_intentos(tmp_path):
+    cola = ColaTrabajos(tmp_path, nodo="a", max_intentos=2)
+    assert cola.reclamar("h1", "x.pdf")
+    assert cola.fallar("h1", "boom") is True
+    assert cola.estado("h1") == "pendiente"
+    assert cola.reclamar("h1", "x.pdf")
+    assert cola.fallar("h1", "boom") is False
+    assert cola.estado("h1") == "fallido"
+    assert cola.reclamar("h1", "x.pdf") is False
+
+def test_lease_perdido_no_completa_ni_cuenta_fallos(tmp_path):
+    a = ColaTrabajos(tmp_path, nodo="a", duracion_lease=0.2)
+    b = ColaTrabajos(tmp_path, nodo="b")
+    assert a.reclamar("h1", "x.pdf")
+    time.sleep(0.3)
+    assert b.reclamar("h1", "x.pdf")
+
+    assert a.completar("h1", {"archivo": "x.pdf"}) is False
+    assert not (Path(tmp_path) / "h1.hecho").exists()
+    assert a.fallar("h1", "tarde") is True
+    assert not (Path(tmp_path) / "h1.intentos").exists()
+    assert b.estado("h1") == "en_curso"
+
+    assert b.completar("h1", {"archivo": "x.pdf", "carpeta": str(tmp_path)}) is True
+    assert a.estado("h1") == "hecho"
+
+def test_varios_procesos_no_duplican_reclamos(tmp_path):
+    hashes = [f"h{i:03d}" for i in range(60)]
+    with get_context("spawn").Pool(4) as pool:
+        ganados = pool.starmap(_reclamar_todos, [(tmp_path, f"nodo{n}", hashes) for n in range(4)])
+    todos = [h for lista in ganados for h in lista]
+    assert sorted(todos) == hashes
+
+# ─────────────────────────────────────────────────────────────
+# Tests de procesamiento de un lote vía cola
+# ─────────────────────────────────────────────────────────────
+
+def test_procesar_lote_cola_omite_lo_hecho_por_otro_nodo(tmp_path):
+    from src.utils import calcular_hash_md5
+
+    textual = "tests/fixtures/pdf_textual.pdf"
+    simple = "tests/fixtures/pdf_simple.pdf"
+    otro = ColaTrabajos(tmp_path, nodo="otro")
+    assert otro.reclamar(calcular_hash_md5(simple), simple, huella="v1")
+    otro.completar(calcular_hash_md5(simple), {"archivo": simple, "carpeta": str(tmp_path)}, huella="v1")
+
+    cola = ColaTrabajos(tmp_path, nodo="local")
+    pendientes = [(textual, calcular_hash_md5(textual)), (simple, calcular_hash_md5(simple))]
+    resultados, omitidos = procesar_lote_cola(pendientes, cola, huella="v1")
+
+    assert [r["archivo"] for r in resultados] == [textual]
+    assert resultados[0]["ok"] is True
+    assert omitidos == [{"archivo": simple, "hash": calcular_hash_md5(simple), "razon": "otro_nodo"}]
+    assert cola.estado(calcular_hash_md5(textual), huella="v1") == "hecho"
+    assert not list(Path(tmp_path).glob("*.lease"))
+
+def test_procesar_lote_cola_sobrevive_a_un_worker_muerto(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "procesar_con_registro", _procesar_o_morir)
+    cola = ColaTrabajos(tmp_path, nodo="local", max_intentos=2)
+    pendientes = [("a.pdf", "ha"), ("muere.pdf", "hm"), ("b.pdf", "hb")]
+    resultados, omitidos = procesar_lote_cola(pendientes, cola, workers=2)
+
+    por_ruta = {r["archivo"]: r for r in resultados}
+    assert set(por_ruta) == {"a.pdf", "muere.pdf", "b.pdf"}
+    assert por_ruta["muere.pdf"]["ok"] is False
+    # Cada caída cuenta como intento: el PDF que tumba al worker acaba fallido
+    assert cola.estado("hm") == "fallido"
+    assert not list(Path(tmp_path).glob("*.lease"))
+
+def test_procesar_lote_cola_informa_de_los_fallidos_previos(tmp_path):
+    previa = ColaTrabajos(tmp_path, nodo="a", max_intentos=1)
+    assert previa.reclamar("hf", "f.pdf")
+    previa.fallar("hf", "boom")
+
+    cola = ColaTrabajos(tmp_path, nodo="local", max_intentos=1)
+    resultados, omitidos = procesar_lote_cola([("f.pdf", "hf")], cola)
+    assert resultados == []
+    assert omitidos == [{"archivo": "f.pdf", "hash": "hf", "razon": "fallido"}]
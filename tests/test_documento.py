@@ -0,0 +1,41 @@
+import sys
+from pathlib import Path
+
+# 🔧 Asegura visibilidad del módulo src/
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from src.documento import DocumentoPDF, abrir_documento
+from src.parser import es_pdf_complejo, extract_text
+from src.utils import calcular_hash_md5
+
+pytestmark = pytest.mark.usefixtures("salida_temporal")
+
+PDF = "tests/fixtures/pdf_textual.pdf"
+
+# ─────────────────────────────────────────────────────────────
+# Tests del manejador compartido
+# ─────────────────────────────────────────────────────────────
+
+def test_hash_desde_buffer_coincide_con_archivo():
+    for usar_mmap in (True, False):
+        with DocumentoPDF(PDF, usar_mmap=usar_mmap) as doc:
+            assert doc.hash_md5() == calcular_hash_md5(PDF)
+
+def test_documentos_parseados_se_reutilizan():
+    with DocumentoPDF(PDF) as doc:
+        assert doc.fitz() is doc.fitz()
+        assert doc.pdfplumber() is doc.pdfplumber()
+        assert len(doc.fitz()) == len(doc.pdfplumber().pages)
+
+def test_extraccion_con_documento_equivale_a_ruta():
+    with DocumentoPDF(PDF) as doc:
+        assert es_pdf_complejo(doc) == es_pdf_complejo(PDF)
+        assert extract_text(doc) == extract_text(PDF)
+
+def test_abrir_documento_no_cierra_lo_ajeno():
+    with DocumentoPDF(PDF) as doc:
+        with abrir_documento(doc) as mismo:
+            assert mismo is doc
+        assert doc.fitz().page_count >= 1
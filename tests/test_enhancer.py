@@ -12,7 +12,8 @@ from src.enhancer import (
     reparar_ocr_simbolos,
     marcar_fragmentos_dudosos,
     pipeline_hooked_enhancer,
-    enriquecer_texto
+    enriquecer_texto,
+    enriquecer_paginas
 )
 
 # ─────────────────────────────────────────────────────────────
@@ -68,3 +69,35 @@ def test_pipeline_hooked_enhancer_no_cambios(tmp_path):
 
     enriquecido, stats = pipeline_hooked_enhancer(texto_limpio, config)
     assert enriquecido == texto_limpio
+
+
+# ─────────────────────────────────────────────────────────────
+# 🌊 Test enriquecimiento en streaming
+# ─────────────────────────────────────────────────────────────
+
+def test_enriquecer_paginas_une_palabra_partida_entre_paginas():
+    fragmentos = ["Primera línea\nel pro-", "\nducto final cid:12", "\nﬁn del libro"]
+    stats = {}
+    resultado = "".join(enriquecer_paginas(fragmentos, stats=stats))
+    assert "producto final" in resultado
+    assert "cid:" not in resultado
+    assert resultado.endswith("fin del libro")
+    assert stats["palabras_reparadas"] == 1
+
+def test_enriquecer_paginas_acota_lo_retenido_entre_fragmentos():
+    from src.enhancer import MAX_PENDIENTE
+
+    leidos = []
+
+    def fragmentos():
+        for i in range(100):  # 100 000 caracteres sin un solo salto de línea
+            leidos.append(i)
+            yield "palabra " * 125
+
+    salida = enriquecer_paginas(fragmentos())
+    primero = next(salida)
+    assert len(leidos) <= MAX_PENDIENTE // 1000 + 1  # no espera al final del documento
+    assert len(primero) <= MAX_PENDIENTE + 1000
+    resto = list(salida)
+    assert all(len(trozo) <= MAX_PENDIENTE + 1000 for trozo in resto)
+    assert "".join([primero] + resto).split() == ["palabra"] * 12500
@@ -5,7 +5,7 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
-from src.exporter import exportar_archivos, slugify
+from src.exporter import exportar_archivos, exportar_archivos_stream, slugify
 
 def test_exportar_archivos_crea_todos_los_formatos(tmp_path):
     # 📄 Crear PDF falso para simular entrada
@@ -44,3 +44,25 @@ def test_exportar_archivos_crea_todos_los_formatos(tmp_path):
         base_path.parent.rmdir()
     except PermissionError as e:
         print(f"⚠️ No se pudo limpiar completamente por permisos: {e}")
+
+
+def test_exportar_archivos_stream_equivale_a_exportacion_completa():
+    fragmentos = ["Primer párrafo.", "\n\nSegundo párrafo\ncon dos líneas.", "\n\n\nTercero."]
+    texto = "".join(fragmentos)
+    meta = {"titulo": "Documento Stream", "autor": "Ana", "categoria": "Literature", "dewey": "800"}
+    hash_completo = hashlib.md5(b"completo").hexdigest()
+    hash_stream = hashlib.md5(b"stream").hexdigest()
+
+    carpeta = exportar_archivos("StreamTest", meta["titulo"], texto, meta["categoria"], meta["dewey"], meta["autor"], hash_completo)
+    carpeta_stream = exportar_archivos_stream("StreamTest", iter(fragmentos), hash_stream, lambda: meta)
+
+    assert carpeta_stream == Path("output") / "streamtest" / f"documento-stream_{hash_stream}"
+    assert not (Path("output") / f".parcial_{hash_stream}").exists()
+    for ext in [".txt", ".md"]:
+        assert (carpeta / f"{hash_completo}{ext}").read_text(encoding="utf-8") == \
+            (carpeta_stream / f"{hash_stream}{ext}").read_text(encoding="utf-8")
+    jsonl = (carpeta / f"{hash_completo}.jsonl").read_text(encoding="utf-8")
+    jsonl_stream = (carpeta_stream / f"{hash_stream}.jsonl").read_text(encoding="utf-8")
+    assert jsonl.replace(hash_completo, hash_stream) == jsonl_stream
+
+    shutil.rmtree(carpeta.parent)
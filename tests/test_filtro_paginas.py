@@ -0,0 +1,71 @@
+import sys
+from pathlib import Path
+
+import fitz
+import numpy as np
+
+# 🔧 Asegura visibilidad del módulo src/
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src import filtro_paginas
+from src.filtro_paginas import es_pagina_en_blanco, huella_perceptual, iguales, miniatura, recordar, revisar
+
+MUSICA = "tests/fixtures/The Origins of music.pdf"
+
+
+def _pagina(texto=None, tamano=14):
+    doc = fitz.open()
+    pagina = doc.new_page()
+    if texto:
+        pagina.insert_text((250, 400), texto, fontsize=tamano)
+    return doc, pagina
+
+# ─────────────────────────────────────────────────────────────
+# Tests del filtro de páginas antes del OCR
+# ─────────────────────────────────────────────────────────────
+
+def test_pagina_vacia_o_con_ruido_es_blanco_y_un_pie_de_lamina_no():
+    filtro_paginas._cargar_numpy()
+    _, vacia = _pagina()
+    assert es_pagina_en_blanco(miniatura(vacia))
+    ruido = np.clip(235 + np.random.default_rng(0).normal(0, 5, (500, 400)), 0, 255)
+    assert es_pagina_en_blanco(ruido)
+    _, lamina = _pagina("Lámina 3")
+    assert not es_pagina_en_blanco(miniatura(lamina))
+    with fitz.open(MUSICA) as doc:
+        assert not es_pagina_en_blanco(miniatura(doc[0]))
+
+def test_la_huella_tolera_ruido_pero_no_distingue_sola_paginas_de_texto():
+    filtro_paginas._cargar_numpy()
+    with fitz.open(MUSICA) as doc:
+        gris = miniatura(doc[6])
+        otra = miniatura(doc[7])
+    ruidosa = np.clip(gris + np.random.default_rng(1).normal(0, 8, gris.shape), 0, 255)
+    assert bin(huella_perceptual(gris) ^ huella_perceptual(ruidosa)).count("1") <= filtro_paginas.DISTANCIA_MAX_HASH
+    assert huella_perceptual(gris) != huella_perceptual(otra)
+
+def test_solo_se_reutiliza_una_pagina_visualmente_igual(monkeypatch):
+    monkeypatch.setattr(filtro_paginas, "ACTIVO", True)
+    filtro_paginas.olvidar()
+    _, tres = _pagina("p. 3", 10)
+    _, otra_tres = _pagina("p. 3", 10)
+    _, cuatro = _pagina("p. 4", 10)
+    _, lamina = _pagina("Lámina 3")
+    _, lamina_bis = _pagina("Lámina 3")
+    _, lamina_4 = _pagina("Lámina 4")
+
+    assert revisar(tres)["clase"] == "en blanco"  # un número de página suelto
+    primera = revisar(lamina)
+    assert primera["clase"] == "nueva"
+    recordar(primera, "LÁMINA 3")
+    repetida = revisar(lamina_bis)
+    assert repetida["clase"] == "repetida" and repetida["texto"] == "LÁMINA 3"
+    assert revisar(lamina, lang="spa")["clase"] == "nueva"  # otro idioma, otra lectura
+    distinta = revisar(lamina_4)
+    assert distinta["clase"] == "nueva" and not iguales(primera, distinta)
+    filtro_paginas.olvidar()
+
+def test_inactivo_no_revisa(monkeypatch):
+    monkeypatch.setattr(filtro_paginas, "ACTIVO", False)
+    _, lamina = _pagina("Lámina 3")
+    assert revisar(lamina) is None
@@ -28,7 +28,7 @@ def test_log_evento_clasificado_en_consola_y_jsonl(ruta_dummy):
 
     # ✅ Persistencia .jsonl
     logs_dir = Path("output/logs")
-    jsonl_logs = list(logs_dir.glob("run_*.jsonl"))
+    jsonl_logs = sorted(logs_dir.glob("run_*.jsonl"))  # el nombre lleva fecha: el último es el más reciente
     assert jsonl_logs, "No se generó archivo .jsonl"
 
     eventos = []
@@ -0,0 +1,139 @@
+import shutil
+import sys
+from pathlib import Path
+
+# 🔧 Asegura visibilidad del módulo src/
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.manifest import (
+    cargar_manifest,
+    registrar_exportacion,
+    esta_vigente,
+    filtrar_pendientes,
+    huella_pipeline,
+    ajustes_huella,
+    MODULOS_HUELLA
+)
+
+# ─────────────────────────────────────────────────────────────
+# Tests de persistencia del manifest
+# ─────────────────────────────────────────────────────────────
+
+def test_registrar_y_cargar_manifest(tmp_path):
+    ruta = tmp_path / "manifest.jsonl"
+    carpeta = tmp_path / "salida"
+    carpeta.mkdir()
+
+    manifest = cargar_manifest(ruta)
+    assert manifest == {}
+
+    registrar_exportacion(manifest, {"hash": "abc", "carpeta": carpeta, "archivo": "a.pdf"}, "h1", ruta)
+    recargado = cargar_manifest(ruta)
+    assert recargado["abc"]["huella"] == "h1"
+    assert esta_vigente(recargado, "abc", "h1") is True
+    assert esta_vigente(recargado, "abc", "otra_huella") is False
+
+def test_exportacion_degradada_queda_pendiente(tmp_path):
+    ruta = tmp_path / "manifest.jsonl"
+    carpeta = tmp_path / "salida"
+    carpeta.mkdir()
+
+    manifest = cargar_manifest(ruta)
+    registrar_exportacion(manifest, {"hash": "abc", "carpeta": carpeta, "degradado": True}, "h1", ruta)
+    recargado = cargar_manifest(ruta)
+    assert recargado["abc"]["degradado"] is True
+    assert esta_vigente(recargado, "abc", "h1") is False
+
+    registrar_exportacion(recargado, {"hash": "abc", "carpeta": carpeta}, "h1", ruta)
+    assert esta_vigente(cargar_manifest(ruta), "abc", "h1") is True
+
+def test_manifest_tolera_lineas_corruptas(tmp_path):
+    ruta = tmp_path / "manifest.jsonl"
+    ruta.write_text('{"hash": "ok", "huella": "h"}\n{"hash": "cort', encoding="utf-8")
+    assert list(cargar_manifest(ruta)) == ["ok"]
+
+def test_cargar_compacta_el_manifest(tmp_path):
+    ruta = tmp_path / "manifest.jsonl"
+    manifest = cargar_manifest(ruta)
+    for huella in ("h1", "h2"):
+        registrar_exportacion(manifest, {"hash": "abc", "carpeta": tmp_path}, huella, ruta)
+    registrar_exportacion(manifest, {"hash": "def", "carpeta": tmp_path}, "h1", ruta)
+    with open(ruta, "a", encoding="utf-8") as f:
+        f.write('{"hash": "cort')
+
+    assert cargar_manifest(ruta, compactar=False) == manifest
+    assert len(ruta.read_text(encoding="utf-8").splitlines()) == 4
+
+    assert cargar_manifest(ruta) == manifest
+    lineas = ruta.read_text(encoding="utf-8").splitlines()
+    assert len(lineas) == 2
+    assert cargar_manifest(ruta)["abc"]["huella"] == "h2"
+
+def test_rutas_por_defecto_siguen_a_la_salida_temporal(salida_temporal):
+    from src.checkpoint import diario_del_proceso
+    from src.cola import ColaTrabajos
+
+    manifest = cargar_manifest()
+    registrar_exportacion(manifest, {"hash": "abc", "carpeta": salida_temporal}, "h1")
+    assert (salida_temporal / "manifest.jsonl").exists()
+    assert cargar_manifest()["abc"]["huella"] == "h1"
+    assert diario_del_proceso().carpeta == salida_temporal / "checkpoint"
+    assert ColaTrabajos(nodo="n").carpeta == salida_temporal / "cola"
+
+def test_carpeta_borrada_invalida_entrada(tmp_path):
+    manifest = {"abc": {"hash": "abc", "huella": "h", "carpeta": str(tmp_path / "borrada")}}
+    assert esta_vigente(manifest, "abc", "h") is False
+
+# ─────────────────────────────────────────────────────────────
+# Tests de filtrado incremental
+# ─────────────────────────────────────────────────────────────
+
+def test_filtrar_pendientes_omite_duplicados_y_exportados(tmp_path):
+    a = tmp_path / "a.pdf"
+    b = tmp_path / "copia_de_a.pdf"
+    c = tmp_path / "c.pdf"
+    a.write_bytes(b"%PDF-1.4 A")
+    b.write_bytes(b"%PDF-1.4 A")
+    c.write_bytes(b"%PDF-1.4 C")
+
+    pendientes, omitidos = filtrar_pendientes([a, b, c], {}, "h")
+    assert [r for r, _ in pendientes] == [str(a), str(c)]
+    assert omitidos[0]["razon"] == "duplicado"
+
+    hash_c = pendientes[1][1]
+    manifest = {hash_c: {"hash": hash_c, "huella": "h", "carpeta": str(tmp_path)}}
+    pendientes, omitidos = filtrar_pendientes([a, c], manifest, "h")
+    assert [r for r, _ in pendientes] == [str(a)]
+    assert omitidos[0]["razon"] == "sin_cambios"
+
+    pendientes, _ = filtrar_pendientes([a, c], manifest, "h", forzar=True)
+    assert len(pendientes) == 2
+
+def test_huella_pipeline_estable():
+    assert huella_pipeline() == huella_pipeline()
+    assert len(huella_pipeline()) == 32
+
+def test_huella_cambia_con_cada_gen_del_texto(tmp_path):
+    src = Path(__file__).resolve().parents[1] / "src"
+    for nombre in MODULOS_HUELLA:
+        shutil.copy(src / f"{nombre}.py", tmp_path)
+    original = huella_pipeline(tmp_path)
+    assert original == huella_pipeline()
+
+    for nombre in ("sonda", "motores_ocr", "filtro_paginas", "documento", "rangos"):
+        ruta = tmp_path / f"{nombre}.py"
+        codigo = ruta.read_text(encoding="utf-8")
+        ruta.write_text(codigo + "\n# cambio\n", encoding="utf-8")
+        assert huella_pipeline(tmp_path) != original, nombre
+        ruta.write_text(codigo, encoding="utf-8")
+
+def test_huella_cambia_con_las_opciones_de_ejecucion(monkeypatch):
+    from src import filtro_paginas, motores_ocr
+
+    original = huella_pipeline()
+    assert huella_pipeline(ajustes=ajustes_huella()) == original
+    monkeypatch.setattr(motores_ocr, "MOTOR", "pytesseract" if motores_ocr.MOTOR != "pytesseract" else "auto")
+    con_otro_motor = huella_pipeline()
+    assert con_otro_motor != original
+    monkeypatch.setattr(filtro_paginas, "ACTIVO", not filtro_paginas.ACTIVO)
+    assert huella_pipeline() not in (original, con_otro_motor)
@@ -0,0 +1,77 @@
+import sys
+from pathlib import Path
+
+# 🔧 Asegura visibilidad del módulo src/
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from src import metricas
+from src.metricas import medir, documento, resumir, formatear_tabla
+from src.pipeline import procesar_con_registro
+
+pytestmark = pytest.mark.usefixtures("salida_temporal")
+
+# ─────────────────────────────────────────────────────────────
+# Tests de medición por etapa
+# ─────────────────────────────────────────────────────────────
+
+def test_desactivadas_no_registran():
+    metricas.activar(False)
+    with documento("a.pdf") as registros:
+        with medir("etapa") as m:
+            m.anotar(paginas=3)
+    assert registros == []
+
+def test_activadas_registran_por_documento():
+    metricas.activar(True)
+    try:
+        with documento("a.pdf") as registros:
+            with medir("etapa", caracteres=10) as m:
+                m.anotar(paginas=3)
+        assert len(registros) == 1
+        registro = registros[0]
+        assert registro["etapa"] == "etapa"
+        assert registro["documento"] == "a.pdf"
+        assert registro["paginas"] == 3 and registro["caracteres"] == 10
+        assert registro["wall_s"] >= 0 and registro["ok"] is True
+    finally:
+        metricas.activar(False)
+
+def test_resultado_incluye_metricas_de_etapas():
+    metricas.activar(True)
+    try:
+        resultado = procesar_con_registro("tests/fixtures/pdf_textual.pdf")
+    finally:
+        metricas.activar(False)
+    etapas = {r["etapa"] for r in resultado["metricas"]}
+    assert {"extraccion", "hibrido", "enhancer", "clasificacion", "exportacion"} <= etapas
+
+# ─────────────────────────────────────────────────────────────
+# Tests del resumen de fin de ejecución
+# ─────────────────────────────────────────────────────────────
+
+def test_resumir_percentiles_y_ritmo():
+    registros = [
+        {"etapa": "extraccion", "documento": f"{i}.pdf", "wall_s": float(i), "cpu_s": 0.5, "paginas": 2}
+        for i in range(1, 21)
+    ]
+    resumen = resumir(registros, duracion_s=10.0, documentos=20)
+    extraccion = resumen["etapas"]["extraccion"]
+    assert extraccion["n"] == 20
+    assert extraccion["p50_s"] == 10.0
+    assert extraccion["p95_s"] == 19.0
+    assert extraccion["max_s"] == 20.0
+    assert resumen["docs_s"] == 2.0
+    assert resumen["paginas_s"] == 4.0
+    assert "extraccion" in formatear_tabla(resumen)
+
+def test_resumir_suma_las_paginas_omitidas_del_ocr():
+    registros = [
+        {"etapa": "ocr", "documento": "a.pdf", "wall_s": 1.0, "cpu_s": 1.0, "paginas": 10,
+         "paginas_en_blanco": 2, "paginas_repetidas": 1},
+        {"etapa": "ocr", "documento": "b.pdf", "wall_s": 1.0, "cpu_s": 1.0, "pagina": 4, "paginas_en_blanco": 1},
+    ]
+    resumen = resumir(registros, duracion_s=2.0, documentos=2)
+    assert resumen["omitidas_ocr"] == {"paginas_en_blanco": 3, "paginas_repetidas": 1}
+    assert "3 páginas en blanco, 1 repetidas" in formatear_tabla(resumen)
@@ -0,0 +1,161 @@
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# 🔧 Asegura visibilidad del módulo src/
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.observador import vigilar_carpeta, crear_observador, ObservadorSondeo
+
+# ─────────────────────────────────────────────────────────────
+# Helpers: corre el vigilante en un hilo y recoge lo procesado
+# ─────────────────────────────────────────────────────────────
+
+def _iniciar(carpeta, forzar_sondeo, **kwargs):
+    procesados = []
+    detener = threading.Event()
+    hilo = threading.Thread(
+        target=vigilar_carpeta,
+        args=(carpeta, procesados.extend),
+        kwargs=dict(debounce=0.3, intervalo=0.05, detener=detener, forzar_sondeo=forzar_sondeo, **kwargs),
+        daemon=True,
+    )
+    hilo.start()
+    time.sleep(0.2)  # deja que el observador registre la carpeta
+    return procesados, detener, hilo
+
+def _esperar(condicion, limite=5.0):
+    fin = time.monotonic() + limite
+    while time.monotonic() < fin:
+        if condicion():
+            return True
+        time.sleep(0.05)
+    return False
+
+# ─────────────────────────────────────────────────────────────
+# Tests de detección y debounce (inotify y sondeo)
+# ─────────────────────────────────────────────────────────────
+
+@pytest.mark.parametrize("forzar_sondeo", [False, True])
+def test_detecta_pdf_nuevo_en_subcarpeta(tmp_path, forzar_sondeo):
+    procesados, detener, hilo = _iniciar(tmp_path, forzar_sondeo)
+    try:
+        sub = tmp_path / "Book"
+        sub.mkdir()
+        (sub / "nuevo.pdf").write_bytes(b"%PDF-1.4 nuevo")
+        (sub / "notas.txt").write_text("ignorar")
+        assert _esperar(lambda: procesados), "No se detectó el PDF nuevo"
+        assert procesados == [sub / "nuevo.pdf"]
+    finally:
+        detener.set()
+        hilo.join(timeout=5)
+
+def test_debounce_espera_a_que_termine_la_escritura(tmp_path):
+    procesados, detener, hilo = _iniciar(tmp_path, False)
+    try:
+        ruta = tmp_path / "escaneo.pdf"
+        inicio = time.monotonic()
+        with open(ruta, "wb") as f:
+            for _ in range(4):
+                f.write(b"x" * 1024)
+                f.flush()
+                time.sleep(0.15)
+        fin_escritura = time.monotonic()
+        assert _esperar(lambda: procesados)
+        assert time.monotonic() - fin_escritura >= 0.25
+        assert time.monotonic() - inicio >= 0.6
+        assert procesados == [ruta]
+    finally:
+        detener.set()
+        hilo.join(timeout=5)
+
+def test_incluye_existentes_al_arrancar(tmp_path):
+    (tmp_path / "previo.pdf").write_bytes(b"%PDF-1.4 previo")
+    procesados, detener, hilo = _iniciar(tmp_path, True)
+    try:
+        assert _esperar(lambda: procesados)
+        assert procesados == [tmp_path / "previo.pdf"]
+    finally:
+        detener.set()
+        hilo.join(timeout=5)
+
+def test_crear_observador_con_fallback(tmp_path):
+    observador = crear_observador(tmp_path, forzar_sondeo=True)
+    assert isinstance(observador, ObservadorSondeo)
+    observador.cerrar()
+
+# ─────────────────────────────────────────────────────────────
+# Tests del daemon con pool de procesos
+# ─────────────────────────────────────────────────────────────
+
+def _procesar_o_morir(ruta, debug=False, hash_doc=None, opciones=None):
+    if "muere" in str(ruta):
+        os._exit(1)  # el worker desaparece sin devolver nada
+    return {"archivo": str(ruta), "ok": True, "hash": hash_doc, "carpeta": "."}
+
+def test_daemon_sobrevive_a_un_worker_muerto(tmp_path, monkeypatch):
+    from src import logger, manifest, pipeline
+    from src.observador import ejecutar_daemon
+
+    monkeypatch.chdir(tmp_path)  # manifest y logs en la carpeta temporal
+    monkeypatch.setattr(pipeline, "procesar_con_registro", _procesar_o_morir)
+    errores, exportados = [], []
+
+    def log_evento(evento, archivo="", **_):
+        if evento == "error_parse":
+            errores.append(archivo)
+
+    monkeypatch.setattr(logger, "log_evento", log_evento)
+    monkeypatch.setattr(manifest, "registrar_exportacion", lambda m, resultado, huella: exportados.append(resultado["archivo"]))
+
+    entrada = tmp_path / "input"
+    entrada.mkdir()
+    (entrada / "muere.pdf").write_bytes(b"%PDF-1.4 muere")
+    detener = threading.Event()
+    hilo = threading.Thread(target=ejecutar_daemon, args=(entrada,),
+                            kwargs=dict(workers=2, debounce=0.2, detener=detener, forzar_sondeo=True), daemon=True)
+    hilo.start()
+    try:
+        assert _esperar(lambda: errores, limite=10), "El documento que tumba al worker no se registró como error"
+        assert errores == [str(entrada / "muere.pdf")]
+
+        (entrada / "sano.pdf").write_bytes(b"%PDF-1.4 sano")
+        assert _esperar(lambda: exportados, limite=10), "El daemon no siguió con un pool nuevo"
+        assert exportados == [str(entrada / "sano.pdf")]
+    finally:
+        detener.set()
+        hilo.join(timeout=10)
+
+def test_daemon_pasa_las_opciones_a_cada_documento(tmp_path, monkeypatch):
+    from src import manifest, pipeline
+    from src.observador import ejecutar_daemon
+
+    monkeypatch.chdir(tmp_path)  # manifest y logs en la carpeta temporal
+    recibidas = []
+
+    def procesar(ruta, debug=False, hash_doc=None, opciones=None):
+        recibidas.append(opciones)
+        return {"archivo": str(ruta), "ok": False, "error": "prueba"}
+
+    monkeypatch.setattr(pipeline, "procesar_con_registro", procesar)
+    monkeypatch.setattr(manifest, "registrar_exportacion", lambda *a, **k: None)
+
+    entrada = tmp_path / "input"
+    entrada.mkdir()
+    (entrada / "a.pdf").write_bytes(b"%PDF-1.4 a")
+    opciones = {"stream": True, "limite_s": 30, "checkpoint": True}
+    detener = threading.Event()
+    hilo = threading.Thread(target=ejecutar_daemon, args=(entrada,),
+                            kwargs=dict(debounce=0.2, detener=detener, forzar_sondeo=True, opciones=opciones),
+                            daemon=True)
+    hilo.start()
+    try:
+        assert _esperar(lambda: recibidas, limite=10), "El daemon no procesó el documento"
+        assert recibidas == [opciones]
+    finally:
+        detener.set()
+        hilo.join(timeout=10)
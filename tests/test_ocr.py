@@ -13,3 +13,221 @@ def test_ocr_pdf_con_imagen():
     assert len(texto.strip()) > 10
     assert "Multidimensional Change of Variable" in texto
 
+
+
+def test_ocr_paralelo_conserva_el_orden_y_limita_hilos(tmp_path, monkeypatch, capsys):
+    import os
+    import fitz
+    from src import filtro_paginas, ocr, rangos
+
+    ruta = tmp_path / "paginas.pdf"
+    with fitz.open() as doc:
+        for ancho in (100, 200, 300, 400, 500):
+            doc.new_page(width=ancho, height=100)
+        doc.save(ruta)
+
+    # Solo se sustituye el reconocimiento: el reparto, el rasterizado y el orden son los reales
+    monkeypatch.setattr(ocr, "extraer_textos_ocr", lambda imagenes, lang="eng", con_confianza=False: [
+        (f"{imagen.width}|{os.environ.get('OMP_THREAD_LIMIT')}", 90.0) for imagen in imagenes
+    ])
+    monkeypatch.setattr(ocr, "_poppler_disponible", False)
+    monkeypatch.setattr(rangos, "PROCESOS_PAGINAS", 2)
+    monkeypatch.setattr(filtro_paginas, "ACTIVO", False)  # páginas vacías: que se reconozcan igual
+
+    textos = list(ocr.iter_ocr_paginas(ruta, dpi=144))
+    assert [t.split("|")[0] for t in textos] == ["200", "400", "600", "800", "1000"]  # zoom 2×
+    assert {t.split("|")[1] for t in textos} == {"1"}
+    salida = capsys.readouterr().out
+    assert [f"Página {n} procesada" in salida for n in range(1, 6)] == [True] * 5
+    assert salida.index("Página 4 procesada") < salida.index("Página 5 procesada")
+
+
+def test_rasterizado_pagina_a_pagina_en_memoria_y_derrame_privado(tmp_path, monkeypatch):
+    import fitz
+    from src import ocr
+    from src.documento import abrir_documento
+
+    ruta = tmp_path / "pagina.pdf"
+    with fitz.open() as doc:
+        doc.new_page(width=100, height=100)
+        doc.save(ruta)
+    ocr._cargar_ocr()
+    monkeypatch.setattr(ocr, "_poppler_disponible", False)
+    monkeypatch.chdir(tmp_path)
+
+    with abrir_documento(ruta) as documento:
+        with ocr._pagina_rasterizada(documento, 0) as (imagen, etiqueta):
+            assert etiqueta == "OCR Lite" and imagen.size == (200, 200)  # en memoria
+
+        # Por encima del umbral, la página va a una carpeta temporal propia que se borra al salir
+        monkeypatch.setattr(ocr, "UMBRAL_DERRAME_MB", 0)
+        with ocr._pagina_rasterizada(documento, 0) as (imagen, _):
+            volcado = Path(imagen)
+            assert volcado.is_file() and volcado.parent.name.startswith("openpages_ocr_")
+        assert not volcado.parent.exists()
+    assert not (tmp_path / "temp_ocr").exists()
+
+
+def test_ocr_por_lotes_entrega_varias_paginas_por_llamada(tmp_path, monkeypatch, capsys):
+    import fitz
+    from src import filtro_paginas, motores_ocr, ocr
+
+    ruta = tmp_path / "paginas.pdf"
+    with fitz.open() as doc:
+        for _ in range(5):
+            doc.new_page(width=100, height=100)
+        doc.save(ruta)
+
+    class MotorLotes:
+        nombre = "prueba"
+        por_lotes = True
+        lotes = []
+
+        def reconocer_lote(self, imagenes, lang="eng", con_confianza=False):
+            self.lotes.append([Path(imagen).name for imagen in imagenes])
+            assert all(Path(imagen).is_file() for imagen in imagenes)
+            return [(Path(imagen).stem, 90.0) for imagen in imagenes]
+
+    monkeypatch.setattr(motores_ocr, "_motor", MotorLotes())
+    monkeypatch.setattr(filtro_paginas, "ACTIVO", False)  # páginas vacías: que se reconozcan igual
+    monkeypatch.setattr(ocr, "_poppler_disponible", False)
+    monkeypatch.setattr(ocr, "TAMANO_LOTE_OCR", 2)
+
+    textos = list(ocr.iter_ocr_paginas(ruta))
+    assert textos == [f"pagina_{n}" for n in range(1, 6)]
+    assert [len(lote) for lote in MotorLotes.lotes] == [2, 2, 1]
+    assert "[OCR Lite] Página 5 procesada" in capsys.readouterr().out
+
+
+def test_sin_tesserocr_se_usa_pytesseract(monkeypatch, capsys):
+    from src import motores_ocr
+
+    monkeypatch.setitem(sys.modules, "tesserocr", None)  # import tesserocr → ImportError
+    assert motores_ocr.crear_motor("auto").nombre == "pytesseract"
+    assert motores_ocr.crear_motor("tesserocr").nombre == "pytesseract"
+    assert "tesserocr no disponible" in capsys.readouterr().out
+
+
+def test_resolucion_adaptativa_solo_repite_las_paginas_dudosas(tmp_path, monkeypatch, capsys):
+    import fitz
+    from src import filtro_paginas, ocr
+
+    ruta = tmp_path / "paginas.pdf"
+    with fitz.open() as doc:
+        for _ in range(3):
+            doc.new_page(width=72, height=72)
+        doc.save(ruta)
+
+    # Confianza según la página y la resolución: la del medio solo se lee bien a DPI_OCR_ALTO
+    def reconocer(imagenes, lang="eng", con_confianza=False):
+        lecturas = []
+        for imagen in imagenes:
+            pagina = int(Path(imagen).stem.split("_")[1]) if isinstance(imagen, str) else 2
+            ancho = fitz.Pixmap(imagen).width if isinstance(imagen, str) else imagen.width
+            confianza = 40.0 if pagina == 2 and ancho < ocr.DPI_OCR_ALTO else 95.0
+            lecturas.append((f"p{pagina}@{ancho}", confianza))
+        return lecturas
+
+    monkeypatch.setattr(ocr, "extraer_textos_ocr", reconocer)
+    monkeypatch.setattr(ocr, "_poppler_disponible", False)
+    monkeypatch.setattr(ocr, "TAMANO_LOTE_OCR", 3)
+    monkeypatch.setattr(filtro_paginas, "ACTIVO", False)  # páginas vacías: que se reconozcan igual
+
+    resoluciones = {}
+    textos = list(ocr.iter_ocr_paginas(ruta, resoluciones=resoluciones))
+    assert textos == ["p1@150", "p2@300", "p3@150"]  # página de 1 pulgada: píxeles = dpi
+    assert resoluciones == {0: 150, 1: 300, 2: 150}
+    assert "Página 2 procesada (300 dpi)" in capsys.readouterr().out
+
+    # Con `dpi` fijo no hay segunda pasada
+    assert list(ocr.iter_ocr_paginas(ruta, dpi=100)) == ["p1@100", "p2@100", "p3@100"]
+
+
+def test_confianza_media_por_pagina_desde_tsv():
+    from src.motores_ocr import confianzas_tsv
+
+    tsv = "\n".join([
+        "level\tpage_num\tblock_num\tpar_num\tline_num\tword_num\tleft\ttop\twidth\theight\tconf\ttext",
+        "1\t1\t0\t0\t0\t0\t0\t0\t100\t100\t-1\t",
+        "5\t1\t1\t1\t1\t1\t0\t0\t10\t10\t90\tHola",
+        "5\t1\t1\t1\t1\t2\t0\t0\t10\t10\t70.5\tmundo",
+        "5\t2\t1\t1\t1\t1\t0\t0\t10\t10\t30\tOCR",
+        "5\t2\t1\t1\t1\t2\t0\t0\t10\t10\t95\t ",
+    ])
+    assert confianzas_tsv(tsv) == {1: 80.25, 2: 30.0}
+
+
+def test_paginas_en_blanco_y_repetidas_no_pasan_por_el_motor(tmp_path, monkeypatch, capsys):
+    import fitz
+    from src import filtro_paginas, ocr
+
+    ruta = tmp_path / "libro.pdf"
+    with fitz.open() as doc:
+        for contenido in ("Lámina 3", None, "Lámina 3", "Lámina 4", "Lámina 3"):
+            pagina = doc.new_page()
+            if contenido:
+                pagina.insert_text((250, 400), contenido, fontsize=14)
+        doc.save(ruta)
+
+    llamadas = []
+
+    def reconocer(imagenes, lang="eng", con_confianza=False):
+        lecturas = []
+        for _ in imagenes:
+            llamadas.append(1)
+            lecturas.append((f"texto {len(llamadas)}", 95.0))
+        return lecturas
+
+    monkeypatch.setattr(ocr, "extraer_textos_ocr", reconocer)
+    monkeypatch.setattr(ocr, "_poppler_disponible", False)
+    filtro_paginas.olvidar()
+
+    conteo = {}
+    textos = list(ocr.iter_ocr_paginas(ruta, conteo=conteo))
+    assert textos == ["texto 1", "", "texto 1", "texto 2", "texto 1"]
+    assert sum(llamadas) == 2
+    assert conteo == {"paginas_en_blanco": 1, "paginas_repetidas": 2}
+    assert "Página 2 omitida (en blanco)" in capsys.readouterr().out
+
+    # Entre documentos (mismo proceso) también se reutiliza
+    assert list(ocr.iter_ocr_paginas(ruta, paginas=[3])) == ["texto 2"]
+    assert sum(llamadas) == 2
+    filtro_paginas.olvidar()
+
+
+def test_en_paralelo_las_repetidas_se_reconocen_una_vez(tmp_path, monkeypatch):
+    import os
+    import fitz
+    from src import filtro_paginas, ocr, rangos
+
+    ruta = tmp_path / "libro.pdf"
+    with fitz.open() as doc:
+        for contenido in ("Lámina 3", "Lámina 3", None, "Lámina 4", "Lámina 3", "Lámina 4"):
+            pagina = doc.new_page()
+            if contenido:
+                pagina.insert_text((250, 400), contenido, fontsize=14)
+        doc.save(ruta)
+    registro = tmp_path / "llamadas.txt"
+
+    def reconocer(imagenes, lang="eng", con_confianza=False):
+        # Corre en los procesos del pool: las llamadas se cuentan en un archivo
+        with open(registro, "a", encoding="utf-8") as f:
+            f.write("x" * len(imagenes))
+        return [(f"texto {os.getpid()}", 95.0) for _ in imagenes]
+
+    monkeypatch.setattr(ocr, "extraer_textos_ocr", reconocer)
+    monkeypatch.setattr(ocr, "_poppler_disponible", False)
+    monkeypatch.setattr(rangos, "PROCESOS_PAGINAS", 2)
+    filtro_paginas.olvidar()
+
+    conteo = {}
+    textos = list(ocr.iter_ocr_paginas(ruta, conteo=conteo))
+    assert len(registro.read_text()) == 2  # "Lámina 3" y "Lámina 4"
+    assert textos[0] == textos[1] == textos[4] and textos[3] == textos[5]
+    assert textos[2] == ""
+    assert conteo == {"paginas_en_blanco": 1, "paginas_repetidas": 3}
+
+    # Lo reconocido en los workers queda recordado en este proceso
+    assert list(ocr.iter_ocr_paginas(ruta, paginas=[3])) == [textos[3]]
+    assert len(registro.read_text()) == 2
+    filtro_paginas.olvidar()
@@ -5,7 +5,8 @@ import pytest
 # 🔧 Asegura que src/ sea visible desde cualquier entorno
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
-from src.parser import extract_text, es_pdf_complejo
+from src import parser
+from src.parser import extract_text, extract_pages, es_pdf_complejo
 
 # ---
 # 🧪 test_parser.py – Pruebas integradas del módulo de parsing
@@ -43,3 +44,115 @@ def test_pdf_necesita_ocr():
 def test_heuristica_es_pdf_complejo():
     assert es_pdf_complejo("tests/fixtures/pdf_escaneado.pdf") is True
     assert es_pdf_complejo("tests/fixtures/pdf_textual.pdf") is False
+
+
+def test_extract_pages_equivale_a_extract_text():
+    paginas = list(extract_pages("tests/fixtures/pdf_simple.pdf"))
+    assert len(paginas) == 2
+    assert "\n".join(paginas).split() == extract_text("tests/fixtures/pdf_simple.pdf").split()
+
+
+@pytest.fixture
+def pdf_mixto(tmp_path):
+    """PDF de 4 páginas: texto, lámina escaneada, página en blanco y texto ilegible (cid)."""
+    import fitz
+
+    with fitz.open() as origen:
+        origen.new_page().insert_text((72, 72), "Texto dentro de una imagen", fontsize=24)
+        lamina = origen[0].get_pixmap()
+
+    ruta = tmp_path / "mixto.pdf"
+    with fitz.open() as doc:
+        doc.new_page().insert_text((72, 72), "Primera página con capa de texto normal y suficiente.")
+        pagina = doc.new_page()
+        pagina.insert_image(pagina.rect, pixmap=lamina)
+        doc.new_page()
+        doc.new_page().insert_text((72, 72), "(cid:12)(cid:44)(cid:3)(cid:71)(cid:72)(cid:73)")
+        doc.save(ruta)
+    return ruta
+
+
+def test_hibrido_solo_hace_ocr_de_las_paginas_sin_texto_util(pdf_mixto, monkeypatch):
+    pedidas = []
+
+    def ocr_falso(doc, lang="eng", dpi=None, paginas=None, conteo=None):
+        for idx in paginas:
+            pedidas.append(idx)
+            yield f"[OCR página {idx + 1}]"
+
+    monkeypatch.setattr(parser, "iter_ocr_paginas", ocr_falso)
+    conteo = {}
+    paginas = list(parser.iter_hibrido(pdf_mixto, conteo=conteo))
+
+    assert pedidas == [1, 3]  # la lámina y la página cid; la blanca no
+    assert "capa de texto" in paginas[0]
+    assert paginas[1] == "[OCR página 2]" and paginas[3] == "[OCR página 4]"
+    assert paginas[2].strip() == ""
+    assert conteo == {"paginas": 4, "paginas_ocr": 2}
+
+
+def test_hibrido_extrae_cada_columna_por_separado():
+    conteo = {}
+    (pagina,) = parser.iter_hibrido("tests/fixtures/The Origins of music.pdf", paginas=[1], conteo=conteo)
+    assert conteo["paginas_pdfplumber"] == 1
+    # El final de la columna izquierda precede al inicio de la derecha, sin mezclar líneas
+    assert pagina.index("(Dunbar and Shultz, 2021a).") < pagina.index("Anthropoid primates (and therefore humans)")
+
+
+@pytest.fixture
+def pdf_escaneado_con_texto(tmp_path):
+    """22 páginas escaneadas salvo la 2 y la 3, con texto; la sonda (8 muestras) no mira esas dos."""
+    import fitz
+
+    with fitz.open() as origen:
+        origen.new_page().insert_text((72, 72), "Lámina escaneada", fontsize=24)
+        lamina = origen[0].get_pixmap()
+
+    ruta = tmp_path / "escaneado_con_texto.pdf"
+    with fitz.open() as doc:
+        for idx in range(22):
+            pagina = doc.new_page()
+            if idx in (1, 2):
+                pagina.insert_text((72, 72), f"Página {idx + 1} con una capa de texto normal y suficiente.")
+            else:
+                pagina.insert_image(pagina.rect, pixmap=lamina)
+        doc.save(ruta)
+    return ruta
+
+
+def test_pdf_escaneado_con_paginas_de_texto_pasa_el_resto_por_ocr(pdf_escaneado_con_texto, monkeypatch):
+    pedidas = []
+
+    def ocr_falso(doc, lang="eng", dpi=None, paginas=None, conteo=None):
+        for idx in paginas:
+            pedidas.append(idx)
+            yield f"Lectura OCR de la pagina {idx + 1}"
+
+    monkeypatch.setattr(parser, "iter_ocr_paginas", ocr_falso)
+    assert es_pdf_complejo(pdf_escaneado_con_texto) is True
+
+    texto = extract_text(pdf_escaneado_con_texto)
+    assert sorted(pedidas) == [idx for idx in range(22) if idx not in (1, 2)]
+    assert "Página 2 con una capa de texto" in texto
+    assert "Lectura OCR de la pagina 22" in texto
+
+
+def test_streaming_de_pdf_escaneado_con_paginas_de_texto(pdf_escaneado_con_texto, monkeypatch):
+    pedidas = []
+
+    def ocr_falso(doc, lang="eng", dpi=None, paginas=None, conteo=None):
+        for idx in paginas:
+            pedidas.append(idx)
+            yield f"Lectura OCR de la pagina {idx + 1}"
+
+    def sin_pdfplumber(*args, **kwargs):
+        raise AssertionError("pdfplumber no debe recorrer el documento entero")
+
+    monkeypatch.setattr(parser, "iter_ocr_paginas", ocr_falso)
+    monkeypatch.setattr(parser, "iter_pdfplumber", sin_pdfplumber)
+
+    paginas = list(extract_pages(pdf_escaneado_con_texto))
+    assert len(paginas) == 22
+    assert sorted(pedidas) == [idx for idx in range(22) if idx not in (1, 2)]
+    assert "Página 3 con una capa de texto" in paginas[2]
+    assert paginas[21] == "Lectura OCR de la pagina 22"
@@ -0,0 +1,110 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+# 🔧 Asegura visibilidad del módulo src/
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from src import pipeline
+from src.pipeline import procesar_con_registro, procesar_lote, resumir
+
+pytestmark = pytest.mark.usefixtures("salida_temporal")
+
+# ─────────────────────────────────────────────────────────────
+# Tests de orquestación por documento
+# ─────────────────────────────────────────────────────────────
+
+def test_procesar_con_registro_documento_valido():
+    resultado = procesar_con_registro("tests/fixtures/pdf_textual.pdf")
+    assert resultado["ok"] is True
+    assert len(resultado["hash"]) == 32
+    assert resultado["categoria"]
+
+def test_procesar_con_registro_no_lanza_en_error(tmp_path):
+    resultado = procesar_con_registro(str(tmp_path / "no_existe.pdf"))
+    assert resultado["ok"] is False
+    assert resultado["error"]
+
+def test_paginas_sin_ocr_quedan_pendientes(tmp_path, monkeypatch):
+    import fitz
+    from src import parser
+    from src.checkpoint import Diario
+    from src.manifest import cargar_manifest, esta_vigente, registrar_exportacion
+
+    with fitz.open() as origen:
+        origen.new_page().insert_text((72, 72), "Lámina escaneada", fontsize=24)
+        lamina = origen[0].get_pixmap()
+    ruta = tmp_path / "con_lamina.pdf"
+    with fitz.open() as doc:
+        doc.new_page().insert_text((72, 72), "Una página con capa de texto normal y suficiente para la prueba.")
+        pagina = doc.new_page()
+        pagina.insert_image(pagina.rect, pixmap=lamina)
+        doc.save(ruta)
+
+    def ocr_roto(*args, **kwargs):
+        raise RuntimeError("tesseract no está instalado")
+        yield
+
+    monkeypatch.setattr(parser, "iter_ocr_paginas", ocr_roto)
+    for opciones in ({"checkpoint": False}, {"stream": True}):
+        resultado = procesar_con_registro(str(ruta), opciones=opciones)
+        assert resultado["ok"] is True
+        assert resultado["ocr_fallidas"] == 1
+
+    diario = Diario(tmp_path / "checkpoint")
+    resultado = pipeline.procesar_documento(str(ruta), diario=diario)
+    assert Diario(tmp_path / "checkpoint").recuperar(resultado["hash"]) == (None, None)
+
+    manifest_ruta = tmp_path / "manifest.jsonl"
+    registrar_exportacion({}, resultado, "h1", manifest_ruta)
+    assert esta_vigente(cargar_manifest(manifest_ruta), resultado["hash"], "h1") is False
+
+# ─────────────────────────────────────────────────────────────
+# Tests de reparto por lote (serie y pool de procesos)
+# ─────────────────────────────────────────────────────────────
+
+def test_procesar_lote_en_paralelo_suma_resultados(tmp_path):
+    rutas = [
+        "tests/fixtures/pdf_textual.pdf",
+        "tests/fixtures/pdf_simple.pdf",
+        str(tmp_path / "no_existe.pdf"),
+    ]
+    vistos = []
+    resultados = procesar_lote(rutas, workers=2, al_terminar=vistos.append)
+
+    assert len(resultados) == 3
+    assert {r["archivo"] for r in resultados} == set(rutas)
+    assert vistos == resultados
+    assert resumir(resultados) == {"procesados": 2, "errores": 1}
+
+def test_procesar_lote_en_serie_equivale_a_paralelo():
+    rutas = ["tests/fixtures/pdf_textual.pdf"]
+    serie = procesar_lote(rutas, workers=1)
+    paralelo = procesar_lote(rutas, workers=4)
+    assert serie[0]["hash"] == paralelo[0]["hash"]
+
+def test_procesar_lote_en_streaming_exporta():
+    resultado = procesar_lote(["tests/fixtures/pdf_simple.pdf"], opciones={"stream": True})[0]
+    assert resultado["ok"] is True
+    assert Path(resultado["carpeta"], f"{resultado['hash']}.jsonl").exists()
+
+def _procesar_o_morir(ruta, debug=False, hash_doc=None, opciones=None):
+    if "muere" in ruta:
+        os._exit(1)  # el worker desaparece sin devolver nada (como con el OOM killer)
+    time.sleep(0.5)
+    return {"archivo": ruta, "ok": True}
+
+def test_procesar_lote_sobrevive_a_un_worker_muerto(monkeypatch):
+    monkeypatch.setattr(pipeline, "procesar_con_registro", _procesar_o_morir)
+    rutas = ["a.pdf", "muere.pdf", "b.pdf", "c.pdf"]
+    resultados = procesar_lote(rutas, workers=2)
+
+    por_ruta = {r["archivo"]: r for r in resultados}
+    assert set(por_ruta) == set(rutas)
+    assert por_ruta["muere.pdf"]["ok"] is False
+    assert por_ruta["muere.pdf"]["error"]
+    # El resto del lote sigue en un pool nuevo
+    assert por_ruta["b.pdf"]["ok"] and por_ruta["c.pdf"]["ok"]
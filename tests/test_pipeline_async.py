@@ -0,0 +1,84 @@
+import os
+import sys
+from pathlib import Path
+
+# 🔧 Asegura visibilidad del módulo src/
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from src import pipeline_async
+from src.checkpoint import Diario
+from src.pipeline import resumir
+from src.pipeline_async import procesar_lote_async, resumir_colas, ETAPAS
+
+pytestmark = pytest.mark.usefixtures("salida_temporal")
+
+# ─────────────────────────────────────────────────────────────
+# Tests del pipeline por etapas
+# ─────────────────────────────────────────────────────────────
+
+def test_pipeline_async_procesa_y_aisla_errores(tmp_path):
+    rutas = [
+        "tests/fixtures/pdf_textual.pdf",
+        str(tmp_path / "no_existe.pdf"),
+        "tests/fixtures/pdf_simple.pdf",
+    ]
+    vistos = []
+    resultados, profundidades = procesar_lote_async(
+        rutas, workers=2, al_terminar=vistos.append, capacidad_cola=1
+    )
+
+    assert resumir(resultados) == {"procesados": 2, "errores": 1}
+    assert vistos == resultados
+    assert set(profundidades) == set(ETAPAS)
+    for resultado in resultados:
+        if resultado["ok"]:
+            assert "texto" not in resultado
+            assert Path(resultado["carpeta"], f"{resultado['hash']}.md").exists()
+
+def test_pipeline_async_reanuda_desde_el_diario(tmp_path, monkeypatch):
+    diario = Diario(carpeta=tmp_path / "checkpoint", huella="h")
+    monkeypatch.setattr(pipeline_async, "diario_del_proceso", lambda: diario)
+    rutas = ["tests/fixtures/pdf_textual.pdf", "tests/fixtures/pdf_simple.pdf"]
+    opciones = {"checkpoint": True}
+    carriles = {rutas[0]: "ocr", rutas[1]: "texto"}
+
+    primera, _ = procesar_lote_async(rutas, workers=2, opciones=opciones, carriles=carriles, limite_ocr=1)
+    assert resumir(primera) == {"procesados": 2, "errores": 0}
+    assert all("reanudado" not in r for r in primera)
+    assert {e["etapa"] for e in diario.cargar().values()} == {"exportado"}
+
+    # Lo ya exportado no se vuelve a extraer: sale del diario con los mismos datos
+    segunda, _ = procesar_lote_async(rutas, workers=2, opciones=opciones)
+    por_ruta = {r["archivo"]: r for r in primera}
+    for resultado in segunda:
+        assert resultado["reanudado"] == "exportado"
+        assert resultado["carpeta"] == por_ruta[resultado["archivo"]]["carpeta"]
+        assert "metricas" not in resultado or all(m["etapa"] != "extraccion" for m in resultado["metricas"])
+
+def test_pipeline_async_rechaza_opciones_no_admitidas():
+    with pytest.raises(ValueError, match="limite_s"):
+        procesar_lote_async(["tests/fixtures/pdf_simple.pdf"], opciones={"limite_s": 5})
+
+def _extraer_o_morir(ruta, hash_doc, checkpoint):
+    if "muere" in ruta:
+        os._exit(1)  # el worker desaparece sin devolver nada (como con el OOM killer)
+    return hash_doc or "h", None, "texto de prueba", 0
+
+def test_pipeline_async_sobrevive_a_un_worker_muerto(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline_async, "_etapa_extraccion", _extraer_o_morir)
+    rutas = ["tests/fixtures/pdf_simple.pdf", str(tmp_path / "muere.pdf"), "tests/fixtures/pdf_textual.pdf"]
+    (tmp_path / "muere.pdf").write_bytes(b"%PDF-1.4")
+    resultados, _ = procesar_lote_async(rutas, workers=1, capacidad_cola=1)
+
+    por_ruta = {r["archivo"]: r for r in resultados}
+    assert set(por_ruta) == set(rutas)
+    assert por_ruta[rutas[1]]["ok"] is False
+    # El documento siguiente se extrae en un pool nuevo
+    assert por_ruta[rutas[2]]["ok"]
+
+def test_resumir_colas():
+    resumen = resumir_colas({"lectura": [0, 2, 4], "exportacion": []})
+    assert resumen["lectura"] == {"max": 4, "media": 2.0}
+    assert resumen["exportacion"] == {"max": 0, "media": 0.0}
@@ -0,0 +1,56 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# 🔧 Asegura visibilidad del módulo src/
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.planificador import sondear, planificar, estimar_costo
+from src.pipeline import procesar_lote
+
+pytestmark = pytest.mark.usefixtures("salida_temporal")
+
+TEXTUAL = "tests/fixtures/pdf_textual.pdf"
+ESCANEADO = "tests/fixtures/pdf_escaneado.pdf"
+MUSICA = "tests/fixtures/The Origins of music.pdf"
+
+# ─────────────────────────────────────────────────────────────
+# Tests de la sonda y la estimación de coste
+# ─────────────────────────────────────────────────────────────
+
+def test_sonda_detecta_capa_de_texto():
+    textual = sondear(TEXTUAL)
+    escaneado = sondear(ESCANEADO)
+    assert textual["paginas"] >= 1 and textual["bytes"] > 0
+    assert textual["carril"] == "texto"
+    assert escaneado["carril"] == "ocr"
+    assert escaneado["costo_s"] > textual["costo_s"]
+
+def test_sonda_de_archivo_inexistente_no_lanza(tmp_path):
+    sonda = sondear(str(tmp_path / "no_existe.pdf"))
+    assert sonda["paginas"] == 0
+    assert "error" in sonda
+
+def test_costo_crece_con_paginas_y_sin_texto():
+    assert estimar_costo(100, 1.0) > estimar_costo(10, 1.0)
+    assert estimar_costo(10, 0.0) > estimar_costo(10, 1.0)
+
+# ─────────────────────────────────────────────────────────────
+# Tests de políticas y del carril OCR
+# ─────────────────────────────────────────────────────────────
+
+def test_politicas_ordenan_por_costo():
+    largos = [s["archivo"] for s in planificar([TEXTUAL, MUSICA, ESCANEADO], "largos")]
+    cortos = [s["archivo"] for s in planificar([TEXTUAL, MUSICA, ESCANEADO], "cortos")]
+    assert largos[0] == ESCANEADO
+    assert cortos == list(reversed(largos))
+    with pytest.raises(ValueError):
+        planificar([TEXTUAL], "aleatorio")
+
+def test_procesar_lote_con_carril_ocr_limitado_procesa_todo(tmp_path):
+    rutas = [TEXTUAL, "tests/fixtures/pdf_simple.pdf", str(tmp_path / "no_existe.pdf")]
+    carriles = {rutas[0]: "ocr", rutas[2]: "ocr"}
+    resultados = procesar_lote(rutas, workers=2, carriles=carriles, limite_ocr=1)
+    assert {r["archivo"] for r in resultados} == set(rutas)
+    assert all("duracion_s" in r for r in resultados)
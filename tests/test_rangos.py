@@ -0,0 +1,54 @@
+import sys
+from pathlib import Path
+
+# 🔧 Asegura visibilidad del módulo src/
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from src import rangos
+from src.parser import extract_with_pdfplumber, extract_with_pymupdf
+from src.rangos import presupuesto, procesos_para, rangos_de, tamano_bloque
+
+MUSICA = "tests/fixtures/The Origins of music.pdf"
+SIMPLE = "tests/fixtures/pdf_simple.pdf"
+
+# ─────────────────────────────────────────────────────────────
+# Tests del reparto en rangos
+# ─────────────────────────────────────────────────────────────
+
+def test_rangos_cubren_todas_las_paginas_en_orden():
+    assert rangos_de(10, 4) == [(0, 4), (4, 8), (8, 10)]
+    assert rangos_de(1500, tamano_bloque(1500, 4))[-1][1] == 1500
+
+def test_tamano_de_bloque_se_ajusta_a_las_paginas():
+    assert tamano_bloque(1500, 4) == 94  # ~4 rangos por proceso
+    assert tamano_bloque(100, 8) == rangos.MIN_BLOQUE
+    assert tamano_bloque(100_000, 2) == rangos.MAX_BLOQUE
+
+def test_presupuesto_no_sobresuscribe_nucleos():
+    assert presupuesto(workers=2, nucleos=8) == 4
+    assert presupuesto(workers=8, nucleos=8) == 1
+    assert presupuesto(workers=16, nucleos=8) == 1
+
+def test_documentos_pequenos_se_extraen_en_secuencia(monkeypatch):
+    monkeypatch.setattr(rangos, "PROCESOS_PAGINAS", 4)
+    assert procesos_para(rangos.MIN_PAGINAS_PARALELO - 1) == 1
+    assert procesos_para(1500) == 4
+
+# ─────────────────────────────────────────────────────────────
+# Tests de la extracción paralela
+# ─────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def reparto_forzado(monkeypatch):
+    """Reparte incluso los PDFs de prueba, en rangos de una página."""
+    monkeypatch.setattr(rangos, "PROCESOS_PAGINAS", 2)
+    monkeypatch.setattr(rangos, "MIN_PAGINAS_PARALELO", 1)
+    monkeypatch.setattr(rangos, "MIN_BLOQUE", 1)
+
+@pytest.mark.parametrize("extraer, pdf", [(extract_with_pymupdf, MUSICA), (extract_with_pdfplumber, SIMPLE)])
+def test_extraccion_paralela_es_identica_a_la_secuencial(extraer, pdf, request):
+    secuencial = extraer(pdf)
+    request.getfixturevalue("reparto_forzado")
+    assert extraer(pdf) == secuencial
@@ -0,0 +1,77 @@
+import sys
+from pathlib import Path
+
+# 🔧 Asegura visibilidad del módulo src/
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from src.documento import DocumentoPDF
+from src.parser import es_pdf_complejo
+from src.sonda import disposicion, es_texto_basura, geometria_columnas, indices_muestra, sonda_de, sondear_pdf
+
+TEXTUAL = "tests/fixtures/pdf_textual.pdf"
+ESCANEADO = "tests/fixtures/pdf_escaneado.pdf"
+MUSICA = "tests/fixtures/The Origins of music.pdf"
+
+# ─────────────────────────────────────────────────────────────
+# Tests de la sonda por muestreo
+# ─────────────────────────────────────────────────────────────
+
+def test_indices_muestra_reparte_incluyendo_extremos():
+    assert indices_muestra(3, 8) == [0, 1, 2]
+    indices = indices_muestra(100, 5)
+    assert indices[0] == 0 and indices[-1] == 99
+    assert len(indices) == 5 and indices == sorted(indices)
+
+def test_pdf_textual_se_decide_sin_mirar_todas_las_paginas():
+    sonda = sondear_pdf(MUSICA)
+    assert sonda["escaneado"] is False
+    assert len(sonda["clases"]) < sonda["paginas"]
+    assert "texto" in sonda["clases"].values()
+
+def test_pdf_escaneado_no_tiene_paginas_de_texto():
+    sonda = sondear_pdf(ESCANEADO)
+    assert sonda["escaneado"] is True
+    assert list(sonda["clases"].values()) == ["escaneado"]
+
+def test_sonda_sin_parada_temprana_mira_toda_la_muestra():
+    sonda = sondear_pdf(MUSICA, muestras=4, parar_al_decidir=False)
+    assert len(sonda["clases"]) == min(4, sonda["paginas"])
+
+def test_documento_abierto_reutiliza_su_sonda():
+    with DocumentoPDF(TEXTUAL) as doc:
+        assert doc.sonda is None
+        assert es_pdf_complejo(doc) is False
+        primera = doc.sonda
+        assert primera is not None
+        assert sonda_de(doc) is primera
+
+def test_texto_basura_detecta_cid_y_mojibake():
+    assert es_texto_basura("(cid:12)(cid:44)(cid:3)(cid:71) hola")
+    assert es_texto_basura("Ã©lÃ¨ve Ã¡rbol Ã±")
+    assert not es_texto_basura("Introducción a la música: ritmo, armonía y timbre.")
+    assert not es_texto_basura("")
+
+# ─────────────────────────────────────────────────────────────
+# Tests de la disposición de página (ruta a pdfplumber)
+# ─────────────────────────────────────────────────────────────
+
+ANCHO = 600
+
+def test_dos_columnas_se_detectan_con_su_corte():
+    cajas = [(50, 80, 290, 300), (50, 310, 290, 700), (310, 80, 550, 400), (310, 410, 550, 700)]
+    assert disposicion(cajas, ANCHO) == "columnas"
+    assert geometria_columnas(cajas, ANCHO) == {"corte": 300.0, "arriba": 80.0, "abajo": 700.0}
+
+def test_encabezado_y_pie_a_los_lados_no_son_columnas():
+    cajas = [(50, 20, 200, 30), (50, 35, 200, 45), (50, 60, 550, 700), (400, 750, 550, 760), (400, 765, 550, 775)]
+    assert disposicion(cajas, ANCHO) == "simple"
+
+def test_filas_con_varias_celdas_son_tabla():
+    cajas = [(x, y, x + 80, y + 12) for y in (100, 120, 140, 160) for x in (50, 200, 350)]
+    assert disposicion(cajas, ANCHO) == "tabla"
+
+def test_la_sonda_expone_el_extractor_de_cada_pagina():
+    sonda = sondear_pdf(MUSICA, muestras=3, parar_al_decidir=False)
+    assert set(sonda["extractores"].values()) <= {"pymupdf", "pdfplumber"}
+    assert sonda["extractores"][12] == "pdfplumber"  # artículo a dos columnas
+    assert sondear_pdf(ESCANEADO)["extractores"] == {0: "ocr"}
@@ -0,0 +1,69 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+# 🔧 Asegura visibilidad del módulo src/
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from src import supervisor
+from src.supervisor import ejecutar_con_limites, procesar_supervisado, rss_mb
+from src.parser import extract_text
+
+pytestmark = pytest.mark.usefixtures("salida_temporal")
+
+TEXTUAL = "tests/fixtures/pdf_textual.pdf"
+MUSICA = "tests/fixtures/The Origins of music.pdf"
+
+# ─────────────────────────────────────────────────────────────
+# Tests del proceso vigilado
+# ─────────────────────────────────────────────────────────────
+
+@pytest.fixture
+def vigilancia_rapida(monkeypatch):
+    """Revisa el hijo cada milisegundo: ningún PDF termina antes de la primera revisión."""
+    monkeypatch.setattr(supervisor, "INTERVALO_VIGILANCIA", 0.001)
+
+def test_documento_dentro_del_presupuesto_devuelve_su_resultado():
+    resultado = procesar_supervisado(TEXTUAL, opciones={"limite_s": 120, "limite_mb": 4096})
+    assert resultado["ok"] is True
+    assert len(resultado["hash"]) == 32
+
+def test_documento_que_excede_el_tiempo_se_mata(vigilancia_rapida):
+    resultado = ejecutar_con_limites(MUSICA, limite_s=0.001)
+    assert resultado["ok"] is False
+    assert resultado["razon"] == "tiempo_excedido"
+
+@pytest.mark.skipif(rss_mb(1) is None, reason="Sin /proc: solo se aplica el límite de tiempo")
+def test_documento_que_excede_la_memoria_se_mata(vigilancia_rapida):
+    resultado = ejecutar_con_limites(MUSICA, limite_mb=1)
+    assert resultado["ok"] is False
+    assert resultado["razon"] == "memoria_excedida"
+
+def test_reintento_degradado_tambien_respeta_los_limites(vigilancia_rapida):
+    resultado = procesar_supervisado(MUSICA, opciones={"limite_s": 0.001, "degradar": True})
+    assert resultado["ok"] is False
+    assert resultado["razon"] == "tiempo_excedido"
+
+def _procesar_y_colgarse(ruta, debug=False, hash_doc=None, opciones=None):
+    # Un hilo no daemon impide que el hijo salga después de enviar su resultado
+    threading.Thread(target=time.sleep, args=(60,)).start()
+    return {"archivo": ruta, "ok": True}
+
+def test_hijo_que_no_sale_tras_su_resultado_se_mata(vigilancia_rapida, monkeypatch):
+    from src import pipeline
+
+    monkeypatch.setattr(pipeline, "procesar_con_registro", _procesar_y_colgarse)
+    inicio = time.perf_counter()
+    resultado = ejecutar_con_limites(TEXTUAL, limite_s=120)
+    assert resultado == {"archivo": TEXTUAL, "ok": True}
+    assert time.perf_counter() - inicio < 10
+
+# ─────────────────────────────────────────────────────────────
+# Tests del modo degradado
+# ─────────────────────────────────────────────────────────────
+
+def test_extraccion_degradada_usa_pymupdf():
+    assert len(extract_text(TEXTUAL, degradado=True).strip()) > 100
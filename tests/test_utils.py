@@ -9,7 +9,9 @@ from src.utils import (
     es_pdf_complejo,
     contiene_formula,
     normalizar_texto,
-    calcular_hash_md5
+    calcular_hash_md5,
+    calcular_hash,
+    TAMANO_BLOQUE
 )
 
 # ─────────────────────────────────────────────────────────────
@@ -59,3 +61,28 @@ def test_calcular_hash_md5(tmp_path):
     hash_val = calcular_hash_md5(str(archivo))
     assert isinstance(hash_val, str)
     assert len(hash_val) == 32  # Longitud típica del hash MD5
+
+def test_calcular_hash_por_bloques_equivale_a_hashlib(tmp_path):
+    import hashlib
+    archivo = tmp_path / "grande.pdf"
+    datos = bytes(range(256)) * (TAMANO_BLOQUE // 256 * 3 + 7)  # varios bloques y un resto
+    archivo.write_bytes(datos)
+
+    assert calcular_hash(str(archivo), "md5", usar_cache=False) == hashlib.md5(datos).hexdigest()
+    assert calcular_hash(str(archivo), "sha256", usar_cache=False) == hashlib.sha256(datos).hexdigest()
+
+def test_cache_de_hash_por_inodo_y_mtime(tmp_path):
+    import os
+    archivo = tmp_path / "escaneo.pdf"
+    archivo.write_bytes(b"%PDF-1.4 original")
+    os.utime(archivo, ns=(10**18, 10**18))  # mtime antiguo: el archivo ya no se está escribiendo
+    cache = tmp_path / "hash_cache.jsonl"
+
+    original = calcular_hash(str(archivo), "md5", ruta_cache=cache)
+    assert cache.exists()
+    assert calcular_hash(str(archivo), "md5", ruta_cache=cache) == original
+
+    # Mismo tamaño, contenido distinto y otro mtime → se recalcula
+    archivo.write_bytes(b"%PDF-1.4 cambiado")
+    os.utime(archivo, ns=(10**18 + 1, 10**18 + 1))
+    assert calcular_hash(str(archivo), "md5", ruta_cache=cache) != original
@@ -9,7 +9,10 @@ from src.validator import (
     validar_resumen,
     validar_secciones,
     validar_citas_referencias,
-    validar_documento
+    validar_documento,
+    iniciar_validacion,
+    observar_validacion,
+    cerrar_validacion
 )
 
 # ─────────────────────────────────────────────────────────────
@@ -48,6 +51,18 @@ def test_validar_documento_con_errores(tmp_path):
     assert any("Secciones" in e for e in info["razones"])
     assert any("citas" in e.lower() for e in info["razones"])
 
+def test_validacion_incremental_equivale_a_completa(tmp_path):
+    fragmentos = ["Introducción\nTexto con una cita [1].", "\nResultados\npocas palabras"]
+    ruta_pdf = tmp_path / "doc_stream.pdf"
+    ruta_pdf.write_text("contenido simulado")
+
+    estado = iniciar_validacion()
+    for fragmento in fragmentos:
+        observar_validacion(estado, fragmento)
+    _, info_stream = cerrar_validacion(estado, str(ruta_pdf))
+    _, info = validar_documento("".join(fragmentos), str(ruta_pdf))
+    assert info_stream["razones"] == info["razones"]
+
 def test_documento_real_the_origins():
     import fitz  # PyMuPDF
     ruta = "tests/fixtures/The Origins of music.pdf"